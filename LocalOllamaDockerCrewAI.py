@@ -1,27 +1,36 @@
-from crewai import Agent, Task, Crew
-from crewai.llm import LLM
+def build_crew(llm=None):
+    """One researcher collecting fun facts about Mars on the local Ollama server."""
+    from crewai import Agent, Task, Crew
+    from llmCache import CachedLLM
+    from ollamaManager import managed_ollama_llm
 
-# Tell CrewAI to use Ollama as backend
-ollama_llm = LLM(
-    model="ollama/llama3.1:latest",   # specify provider + model
-    base_url="http://host.docker.internal:11434" # point to your running Ollama server
-    #base_url="http://localhost:11434"
-)
+    # Tell CrewAI to use Ollama as backend (repeated prompts are served from a response cache,
+    # and the model is preloaded and kept resident by the shared Ollama manager)
+    ollama_llm = llm or CachedLLM(managed_ollama_llm(
+        model="ollama/llama3.1:latest",   # specify provider + model
+        base_url="http://host.docker.internal:11434" # point to your running Ollama server
+        #base_url="http://localhost:11434"
+    ))
 
-researcher = Agent(
-    role="Researcher",
-    goal="Find interesting facts",
-    backstory="Expert researcher who loves astronomy",
-    llm=ollama_llm
-)
+    researcher = Agent(
+        role="Researcher",
+        goal="Find interesting facts",
+        backstory="Expert researcher who loves astronomy",
+        llm=ollama_llm
+    )
 
-task = Task(
-    description="Collect 5 fun facts about Mars and summarize them.",
-    expected_output="A short summary containing exactly 5 fun facts about Mars.",
-    agent=researcher,
-)
+    task = Task(
+        description="Collect 5 fun facts about Mars and summarize them.",
+        expected_output="A short summary containing exactly 5 fun facts about Mars.",
+        agent=researcher,
+    )
 
-crew = Crew(agents=[researcher], tasks=[task])
-result = crew.kickoff()
+    return Crew(agents=[researcher], tasks=[task])
 
-print("Crew Output:\n", result)
+if __name__ == "__main__":
+    from crewStreaming import render_kickoff
+
+    # Tokens are shown as they arrive instead of after the whole crew finishes
+    result = render_kickoff(build_crew())
+
+    print("Crew Output:\n", result)
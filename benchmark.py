@@ -0,0 +1,384 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import crewFactory
+from conversationStore import START_OF_CONVERSATION
+from stubLLMServer import StubLLMServer
+from tracing import percentile
+
+logger = logging.getLogger(__name__)
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(REPO_DIR, "benchmarks", "search_fixtures")
+# Outside the repo, so benchmark runs leave the working tree clean (BENCHMARK_HISTORY to keep it elsewhere)
+DEFAULT_HISTORY_PATH = os.path.join(tempfile.gettempdir(), "crew_benchmark_history.jsonl")
+
+STUB_RESEARCH = "- Strong residential and commercial portfolio\n- Steady demand and competitive pricing"
+
+
+# --- Stubs ---
+def stub_synthesize(text: str) -> str:
+    """Write a tiny placeholder MP3 instead of calling gTTS; returns its path."""
+    path = os.path.join(os.environ["BENCHMARK_WORK_DIR"], "speech.mp3")
+    with open(path, "wb") as f:
+        f.write(b"ID3" + text.encode("utf-8")[:64])
+    return path
+
+
+def stub_playbooks():
+    """InstructionStore over stub outreach playbooks instead of the ones DataPrep.py writes."""
+    support = crewFactory.load_script("customerSupportAgent/customerSupportAgent.py")
+    from instructionStore import SEGMENT_FILES
+
+    directory = os.path.join(os.environ["BENCHMARK_WORK_DIR"], "instructions")
+    os.makedirs(directory, exist_ok=True)
+    for segment, filename in SEGMENT_FILES.items():
+        with open(os.path.join(directory, filename), "w", encoding="utf-8") as f:
+            f.write(f"# {segment.title()} outreach\n\n- Lead with a concrete outcome\n- Keep the first message short\n")
+    return support.InstructionStore(directory)
+
+
+def _support_inputs() -> dict:
+    support = crewFactory.load_script("customerSupportAgent/customerSupportAgent.py")
+    return support.prepare_inputs({
+        "lead_name": "DeepLearningAI",
+        "industry": "Online Learning Platform",
+        "key_decision_maker": "Andrew Ng",
+        "position": "CEO",
+        "milestone": "product launch",
+    }, store=stub_playbooks())
+
+
+# --- Crews ---
+# crewFactory name, factory kwargs, inputs()
+CREWS = [
+    ("voice.research", {}, lambda: {"developer_name": "Emaar Properties"}),
+    ("voice.answer", {"synthesize": stub_synthesize}, lambda: {
+        "developer_name": "Emaar Properties",
+        "user_query": "What are their best luxury projects?",
+        "research": STUB_RESEARCH,
+        "conversation": START_OF_CONVERSATION,
+    }),
+    ("voice.noloop", {"synthesize": stub_synthesize, "memory": False}, lambda: {
+        "developer_name": "Emaar Properties",
+        "user_query": "What are their best luxury projects in Dubai?",
+    }),
+    ("support.outreach", {"memory": False}, _support_inputs),
+    ("content.blog", {}, lambda: {"topic": "Artificial Intelligence"}),
+    ("ollama.mars", {}, lambda: {}),
+    ("openai.mars", {}, lambda: {}),
+]
+
+
+def configure_environment(work_dir: str) -> None:
+    """Point every cache at work_dir, replay search fixtures and disable telemetry."""
+    os.environ.update({
+        "BENCHMARK_WORK_DIR": work_dir,
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "OTEL_SDK_DISABLED": "true",
+        "SEARCH_CACHE_MODE": "replay",
+        "SEARCH_FIXTURES_DIR": FIXTURES_DIR,
+        "SEARCH_CACHE_PATH": os.path.join(work_dir, "search_cache.sqlite"),
+        "LLM_CACHE_PATH": os.path.join(work_dir, "llm_cache.sqlite"),
+        "RESEARCH_CACHE_PATH": os.path.join(work_dir, "research_cache.json"),
+        "TTS_CACHE_DIR": os.path.join(work_dir, "tts"),
+        "TRACE_PATH": os.path.join(work_dir, "traces.jsonl"),
+        "RETRIEVAL_INDEX_DIR": os.path.join(work_dir, "no_index"),
+    })
+    for name in ("GOOGLE_API_KEY", "SERPER_API_KEY", "OPENAI_API_KEY"):
+        os.environ.setdefault(name, "stub")
+
+
+def stub_crew(name: str, base_url: str, **kwargs):
+    """Build the named crew with every agent on the stub server and no console output."""
+    from crewai import LLM
+
+    crew = crewFactory.build(name, llm=LLM(model="openai/stub", base_url=base_url, api_key="stub"), **kwargs)
+    crew.verbose = False
+    for agent in crew.agents:
+        agent.verbose = False
+    return crew
+
+
+def stub_crew_for(name: str, base_url: str):
+    """stub_crew with the factory kwargs the named crew has in CREWS."""
+    kwargs = next(spec[1] for spec in CREWS if spec[0] == name)
+    return stub_crew(name, base_url, **kwargs)
+
+
+def cold_start(name: str, base_url: str) -> float:
+    """Seconds for a fresh interpreter to import crewFactory and build the named crew.
+
+    The crew is built exactly as in the timed runs (stub LLM, stub kwargs), so
+    no real LLM client or Ollama preload is involved.
+    """
+    code = (
+        "import time; started = time.perf_counter(); import benchmark; "
+        f"benchmark.stub_crew_for({name!r}, {base_url!r}); print(time.perf_counter() - started)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_DIR, env=os.environ,
+                            capture_output=True, text=True, timeout=600)
+    if result.returncode != 0:
+        logger.error(f"Cold start of {name} failed: {result.stderr.strip().splitlines()[-1:]}")
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def _task_label(index: int, task) -> str:
+    return f"{index}:{task.name or task.description.split(chr(10))[0][:40]}"
+
+
+def kickoff_once(name: str, kwargs: dict, base_url: str, inputs: dict) -> dict:
+    """Build and kick off a stubbed crew; returns build, total and per-task seconds."""
+    from crewStreaming import subscribe
+    from crewai.events import crewai_event_bus
+
+    started = time.perf_counter()
+    run = stub_crew(name, base_url, **kwargs)
+    build_seconds = time.perf_counter() - started
+    labels = {id(task): _task_label(index, task) for index, task in enumerate(run.tasks)}
+    started_at = {}
+    task_seconds = {}
+
+    def on_event(kind, event):
+        task = getattr(event, "task", None)
+        if id(task) not in labels:
+            return
+        if kind == "task_started":
+            started_at[id(task)] = event.timestamp
+        elif kind == "task_completed" and id(task) in started_at:
+            task_seconds[labels[id(task)]] = (event.timestamp - started_at[id(task)]).total_seconds()
+
+    with subscribe(on_event):
+        started = time.perf_counter()
+        run.kickoff(inputs=inputs)
+        seconds = time.perf_counter() - started
+        crewai_event_bus.flush()
+    return {"seconds": seconds, "build_seconds": build_seconds, "tasks": task_seconds}
+
+
+def benchmark_crew(spec, server: StubLLMServer, runs: int, concurrency: int, measure_cold_start: bool = True) -> dict:
+    name, kwargs, make_inputs = spec
+    cold_start_seconds = cold_start(name, server.base_url) if measure_cold_start else None
+    inputs = make_inputs()
+
+    # Warm-up run: first-call imports and client setup are not part of steady-state overhead
+    kickoff_once(name, kwargs, server.base_url, inputs)
+
+    requests_before = server.stats()["requests"]
+    results, errors = [], 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(kickoff_once, name, kwargs, server.base_url, inputs) for _ in range(runs)]
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                errors += 1
+                logger.error(f"{name} run failed: {e}")
+    wall = time.perf_counter() - started
+    requests = (server.stats()["requests"] - requests_before) / max(1, runs)
+
+    # Memory is measured on a separate run so tracemalloc does not slow the timed runs
+    tracemalloc.start()
+    try:
+        kickoff_once(name, kwargs, server.base_url, inputs)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    seconds = [result["seconds"] for result in results]
+    mean = sum(seconds) / len(seconds) if seconds else 0.0
+    task_names = sorted({task for result in results for task in result["tasks"]})
+    return {
+        "runs": runs,
+        "errors": errors,
+        "cold_start_seconds": round(cold_start_seconds, 4) if cold_start_seconds is not None else None,
+        "build_p50": round(percentile([result["build_seconds"] for result in results], 0.50, 0.0), 4),
+        "throughput_per_second": round(len(results) / wall, 4) if wall else 0.0,
+        "latency_p50": round(percentile(seconds, 0.50, 0.0), 4),
+        "latency_p95": round(percentile(seconds, 0.95, 0.0), 4),
+        "latency_mean": round(mean, 4),
+        "llm_requests_per_run": round(requests, 2),
+        # Time spent outside the (sequential) stub LLM calls
+        "overhead_per_run": round(max(0.0, mean - requests * server.latency), 4),
+        "peak_memory_mb": round(peak / 2 ** 20, 2),
+        "tasks": {
+            task: {
+                "p50": round(percentile([r["tasks"][task] for r in results if task in r["tasks"]], 0.50, 0.0), 4),
+                "p95": round(percentile([r["tasks"][task] for r in results if task in r["tasks"]], 0.95, 0.0), 4),
+            }
+            for task in task_names
+        },
+    }
+
+
+# --- Checks ---
+def check_batch_leads(server: StubLLMServer, leads: int = 6, workers: int = 4) -> list:
+    """Run batchLeads over distinct leads on parallel workers; returns the mismatches found.
+
+    Each record's typed profile must name its own lead, i.e. concurrent kickoffs
+    of copies of one crew must not see each other's inputs.
+    """
+    support = crewFactory.load_script("customerSupportAgent/customerSupportAgent.py")
+    batch = crewFactory.load_script("customerSupportAgent/batchLeads.py")
+    work_dir = tempfile.mkdtemp(prefix="batch_", dir=os.environ["BENCHMARK_WORK_DIR"])
+    input_path, output_path = os.path.join(work_dir, "leads.jsonl"), os.path.join(work_dir, "results.jsonl")
+    with open(input_path, "w", encoding="utf-8") as f:
+        for index in range(leads):
+            f.write(json.dumps({
+                "lead_name": f"Lead {index}",
+                "industry": "Online Learning Platform",
+                "key_decision_maker": f"Person {index}",
+                "position": f"Position {index}",
+                "milestone": f"milestone {index}",
+            }) + "\n")
+
+    store = stub_playbooks()
+    batch.run_batch(stub_crew("support.outreach", server.base_url, memory=False), input_path, output_path, workers,
+                    lambda lead: support.prepare_inputs(lead, store=store))
+
+    mismatches = []
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            profile = record.get("profile")
+            name = profile.get("lead_name") if isinstance(profile, dict) else None
+            if record["status"] != "ok" or name != record["lead"]["lead_name"]:
+                mismatches.append(f"{record['id']}: status {record['status']}, profile for {name!r}")
+    return mismatches
+
+
+# --- History and regressions ---
+def git_commit() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=REPO_DIR, capture_output=True, text=True, timeout=30).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+    return {"commit": git("rev-parse", "--short", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def load_history(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_baseline(history: list, config: dict, commit: str):
+    """Most recent entry for the same configuration from another commit."""
+    for entry in reversed(history):
+        if entry["config"] == config and entry.get("commit") != commit:
+            return entry
+    return None
+
+
+# metric, minimum absolute change worth flagging
+REGRESSION_METRICS = (
+    ("latency_p50", 0.02), ("overhead_per_run", 0.02), ("build_p50", 0.01),
+    ("cold_start_seconds", 0.2), ("peak_memory_mb", 1.0),
+)
+
+
+def find_regressions(results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    for name, current in results.items():
+        previous = (baseline or {}).get("results", {}).get(name)
+        if not previous:
+            continue
+        for metric, minimum in REGRESSION_METRICS:
+            before, after = previous.get(metric), current.get(metric)
+            if before is None or after is None:
+                continue
+            if after > before * (1 + threshold) and after - before > minimum:
+                regressions.append({"crew": name, "metric": metric, "baseline": before, "current": after,
+                                    "change": round(after / before - 1, 3) if before else None})
+    return regressions
+
+
+def format_report(results: dict, regressions: list) -> str:
+    lines = [f"{'crew':<20} {'runs/s':>8} {'p50':>8} {'p95':>8} {'llm/run':>8} {'overhead':>9} {'build':>8} {'cold':>7} {'peak MB':>8}"]
+    for name, row in results.items():
+        cold = f"{row['cold_start_seconds']:>6.2f}s" if row["cold_start_seconds"] is not None else f"{'-':>7}"
+        lines.append(
+            f"{name[:20]:<20} {row['throughput_per_second']:>8.2f} {row['latency_p50']:>7.3f}s {row['latency_p95']:>7.3f}s "
+            f"{row['llm_requests_per_run']:>8.1f} {row['overhead_per_run']:>8.3f}s {row['build_p50']:>7.3f}s {cold} "
+            f"{row['peak_memory_mb']:>8.1f}"
+        )
+        for task, timing in row["tasks"].items():
+            lines.append(f"    {task[:44]:<44} p50 {timing['p50']:.3f}s  p95 {timing['p95']:.3f}s")
+    for regression in regressions:
+        lines.append(
+            f"REGRESSION {regression['crew']} {regression['metric']}: "
+            f"{regression['baseline']} -> {regression['current']} ({regression['change']:+.0%})"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark every crew against a stub LLM server and recorded search results.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub LLM seconds per request")
+    parser.add_argument("--crews", nargs="*", help="crew names to run (default: all)")
+    parser.add_argument("--history", default=os.getenv("BENCHMARK_HISTORY", DEFAULT_HISTORY_PATH))
+    parser.add_argument("--no-history", action="store_true", help="do not append this run to the history")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative slowdown flagged as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--no-cold-start", action="store_true", help="skip the fresh-interpreter import + build timing")
+    parser.add_argument("--no-checks", action="store_true", help="skip the correctness checks (parallel batchLeads run)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+    configure_environment(tempfile.mkdtemp(prefix="crew_bench_"))
+
+    specs = [spec for spec in CREWS if not args.crews or spec[0] in args.crews]
+    results = {}
+    failures = []
+    with StubLLMServer(latency=args.latency) as server:
+        for spec in specs:
+            print(f"Benchmarking {spec[0]}...", file=sys.stderr)
+            results[spec[0]] = benchmark_crew(spec, server, args.runs, args.concurrency, not args.no_cold_start)
+        if not args.no_checks and "support.outreach" in [spec[0] for spec in specs]:
+            print("Checking parallel batchLeads...", file=sys.stderr)
+            failures = check_batch_leads(server)
+
+    config = {"runs": args.runs, "concurrency": args.concurrency, "latency": args.latency, "crews": [spec[0] for spec in specs]}
+    commit = git_commit()
+    history = load_history(args.history)
+    baseline = find_baseline(history, config, commit["commit"])
+    regressions = find_regressions(results, baseline, args.threshold)
+    print(format_report(results, regressions))
+    if baseline:
+        print(f"Compared with {baseline['commit']} ({baseline['timestamp']})")
+    for failure in failures:
+        print(f"CHECK FAILED batchLeads {failure}")
+
+    if not args.no_history:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        entry = {
+            **commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "config": config,
+            "results": results,
+            "regressions": regressions,
+        }
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+    if failures:
+        return 1
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""Shrink the context one task hands to the next.
+
+Research reports and lead profiles are split into individual facts, near
+duplicates are dropped, and the facts most relevant to the current question
+(user_query, milestone, ...) are kept until a token budget is reached. Results
+are cached, so the same report compacted for the same question costs nothing.
+
+    compactor = ContextCompactor(budget=300)
+    research = compactor.compact(research, "What are their best luxury projects?")
+"""
+import os
+import re
+import hashlib
+import logging
+import threading
+import contextvars
+from collections import OrderedDict
+
+import numpy as np
+
+from retrievalIndex import embed
+from textSplit import SENTENCE_END
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = 400
+DEFAULT_MAX_ENTRIES = 256
+# Facts at least this similar to one already kept are treated as repeats
+DUPLICATE_SIMILARITY = 0.85
+
+BULLET = re.compile(r"^\s*(?:[-*•]+|\d+[.)])\s*")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def split_facts(text: str) -> list:
+    """Bullets and sentences of text as plain strings, without headings or markup."""
+    facts = []
+    for line in text.splitlines():
+        line = BULLET.sub("", line.replace("**", "").replace("__", "")).strip()
+        if not line or line.startswith("#"):
+            continue
+        # Short lines ending in a colon are section labels ("Key projects:"), not facts
+        if line.endswith(":") and len(line.split()) < 8:
+            continue
+        facts.extend(sentence.strip() for sentence in SENTENCE_END.split(line) if len(sentence.split()) >= 3)
+    return facts
+
+
+def _key(text: str, query: str, budget: int) -> str:
+    payload = f"{budget}\0{' '.join(query.lower().split())}\0{text}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ContextCompactor:
+    """Extract, dedupe, rank and budget the facts in a task's output.
+
+    Facts are ranked by similarity to the query (hashed bag-of-words, the same
+    embedding the retrieval index uses), with a small bonus for appearing early
+    and for carrying numbers (prices, dates, sizes). The selected facts are
+    returned as a bullet list in their original order.
+    """
+
+    def __init__(self, budget: int = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.budget = budget if budget is not None else int(os.getenv("CONTEXT_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET))
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._tokens_in = 0
+        self._tokens_out = 0
+
+    def compact(self, text: str, query: str = "", budget: int = None) -> str:
+        if not text:
+            return text
+        budget = budget or self.budget
+        key = _key(text, query or "", budget)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+
+        compacted = self._compact(text, query or "", budget)
+
+        with self._lock:
+            self._misses += 1
+            self._tokens_in += estimate_tokens(text)
+            self._tokens_out += estimate_tokens(compacted)
+            self._entries[key] = compacted
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        logger.debug(f"Compacted {estimate_tokens(text)} -> {estimate_tokens(compacted)} tokens")
+        return compacted
+
+    def _compact(self, text: str, query: str, budget: int) -> str:
+        facts = split_facts(text)
+        if not facts:
+            return text
+
+        # Dedupe: exact repeats first, then near repeats by embedding similarity
+        kept, vectors, seen = [], [], set()
+        for fact in facts:
+            normalized = " ".join(re.findall(r"[a-z0-9]+", fact.lower()))
+            if normalized in seen:
+                continue
+            vector = embed(fact)
+            if vectors and float(np.max(np.stack(vectors) @ vector)) >= DUPLICATE_SIMILARITY:
+                continue
+            seen.add(normalized)
+            kept.append(fact)
+            vectors.append(vector)
+
+        relevance = np.stack(vectors) @ embed(query) if query.strip() else np.zeros(len(kept))
+        scores = [
+            float(relevance[index]) + 0.1 * (1 - index / len(kept)) + (0.05 if re.search(r"\d", fact) else 0.0)
+            for index, fact in enumerate(kept)
+        ]
+
+        chosen, used = set(), 0
+        for index in sorted(range(len(kept)), key=lambda i: -scores[i]):
+            cost = estimate_tokens(kept[index]) + 1
+            if used + cost > budget:
+                continue
+            chosen.add(index)
+            used += cost
+        compacted = "\n".join(f"- {kept[index]}" for index in sorted(chosen))
+        # Short, repeat-free text can come out longer once rewritten as bullets
+        return compacted if len(compacted) < len(text) else text
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "tokens_in": self._tokens_in,
+                "tokens_out": self._tokens_out,
+            }
+
+
+_shared_compactor = None
+_shared_compactor_lock = threading.Lock()
+
+
+def shared_compactor() -> ContextCompactor:
+    """Process-wide ContextCompactor using CONTEXT_TOKEN_BUDGET."""
+    global _shared_compactor
+    with _shared_compactor_lock:
+        if _shared_compactor is None:
+            _shared_compactor = ContextCompactor()
+        return _shared_compactor
+
+
+class CompactionStage:
+    """Task callback that compacts a task's output before later tasks get it as context.
+
+    focus is a template over the kickoff inputs, e.g. "{milestone}". Register
+    bind in Crew(before_kickoff_callbacks=[...]) so each kickoff fills it in,
+    and the stage itself as the callback of the task whose output to shrink:
+
+        stage = CompactionStage("{milestone} {industry}")
+        profiling_task = Task(..., callback=stage)
+        Crew(..., before_kickoff_callbacks=[stage.bind])
+
+    With parse, parse(text, inputs) turns the output into a typed model (see
+    schemas.py) that is kept as the task's pydantic output; its to_text() is
+    what gets compacted.
+
+    crew.copy() shares the stage between copies, so the bound inputs live in a
+    context variable: concurrent kickoffs (one per thread, as in batchLeads)
+    each see their own.
+    """
+
+    def __init__(self, focus: str, compactor: ContextCompactor = None, budget: int = None, parse=None):
+        self.focus = focus
+        self.compactor = compactor or shared_compactor()
+        self.budget = budget
+        self.parse = parse
+        self._bound = contextvars.ContextVar(f"compaction_stage_{id(self)}", default=({}, ""))
+
+    @property
+    def inputs(self) -> dict:
+        return self._bound.get()[0]
+
+    @property
+    def query(self) -> str:
+        return self._bound.get()[1]
+
+    def bind(self, inputs):
+        bound = dict(inputs or {})
+        query = re.sub(r"\{(\w+)\}", lambda match: str(bound.get(match.group(1), "")), self.focus)
+        self._bound.set((bound, query))
+        return inputs
+
+    def __call__(self, output):
+        inputs, query = self._bound.get()
+        before = estimate_tokens(output.raw)
+        if self.parse is not None:
+            output.pydantic = self.parse(output.raw, inputs)
+            output.raw = output.pydantic.to_text() or output.raw
+        output.raw = self.compactor.compact(output.raw, query, self.budget)
+        logger.info(f"Compacted task output for {query!r}: {before} -> {estimate_tokens(output.raw)} tokens")
+        return output
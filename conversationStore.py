@@ -0,0 +1,168 @@
+"""Bounded per-session conversation state for multi-turn voice sessions.
+
+Each session keeps its last few turns (answers compacted to their key facts),
+a rolling summary of older turns and the research facts already handed to the
+answer task, so a follow-up question only sends the conversation so far plus
+the research it has not seen yet. Sessions are persisted as JSON, one file per
+session, so a restarted worker picks the conversation up again.
+
+    conversation = conversations.get("caller-42")
+    research = conversation.research_delta(research)
+    ...
+    conversation.record_turn(user_query, answer_text, research)
+"""
+import os
+import re
+import json
+import time
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+
+from contextCompaction import ContextCompactor, split_facts, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIR = os.path.join(tempfile.gettempdir(), "crew_conversations")
+DEFAULT_MAX_TURNS = 4
+DEFAULT_TURN_TOKENS = 80
+DEFAULT_SUMMARY_TOKENS = 200
+MAX_SENT_FACTS = 500
+START_OF_CONVERSATION = "This is the start of the conversation."
+NO_NEW_RESEARCH = "No new research beyond what was already discussed in this conversation."
+
+_compactor = ContextCompactor(max_entries=512)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+class Conversation:
+    """One session: recent turns, a rolling summary and the research facts already sent."""
+
+    def __init__(self, session_id: str, path: str = None, max_turns: int = DEFAULT_MAX_TURNS,
+                 turn_tokens: int = DEFAULT_TURN_TOKENS, summary_tokens: int = DEFAULT_SUMMARY_TOKENS):
+        self.session_id = session_id
+        self.path = path
+        self.max_turns = max_turns
+        self.turn_tokens = turn_tokens
+        self.summary_tokens = summary_tokens
+        self.turns = []
+        self.summary = []
+        self.sent_facts = []
+        self._lock = threading.Lock()
+
+    # --- Persistence ---
+    @classmethod
+    def load(cls, session_id: str, path: str, **kwargs) -> "Conversation":
+        conversation = cls(session_id, path, **kwargs)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return conversation
+        except (OSError, ValueError) as e:
+            logger.warning(f"Starting a fresh conversation; unreadable state {path}: {e}")
+            return conversation
+        conversation.turns = data.get("turns", [])
+        conversation.summary = data.get("summary", [])
+        conversation.sent_facts = data.get("sent_facts", [])
+        return conversation
+
+    def _save(self) -> None:
+        # Called with self._lock held
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "session_id": self.session_id,
+                "updated_at": time.time(),
+                "turns": self.turns,
+                "summary": self.summary,
+                "sent_facts": self.sent_facts,
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    # --- Turns ---
+    def record_turn(self, query: str, answer: str, research: str = "") -> None:
+        """Remember a finished turn and the research facts it was given."""
+        turn = {"query": query, "answer": _compactor.compact(answer, query, self.turn_tokens), "at": time.time()}
+        with self._lock:
+            # Asking the same thing again replaces the earlier turn instead of stacking a copy
+            self.turns = [t for t in self.turns if _normalize(t["query"]) != _normalize(query)]
+            self.turns.append(turn)
+            while len(self.turns) > self.max_turns:
+                self._fold(self.turns.pop(0))
+
+            sent = set(self.sent_facts)
+            for fact in split_facts(research or ""):
+                if _normalize(fact) not in sent:
+                    sent.add(_normalize(fact))
+                    self.sent_facts.append(_normalize(fact))
+            del self.sent_facts[:-MAX_SENT_FACTS]
+            self._save()
+
+    def _fold(self, turn: dict) -> None:
+        """Move a turn that left the window into the rolling summary, oldest lines dropped first."""
+        facts = " ".join(split_facts(turn["answer"])) or turn["answer"]
+        self.summary.append(f"Asked: {turn['query']} Told: {facts}")
+        while len(self.summary) > 1 and estimate_tokens("\n".join(self.summary)) > self.summary_tokens:
+            self.summary.pop(0)
+
+    # --- Prompt inputs ---
+    def context(self) -> str:
+        """The summary and recent turns, for the answer task's {conversation} input."""
+        with self._lock:
+            if not self.turns and not self.summary:
+                return START_OF_CONVERSATION
+            lines = []
+            if self.summary:
+                lines.append("Earlier:")
+                lines.extend(f"- {line}" for line in self.summary)
+            for turn in self.turns:
+                lines.append(f"Customer: {turn['query']}")
+                lines.append(f"You: {turn['answer']}")
+            return "\n".join(lines)
+
+    def research_delta(self, research: str) -> str:
+        """The facts in research this session has not been given yet."""
+        with self._lock:
+            sent = set(self.sent_facts)
+        new = [fact for fact in split_facts(research or "") if _normalize(fact) not in sent]
+        if not new:
+            return NO_NEW_RESEARCH if sent else research
+        return "\n".join(f"- {fact}" for fact in new)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.turns) + len(self.summary)
+
+
+class ConversationStore:
+    """Conversations by session id, kept in memory (up to max_sessions) and on disk."""
+
+    def __init__(self, directory: str = None, max_sessions: int = 128, **conversation_kwargs):
+        self.directory = directory or os.getenv("CONVERSATION_DIR", DEFAULT_DIR)
+        self.max_sessions = max_sessions
+        self.conversation_kwargs = conversation_kwargs
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path_for(self, session_id: str) -> str:
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", session_id)
+        return os.path.join(self.directory, f"{safe}.json")
+
+    def get(self, session_id: str) -> Conversation:
+        with self._lock:
+            conversation = self._sessions.get(session_id)
+            if conversation is None:
+                conversation = Conversation.load(session_id, self.path_for(session_id), **self.conversation_kwargs)
+                self._sessions[session_id] = conversation
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return conversation
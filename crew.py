@@ -1,14 +1,13 @@
 import os
-import tempfile
+import time
 import logging
-from gtts import gTTS
+import threading
 from dotenv import load_dotenv
-import speech_recognition as sr
-from playsound import playsound
 
-from crewai import Agent, Task, Crew, Process, LLM
-from crewai.tools import tool  
-from crewai_tools import SerperDevTool
+from researchCache import ResearchCache
+from researchPrefetch import DeveloperDetector, PrefetchScheduler
+from crewFactory import WarmPool
+from tracing import shared_tracer, instrument_crewai, usage_snapshot, record_token_usage, load_spans, summarize, format_report
 
 load_dotenv()
 
@@ -26,134 +25,357 @@ serper_key = os.getenv("SERPER_API_KEY")
 if not serper_key:
     logger.warning("SERPER_API_KEY not found - search functionality may be limited")
 
-# --- LLMs ---
-llm = LLM(
-    model="gemini/gemini-2.5-flash",
-    api_key=os.getenv("GOOGLE_API_KEY")
-)
+# Every turn is traced (stages, agents, tools, LLM calls) to TRACE_PATH;
+# `python tracing.py` prints p50/p95 per span. crewai's events are hooked up
+# when the first crew is built.
+tracer = shared_tracer()
+
+# Streaming mode speaks the answer sentence by sentence while it is still being generated
+STREAMING = os.getenv("VOICE_STREAMING", "0") == "1"
+
+# Crews kept prebuilt per kind (research, answer, streaming)
+POOL_SIZE = int(os.getenv("CREW_POOL_SIZE", "1"))
 
 
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning)
 
 
+# Importing this module stays cheap: crewai, the search tool, gTTS and the audio
+# stack are imported by the functions that need them, so a text-only worker never
+# loads TTS/STT and crews are only built when first used (or by warm_up()).
+
+# --- LLMs ---
+def build_llm(stream: bool = False):
+    """Gemini behind the response cache: identical prompts (same model, messages and
+    sampling params) are answered from disk instead of calling the model again."""
+    from crewai import LLM
+    from llmCache import CachedLLM
+
+    return CachedLLM(LLM(
+        model="gemini/gemini-2.5-flash",
+        api_key=os.getenv("GOOGLE_API_KEY"),
+        stream=stream
+    ))
+
+
 # --- Custom Tool (TTS) ---
-@tool("Text to Speech Tool")
-def text_to_speech_tool(text: str) -> str:
-    """Convert text to speech and save as high-quality MP3 file with natural voice settings. Returns file path."""
-    output_path = os.path.join(tempfile.gettempdir(), f"response_{hash(text)}.mp3")
+# Answers are split into sentences that are synthesized in parallel and stitched
+# back together, so a long answer takes about as long as its longest sentence.
+# Both sentences and whole answers are cached on disk (TTS_BACKEND picks gtts,
+# espeak or stub).
+def synthesize_speech(text: str) -> str:
+    """Synthesize text to a cached audio file and return its path."""
+    from ttsEngine import shared_tts_engine
+
+    tts_engine = shared_tts_engine()
     # Use US English accent for more natural sound, normal speed
-    tts = gTTS(text=text, lang="en", tld="us", slow=False)
-    tts.save(output_path)
+    with tracer.span("tts", "stage", chars=len(text)):
+        output_path = tts_engine.synthesize(text, lang="en", tld="us", slow=False)
+    logger.info(f"TTS cache stats: {tts_engine.stats()}")
     return output_path
 
-# --- STT Function ---
-def listen_for_query():
-    """Listen for user voice input and return transcribed text."""
-    recognizer = sr.Recognizer()
-    with sr.Microphone() as source:
-        print("Listening for your query...")
-        try:
-            audio = recognizer.listen(source, timeout=5)
-            query = recognizer.recognize_google(audio)
-            print(f"You said: {query}")
-            return query
-        except sr.WaitTimeoutError:
-            print("No speech detected. Listening again...")
-            return None
-        except sr.UnknownValueError:
-            print("Could not understand audio. Please try again.")
-            return None
-        except sr.RequestError:
-            print("Speech recognition service unavailable.")
-            return None
-
-# --- Tools ---
-search_tool = SerperDevTool(api_key=os.getenv("SERPER_API_KEY"))
-
-# instantiate decorated tool properly
-tts_tool = text_to_speech_tool  
-
-# --- Agents ---
-market_researcher = Agent(
-    role="Senior Real Estate Market Analyst",
-    goal="Conduct comprehensive research on {developer_name}, including their portfolio of projects, market reputation, financial performance, and competitive positioning in the real estate industry.",
-    backstory="A seasoned real estate analyst with over 15 years of experience in market research, specializing in developer profiling, project analysis, and industry trends. Expert in synthesizing data from multiple sources to provide actionable insights.",
-    llm=llm,
-    tools=[search_tool],
-    verbose=True,
-    memory=False
-)
-
-property_advisor = Agent(
-    role="Friendly Real Estate Consultant",
-    goal="Act as a human-like assistant answering customer questions about {developer_name} properties in a natural, conversational manner, providing helpful information based on research.",
-    backstory="A warm, experienced real estate professional who speaks directly to customers like a trusted friend or advisor. Specializes in giving straightforward, personalized answers that sound natural and human, avoiding jargon while being informative and engaging.",
-    llm=llm,
-    verbose=True,
-    memory=False
-)
-
-speech_generator = Agent(
-    role="Professional Voice Synthesizer",
-    goal="Transform written content into high-quality, natural-sounding speech that maintains the original meaning while optimizing for listener engagement and clarity.",
-    backstory="An AI specialist in natural language processing and voice synthesis, with expertise in creating human-like audio content. Focuses on pacing, intonation, and pronunciation to deliver professional-grade audio experiences.",
-    llm=llm,
-    tools=[tts_tool],
-    verbose=True,
-    memory=False
-)
-
-# --- Tasks ---
-research_task = Task(
-    description="Perform in-depth research on {developer_name} by searching reliable sources for information about their company history, current projects, completed developments, market reputation, financial stability, and competitive advantages. Focus on recent news, awards, and customer reviews.",
-    expected_output="A comprehensive bullet-point list covering: company overview, key projects (ongoing and completed), market positioning, financial health indicators, and notable achievements or controversies.",
-    tools=[search_tool],
-    agent=market_researcher,
-)
-
-answer_task = Task(
-    description="Using the research insights about {developer_name}, provide a direct, human-like response to '{user_query}' as if you are a knowledgeable real estate consultant speaking to a potential customer. Be conversational, friendly, and focus only on answering the specific question asked.",
-    expected_output="A natural, spoken-style response of 2-3 paragraphs that directly addresses the user's question with relevant information from research. Use contractions, personal language, and maintain a helpful, professional tone like a human assistant would.",
-    agent=property_advisor,
-)
-
-speech_task = Task(
-    description="Take the final text response and convert it into a high-quality audio file using text-to-speech technology. Optimize the speech for natural pacing, clear pronunciation, and engaging delivery that sounds human-like and professional.",
-    expected_output="Full path to the generated MP3 audio file containing the spoken version of the text response.",
-    tools=[tts_tool],
-    agent=speech_generator,
-)
-
-# --- Crew ---
-crew = Crew(
-    agents=[market_researcher, property_advisor, speech_generator],
-    tasks=[research_task, answer_task, speech_task],
-    process=Process.sequential,
-    memory=False,
-    verbose=False
-)
+# --- STT ---
+# One capture pipeline for the whole session: the microphone stays open and keeps
+# listening while the crew runs. Talking over an answer cuts its playback short
+# (use headphones, or VOICE_BARGE_IN=0, if the speakers trigger it).
+BARGE_IN = os.getenv("VOICE_BARGE_IN", "1") == "1"
+current_player = None
+
+def barge_in():
+    """Stop the answer being spoken as soon as the user starts talking."""
+    if BARGE_IN and current_player is not None:
+        current_player.cancel()
+
+def create_listener(on_partial=None):
+    """ContinuousListener on the microphone (or VOICE_INPUT_FILE) using the STT_BACKEND recognizer.
+
+    on_partial(text) gets partial transcripts while the user is still talking
+    (recognizers with partial support only: vosk, transcript)."""
+    from voiceInput import ContinuousListener, make_recognizer, make_source
+
+    recognizer = make_recognizer()
+
+    def recognize(audio):
+        seconds = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        with tracer.span("stt", "stage", audio_seconds=round(seconds, 3)) as span:
+            text = recognizer(audio)
+            span.set(chars=len(text or ""))
+            return text
+
+    if hasattr(recognizer, "partial"):
+        recognize.partial = recognizer.partial
+    return ContinuousListener(make_source(), recognize, on_speech_start=barge_in, on_partial=on_partial)
+
+def play_audio(path: str) -> None:
+    from speechStream import playsound
+
+    with tracer.span("playback", "stage"):
+        playsound(path)
+
+# --- Crews ---
+# Research depends only on developer_name, so it runs in its own crew and is cached
+# per developer; the answer crews receive it through the {research} input.
+def build_research_crew(llm=None):
+    """Crew with the market researcher, searching the web and the local knowledge index."""
+    from crewai import Agent, Task, Crew, Process
+    from searchCache import CachedSerperDevTool
+    from retrievalIndex import load_search_tool
+
+    instrument_crewai(tracer)
+    llm = llm or build_llm()
+
+    # Repeated searches are answered from a persistent cache (SEARCH_CACHE_MODE=replay runs offline)
+    search_tool = CachedSerperDevTool(api_key=os.getenv("SERPER_API_KEY"))
+
+    # Local top-k search over playbooks and past research (empty until the index is built)
+    knowledge_tools = load_search_tool()
+
+    market_researcher = Agent(
+        role="Senior Real Estate Market Analyst",
+        goal="Conduct comprehensive research on {developer_name}, including their portfolio of projects, market reputation, financial performance, and competitive positioning in the real estate industry.",
+        backstory="A seasoned real estate analyst with over 15 years of experience in market research, specializing in developer profiling, project analysis, and industry trends. Expert in synthesizing data from multiple sources to provide actionable insights.",
+        llm=llm,
+        tools=[search_tool] + knowledge_tools,
+        verbose=True,
+        memory=False
+    )
+
+    research_task = Task(
+        description="Perform in-depth research on {developer_name} by searching reliable sources for information about their company history, current projects, completed developments, market reputation, financial stability, and competitive advantages. Focus on recent news, awards, and customer reviews.",
+        expected_output="A comprehensive bullet-point list covering: company overview, key projects (ongoing and completed), market positioning, financial health indicators, and notable achievements or controversies.",
+        tools=[search_tool] + knowledge_tools,
+        agent=market_researcher,
+    )
+
+    return Crew(
+        agents=[market_researcher],
+        tasks=[research_task],
+        process=Process.sequential,
+        memory=False,
+        verbose=False
+    )
+
+def build_answer_crew(llm=None, speech: bool = True, synthesize=None):
+    """Crew with the property advisor answering {user_query} from {research}.
+
+    With speech=True the answer goes through the speech stage: result.pydantic is
+    an AudioArtifact and result.raw its path. With speech=False (streaming mode) it stays text and the LLM
+    streams, so it can be spoken sentence by sentence while it is generated.
+    """
+    from crewai import Agent, Task, Crew, Process
+
+    instrument_crewai(tracer)
+    llm = llm or build_llm(stream=not speech)
+
+    property_advisor = Agent(
+        role="Friendly Real Estate Consultant",
+        goal="Act as a human-like assistant answering customer questions about {developer_name} properties in a natural, conversational manner, providing helpful information based on research.",
+        backstory="A warm, experienced real estate professional who speaks directly to customers like a trusted friend or advisor. Specializes in giving straightforward, personalized answers that sound natural and human, avoiding jargon while being informative and engaging.",
+        llm=llm,
+        verbose=True,
+        memory=False
+    )
+
+    answer_task = Task(
+        description="Using the research insights about {developer_name} below, provide a direct, human-like response to '{user_query}' as if you are a knowledgeable real estate consultant speaking to a potential customer. Be conversational, friendly, and focus only on answering the specific question asked. Use the conversation so far to resolve follow-ups such as 'those' or 'their other projects', without repeating what was already said.\n\nConversation so far:\n{conversation}\n\nResearch insights:\n{research}",
+        expected_output="A natural, spoken-style response of 2-3 paragraphs that directly addresses the user's question with relevant information from research. Use contractions, personal language, and maintain a helpful, professional tone like a human assistant would.",
+        agent=property_advisor,
+    )
+
+    callbacks = []
+    if speech:
+        from speechStage import SpeechStage
+        # Speech is a deterministic post-processing stage rather than an agent task: the
+        # answer text goes straight to TTS without an extra LLM round trip.
+        callbacks.append(SpeechStage(synthesize or synthesize_speech))
+
+    return Crew(
+        agents=[property_advisor],
+        tasks=[answer_task],
+        process=Process.sequential,
+        memory=False,
+        verbose=False,
+        after_kickoff_callbacks=callbacks
+    )
+
+# --- Warm pools ---
+# Each pool hands a prebuilt crew to one caller at a time, so concurrent turns never
+# share agent or task state and no turn pays for building a crew once warm.
+_pools = {}
+_pools_lock = threading.Lock()
+
+POOL_FACTORIES = {
+    "research": (build_research_crew, {}),
+    "answer": (build_answer_crew, {}),
+    "streaming": (build_answer_crew, {"speech": False}),
+}
+
+def crew_pool(kind: str) -> WarmPool:
+    """WarmPool of "research", "answer" or "streaming" crews, created on first use."""
+    with _pools_lock:
+        if kind not in _pools:
+            factory, kwargs = POOL_FACTORIES[kind]
+            _pools[kind] = WarmPool(factory, size=POOL_SIZE, **kwargs)
+        return _pools[kind]
+
+def warm_up(wait: bool = False) -> None:
+    """Start building the crews this mode needs in the background (or wait for them)."""
+    kinds = ("research", "streaming") if STREAMING else ("research", "answer")
+    pools = [crew_pool(kind) for kind in kinds]
+    if wait:
+        for pool in pools:
+            pool.wait_ready()
+
+# --- Research cache ---
+research_cache = ResearchCache()
+
+def research_developer(developer_name: str) -> dict:
+    """Run the market researcher for developer_name, bypassing the cache; returns a ResearchFacts dump."""
+    from schemas import ResearchFacts
+
+    # A leased crew keeps background refreshes from sharing agent state with a running turn
+    with crew_pool("research").lease() as research_crew:
+        raw = research_crew.kickoff(inputs={"developer_name": developer_name}).raw
+    # Cached as a compact list of facts rather than the report text
+    return ResearchFacts.from_text(developer_name, raw).model_dump(exclude_defaults=True)
+
+# --- Developers and prefetch ---
+DEFAULT_DEVELOPER = "Emaar Properties"
+developer_detector = DeveloperDetector()
+
+def detect_developer(text: str, default: str = DEFAULT_DEVELOPER) -> str:
+    """The developer text asks about, or default if it names none."""
+    return developer_detector.detect(text) or default
+
+# Research for a developer starts as soon as it is named in a partial transcript,
+# and the most requested developers are kept warm while the assistant is idle.
+prefetcher = PrefetchScheduler(research_cache, research_developer, developer_detector)
+
+# --- Pipeline ---
+
+def build_inputs(user_query: str, developer_name: str = DEFAULT_DEVELOPER, conversation=None) -> dict:
+    """Kickoff inputs for the answer crews, with cached research compacted to the query.
+
+    With a conversation, the answer task gets the conversation so far and only the
+    research facts it has not been given earlier in the session.
+    """
+    from contextCompaction import estimate_tokens, shared_compactor
+    from conversationStore import START_OF_CONVERSATION
+    from schemas import ResearchFacts
+
+    with tracer.span("research", "stage", developer_name=developer_name) as span:
+        span.set(cache_age_seconds=research_cache.age(developer_name))
+        facts = ResearchFacts.load(research_cache.get_or_research(developer_name, research_developer), developer_name)
+        span.set(facts=len(facts.facts))
+        research = facts.to_text()
+    # Only the facts relevant to this question go into the answer prompt
+    with tracer.span("compact", "stage") as span:
+        compacted = shared_compactor().compact(research, user_query)
+        if conversation is not None:
+            compacted = conversation.research_delta(compacted)
+        span.set(tokens_in=estimate_tokens(research), tokens_out=estimate_tokens(compacted),
+                 conversation_turns=len(conversation) if conversation is not None else None)
+    return {
+        "developer_name": developer_name,
+        "user_query": user_query,
+        "research": compacted,
+        "conversation": conversation.context() if conversation is not None else START_OF_CONVERSATION
+    }
+
+def run_answer(answer_crew, inputs: dict):
+    """Kick off answer_crew inside an "answer" span carrying its token usage."""
+    with tracer.span("answer", "stage") as span:
+        # Pooled crews keep their LLMs, whose usage counters never reset
+        baseline = usage_snapshot(answer_crew)
+        result = answer_crew.kickoff(inputs=inputs)
+        record_token_usage(span, result, baseline)
+        return result
+
+# --- Conversations ---
+# Follow-up questions in a session ("what about their Downtown projects?") reuse the
+# conversation so far instead of starting over; sessions persist in CONVERSATION_DIR.
+_conversations = None
+_conversations_lock = threading.Lock()
+
+def get_conversation(session_id: str):
+    global _conversations
+    with _conversations_lock:
+        if _conversations is None:
+            from conversationStore import ConversationStore
+            _conversations = ConversationStore()
+    return _conversations.get(session_id)
+
+def answer_query(user_query: str, developer_name: str = None, session_id: str = None):
+    """Answer one query end to end and return the CrewOutput (result.pydantic is the AudioArtifact).
+
+    Each call leases its own crew from the answer pool, so concurrent callers never
+    share agent or task state. Calls with the same session_id share a conversation.
+    Without developer_name, the developer is detected in the query.
+    """
+    developer_name = developer_name or detect_developer(user_query)
+    conversation = get_conversation(session_id) if session_id else None
+    inputs = build_inputs(user_query, developer_name, conversation)
+    with crew_pool("answer").lease() as answer_crew:
+        result = run_answer(answer_crew, inputs)
+    if conversation is not None:
+        conversation.record_turn(user_query, result.pydantic.text, inputs["research"])
+    return result
+
+def answer_query_streaming(user_query: str, player, developer_name: str = None, session_id: str = None):
+    """Answer one query while player speaks it sentence by sentence; returns the CrewOutput."""
+    from speechStream import speak_streaming
+
+    developer_name = developer_name or detect_developer(user_query)
+    conversation = get_conversation(session_id) if session_id else None
+    inputs = build_inputs(user_query, developer_name, conversation)
+    with crew_pool("streaming").lease() as streaming_crew:
+        result = speak_streaming(lambda: run_answer(streaming_crew, inputs), synthesize_speech, player=player)
+    if conversation is not None:
+        conversation.record_turn(user_query, result.raw, inputs["research"])
+    return result
 
 # --- Run ---
-if __name__ == "__main__":
+def run_voice_assistant():
+    """Listen, answer and speak until the user says exit."""
+    global current_player
+    from speechStream import SpeechPlayer
+
+    warm_up()
+    session_id = os.getenv("VOICE_SESSION_ID") or f"voice-{int(time.time())}"
+    # Follow-ups that name no developer ("what about their Downtown projects?") stay on the last one
+    developer_name = DEFAULT_DEVELOPER
     print("Starting live voice assistant. Say 'exit' to quit.")
-    while True:
-        user_query = listen_for_query()
-        if user_query:
+    with prefetcher, create_listener(on_partial=prefetcher.on_partial) as listener:
+        print("Listening for your query...")
+        for user_query in listener:
+            print(f"You said: {user_query}")
             if user_query.lower() in ['exit', 'quit', 'stop']:
                 print("Exiting...")
                 break
-            inputs = {
-                "developer_name": "Emaar Properties",
-                "user_query": user_query
-            }
+            developer_name = detect_developer(user_query, default=developer_name)
+            prefetcher.record_request(developer_name)
             try:
                 logger.info("Starting CrewAI execution")
-                result = crew.kickoff(inputs=inputs)
-                logger.info(f"Crew execution completed. Playing audio...")
-                playsound(result)
+                with prefetcher.busy(), tracer.span("turn", "turn", user_query=user_query, streaming=STREAMING,
+                                                     developer_name=developer_name):
+                    if STREAMING:
+                        current_player = SpeechPlayer(synthesize_speech, play=play_audio)
+                        answer_query_streaming(user_query, current_player, developer_name, session_id=session_id)
+                        logger.info("Crew execution completed.")
+                    else:
+                        result = answer_query(user_query, developer_name, session_id=session_id)
+                        logger.info(f"Crew execution completed. Playing audio...")
+                        # The speech stage already synthesized the answer
+                        current_player = SpeechPlayer(lambda path: path, play=play_audio)
+                        current_player.say(result.pydantic.path)
+                        current_player.close()
             except Exception as e:
                 logger.error(f"Error during crew execution: {str(e)}")
                 print(f"Error: {e}")
-        else:
-            continue
\ No newline at end of file
+        logger.info(f"Listener stats: {listener.stats()}")
+        logger.info(f"Prefetch stats: {prefetcher.stats()}")
+    print(format_report(summarize(load_spans(tracer.path))))
+
+if __name__ == "__main__":
+    run_voice_assistant()
@@ -0,0 +1,189 @@
+import os
+import sys
+import time
+import logging
+import threading
+import importlib.util
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# name -> "script.py:function" (relative to the repository root); scripts are
+# imported only when a crew is first built
+FACTORIES = {
+    "voice.research": "crew.py:build_research_crew",
+    "voice.answer": "crew.py:build_answer_crew",
+    "voice.noloop": "voiceResponses/noLoopRealState.py:build_crew",
+    "support.outreach": "customerSupportAgent/customerSupportAgent.py:build_crew",
+    "content.blog": "multiAgentLocalOllamaDockerCrewAI.py:build_crew",
+    "ollama.mars": "LocalOllamaDockerCrewAI.py:build_crew",
+    "openai.mars": "myFristResearcherOpenAIRemote.py:build_crew",
+}
+
+_scripts_lock = threading.RLock()
+
+
+def load_script(path: str):
+    """Import a repository script by path, once, the way running it directly would.
+
+    Its directory goes on sys.path (so it finds its sibling modules) and it is
+    registered under its file name, so a later `import crew` gets the same module.
+    """
+    path = os.path.join(REPO_DIR, path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    with _scripts_lock:
+        module = sys.modules.get(name)
+        if module is not None and os.path.abspath(getattr(module, "__file__", "") or "") == path:
+            return module
+        for directory in (REPO_DIR, os.path.dirname(path)):
+            if directory not in sys.path:
+                sys.path.insert(0, directory)
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[name]
+            raise
+        return module
+
+
+def register(name: str, factory) -> None:
+    """Add a factory: a callable returning a Crew, or a "script.py:function" path to one."""
+    FACTORIES[name] = factory
+
+
+def get_factory(name: str):
+    factory = FACTORIES[name]
+    if isinstance(factory, str):
+        script, function_name = factory.split(":")
+        factory = getattr(load_script(script), function_name)
+    return factory
+
+
+def build(name: str, **kwargs):
+    """Build a fresh crew from the named factory; kwargs go to the factory (e.g. llm=...)."""
+    started = time.perf_counter()
+    crew = get_factory(name)(**kwargs)
+    logger.debug(f"Built {name} in {time.perf_counter() - started:.3f}s")
+    return crew
+
+
+class WarmPool:
+    """Prebuilt crews handed out to one caller at a time.
+
+    size crews are built in the background as soon as the pool is created, so
+    the first requests after a worker starts do not pay for imports and crew
+    construction. acquire() takes an idle crew, or builds one if none is idle
+    and fewer than max_size exist, or waits for a release otherwise. A crew is
+    reused for later kickoffs once it is released.
+
+        pool = WarmPool("voice.answer", size=2)
+        with pool.lease() as crew:
+            result = crew.kickoff(inputs=inputs)
+    """
+
+    def __init__(self, factory, size: int = 1, max_size: int = None, **kwargs):
+        self.factory = factory
+        self.size = size
+        self.max_size = max_size
+        self.kwargs = kwargs
+        self._idle = []
+        self._built = 0
+        self._building = 0
+        self._hits = 0
+        self._misses = 0
+        self._build_seconds = 0.0
+        self._condition = threading.Condition()
+        self._ready = threading.Event()
+        threading.Thread(target=self._warm, name="warm-pool", daemon=True).start()
+
+    def _build(self):
+        started = time.perf_counter()
+        if callable(self.factory):
+            crew = self.factory(**self.kwargs)
+        else:
+            crew = build(self.factory, **self.kwargs)
+        with self._condition:
+            self._build_seconds += time.perf_counter() - started
+        return crew
+
+    def _warm(self):
+        try:
+            for _ in range(self.size):
+                with self._condition:
+                    if self._built + self._building >= self.size:
+                        break
+                    self._building += 1
+                try:
+                    crew = self._build()
+                finally:
+                    with self._condition:
+                        self._building -= 1
+                with self._condition:
+                    self._built += 1
+                    self._idle.append(crew)
+                    self._condition.notify()
+        except Exception as e:
+            logger.error(f"Warming {self.factory} failed: {e}")
+        finally:
+            with self._condition:
+                self._ready.set()
+                self._condition.notify_all()
+
+    def wait_ready(self, timeout: float = None) -> bool:
+        """Block until the initial crews have been built."""
+        return self._ready.wait(timeout)
+
+    def acquire(self, timeout: float = None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._idle:
+                    self._hits += 1
+                    return self._idle.pop()
+                # Crews still being warmed will arrive shortly; build extra ones only after that
+                warming = not self._ready.is_set()
+                if not warming and (self.max_size is None or self._built + self._building < self.max_size):
+                    self._misses += 1
+                    self._building += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No crew available from {self.factory} within {timeout}s")
+                self._condition.wait(remaining)
+        try:
+            crew = self._build()
+        finally:
+            with self._condition:
+                self._building -= 1
+                self._condition.notify()
+        with self._condition:
+            self._built += 1
+        return crew
+
+    def release(self, crew) -> None:
+        with self._condition:
+            self._idle.append(crew)
+            self._condition.notify()
+
+    @contextmanager
+    def lease(self, timeout: float = None):
+        crew = self.acquire(timeout)
+        try:
+            yield crew
+        finally:
+            self.release(crew)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "built": self._built,
+                "idle": len(self._idle),
+                "hits": self._hits,
+                "misses": self._misses,
+                "mean_build_seconds": self._build_seconds / self._built if self._built else 0.0,
+            }
@@ -0,0 +1,257 @@
+import sys
+import time
+import queue
+import asyncio
+import logging
+import threading
+from contextlib import ExitStack, contextmanager
+
+try:
+    from crewai.events import (
+        crewai_event_bus, LLMStreamChunkEvent, TaskStartedEvent, TaskCompletedEvent, TaskFailedEvent,
+    )
+except ImportError:  # older crewai releases
+    from crewai.utilities.events import (
+        crewai_event_bus, LLMStreamChunkEvent, TaskStartedEvent, TaskCompletedEvent, TaskFailedEvent,
+    )
+
+logger = logging.getLogger(__name__)
+
+
+# --- Event bus fan-out ---
+# Handlers are registered once; kickoffs subscribe and unsubscribe sinks around their run.
+_sinks = []
+_sinks_lock = threading.Lock()
+
+
+def _publish(kind: str, event) -> None:
+    with _sinks_lock:
+        sinks = list(_sinks)
+    for sink in sinks:
+        sink(kind, event)
+
+
+@crewai_event_bus.on(LLMStreamChunkEvent)
+def _on_chunk(source, event):
+    _publish("token", event)
+
+
+@crewai_event_bus.on(TaskStartedEvent)
+def _on_task_started(source, event):
+    _publish("task_started", event)
+
+
+@crewai_event_bus.on(TaskCompletedEvent)
+def _on_task_completed(source, event):
+    _publish("task_completed", event)
+
+
+@crewai_event_bus.on(TaskFailedEvent)
+def _on_task_failed(source, event):
+    _publish("task_failed", event)
+
+
+@contextmanager
+def subscribe(sink):
+    """Call sink(kind, event) for every token/task event while the block runs."""
+    with _sinks_lock:
+        _sinks.append(sink)
+    try:
+        yield
+    finally:
+        with _sinks_lock:
+            _sinks.remove(sink)
+
+
+@contextmanager
+def stream_chunks_to(sink):
+    """Forward every streamed LLM chunk to sink(chunk) while the block runs."""
+    def on_event(kind, event):
+        if kind == "token":
+            sink(event.chunk)
+
+    with subscribe(on_event):
+        yield
+
+
+# --- Streaming kickoff ---
+def _streamable_llms(llm):
+    """The LLM and any LLMs it wraps (response caches, routers)."""
+    seen = []
+    pending = [llm]
+    while pending:
+        current = pending.pop()
+        if current is None or any(current is other for other in seen):
+            continue
+        seen.append(current)
+        pending += [getattr(current, name, None) for name in ("llm", "local", "remote")]
+    return [current for current in seen if hasattr(current, "stream")]
+
+
+@contextmanager
+def streaming_enabled(crew):
+    """Stream every LLM used by the crew's agents, for calls made in this context only.
+
+    Uses crewai's call-scoped override instead of setting llm.stream, since the
+    same LLM objects may serve other kickoffs at the same time.
+    """
+    from crewai.llms.base_llm import call_stream_override
+
+    with ExitStack() as stack:
+        for agent in crew.agents:
+            for llm in _streamable_llms(agent.llm):
+                stack.enter_context(call_stream_override(llm, True))
+        yield
+
+
+def _event_dict(kind: str, event) -> dict:
+    if kind == "token":
+        return {"type": "token", "text": event.chunk, "agent": getattr(event, "agent_role", None)}
+    task = getattr(event, "task", None)
+    name = getattr(task, "name", None) or getattr(task, "description", "") or getattr(event, "task_name", "")
+    agent = getattr(getattr(task, "agent", None), "role", None) or getattr(event, "agent_role", None)
+    item = {"type": kind, "task": name, "agent": agent}
+    if kind == "task_completed":
+        item["output"] = getattr(event.output, "raw", event.output)
+    elif kind == "task_failed":
+        item["error"] = getattr(event, "error", None)
+    return item
+
+
+def _belongs_to(crew, event) -> bool:
+    """Drop events from other crews running at the same time, when the event says who sent it."""
+    agent_ids = {str(agent.id) for agent in crew.agents}
+    agent_id = getattr(event, "agent_id", None)
+    task = getattr(event, "task", None)
+    if agent_id:
+        return str(agent_id) in agent_ids
+    if task is not None:
+        return any(task is crew_task for crew_task in crew.tasks)
+    return True
+
+
+def iter_kickoff(crew, inputs: dict = None):
+    """Kick off crew in a background thread and yield its events as they happen.
+
+    Yields dicts with a "type" of task_started, token, task_completed or
+    task_failed, and ends with {"type": "crew_completed", "result": CrewOutput}.
+    If the kickoff raises, the exception is re-raised after the last event.
+    """
+    events = queue.Queue()
+    done = object()
+    outcome = {}
+
+    def on_event(kind, event):
+        if _belongs_to(crew, event):
+            events.put(_event_dict(kind, event))
+
+    def run():
+        try:
+            with streaming_enabled(crew):
+                outcome["result"] = crew.kickoff(inputs=inputs)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            # Task events are dispatched on the bus's thread pool; let them land first
+            flush = getattr(crewai_event_bus, "flush", None)
+            if flush:
+                flush()
+            events.put(done)
+
+    with subscribe(on_event):
+        threading.Thread(target=run, daemon=True).start()
+        while True:
+            item = events.get()
+            if item is done:
+                break
+            yield item
+
+    if "error" in outcome:
+        raise outcome["error"]
+    yield {"type": "crew_completed", "result": outcome["result"]}
+
+
+async def stream_kickoff(crew, inputs: dict = None):
+    """Async version of iter_kickoff, for use with `async for` in notebooks and servers."""
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    done = object()
+
+    def pump():
+        try:
+            for item in iter_kickoff(crew, inputs):
+                loop.call_soon_threadsafe(events.put_nowait, item)
+        except BaseException as e:
+            loop.call_soon_threadsafe(events.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(events.put_nowait, done)
+
+    threading.Thread(target=pump, daemon=True).start()
+    while True:
+        item = await events.get()
+        if item is done:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+
+# --- Rendering ---
+def render_kickoff(crew, inputs: dict = None, refresh_seconds: float = 0.2):
+    """Kick off crew and show its output as it streams; returns the CrewOutput.
+
+    In Jupyter the output is a Markdown cell updated in place at most every
+    refresh_seconds. Elsewhere tokens are printed to stdout as they arrive.
+    """
+    try:
+        from IPython import get_ipython
+        in_notebook = get_ipython() is not None
+    except ImportError:
+        in_notebook = False
+    if not in_notebook:
+        return _print_kickoff(crew, inputs)
+
+    from IPython.display import Markdown, display
+
+    handle = display(Markdown("_Starting crew..._"), display_id=True)
+    sections = []
+    last_update = 0.0
+    result = None
+    for item in iter_kickoff(crew, inputs):
+        if item["type"] == "task_started":
+            sections.append([f"### {item['agent'] or 'Task'}\n\n", ""])
+        elif item["type"] == "token":
+            if not sections:
+                sections.append(["", ""])
+            sections[-1][1] += item["text"]
+        elif item["type"] == "task_completed" and sections:
+            # Replace the raw stream (Thought/Action noise) with the task's final output
+            sections[-1][1] = str(item["output"])
+        elif item["type"] == "crew_completed":
+            result = item["result"]
+        now = time.monotonic()
+        if now - last_update >= refresh_seconds or item["type"] != "token":
+            handle.update(Markdown("\n\n".join(title + body for title, body in sections)))
+            last_update = now
+    handle.update(Markdown(result.raw))
+    return result
+
+
+def _print_kickoff(crew, inputs: dict = None):
+    result = None
+    streamed = False
+    for item in iter_kickoff(crew, inputs):
+        if item["type"] == "task_started":
+            print(f"\n=== {item['agent'] or 'Task'} ===", flush=True)
+            streamed = False
+        elif item["type"] == "token":
+            sys.stdout.write(item["text"])
+            sys.stdout.flush()
+            streamed = True
+        elif item["type"] == "task_completed" and not streamed:
+            # Nothing was streamed (e.g. a cached response), show the final output instead
+            print(item["output"], flush=True)
+        elif item["type"] == "crew_completed":
+            result = item["result"]
+    print()
+    return result
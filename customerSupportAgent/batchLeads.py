@@ -0,0 +1,151 @@
+"""Batch lead processing for the customer-support crew.
+
+Reads leads from a CSV or JSONL file and runs lead_profiling_task ->
+personalized_outreach_task for each of them on a worker pool. Every result is
+appended to a JSONL file as soon as its lead finishes. Re-running with the same
+output file skips leads that already succeeded, so a crashed batch resumes where
+it stopped.
+
+    python batchLeads.py leads.csv results.jsonl --workers 4
+"""
+import os
+import csv
+import json
+import time
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+LEAD_FIELDS = ["lead_name", "industry", "key_decision_maker", "position", "milestone"]
+
+
+def _parse_line(line: str):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        # Kept as a row so it is reported as an error instead of stopping the batch
+        return {"_line": line.strip(), "_error": f"invalid JSON: {e}"}
+
+
+def read_leads(path: str) -> list:
+    """Load leads from a .csv (header row) or .jsonl (one object per line) file."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            return [dict(row) for row in csv.DictReader(f)]
+        return [_parse_line(line) for line in f if line.strip()]
+
+
+def lead_id(lead, row: int) -> str:
+    """The lead's id or name, or its 1-based row in the input file when it has neither."""
+    if isinstance(lead, dict) and (lead.get("id") or lead.get("lead_name")):
+        return str(lead.get("id") or lead.get("lead_name"))
+    return f"row-{row}"
+
+
+def completed_ids(output_path: str) -> set:
+    """Ids of leads already processed successfully in a previous run."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A crash can leave a truncated last line behind
+                continue
+            if record.get("status") == "ok":
+                done.add(record["id"])
+    return done
+
+
+class ResultWriter:
+    """Append one JSON line per finished lead, flushed to disk immediately."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def process_lead(crew, lead: dict, prepare=None, row: int = 0) -> dict:
+    """Run the crew for one lead and return its output record.
+
+    prepare, if given, turns the lead's fields into the final kickoff inputs.
+    Invalid rows get a record with status "error" instead of raising.
+    """
+    started = time.perf_counter()
+    record = {"id": lead_id(lead, row), "lead": lead}
+    if not isinstance(lead, dict):
+        record.update(status="error", error=f"expected an object, got {type(lead).__name__}")
+        return record
+    if "_error" in lead:
+        record.update(status="error", error=lead["_error"])
+        return record
+    missing = [field for field in LEAD_FIELDS if not lead.get(field)]
+    if missing:
+        record.update(status="error", error=f"missing fields: {', '.join(missing)}")
+        return record
+    try:
+        # Each lead gets its own copy so workers never share agent or task state
+        inputs = {field: lead[field] for field in LEAD_FIELDS}
+        result = crew.copy().kickoff(inputs=prepare(inputs) if prepare else inputs)
+        profile = result.tasks_output[0]
+        record.update(
+            status="ok",
+            # The structured LeadProfile when the crew produces one
+            profile=profile.pydantic.model_dump(exclude_defaults=True) if profile.pydantic else profile.raw,
+            outreach=result.raw,
+        )
+    except Exception as e:
+        logger.error(f"Lead {record['id']} failed: {e}")
+        record.update(status="error", error=str(e))
+    record["seconds"] = round(time.perf_counter() - started, 2)
+    return record
+
+
+def run_batch(crew, input_path: str, output_path: str, workers: int = 4, prepare=None) -> dict:
+    """Process every lead not yet in output_path and return ok/error/skipped counts."""
+    leads = read_leads(input_path)
+    done = completed_ids(output_path)
+    todo = [(row, lead) for row, lead in enumerate(leads, 1) if lead_id(lead, row) not in done]
+    logger.info(f"{len(todo)} leads to process, {len(leads) - len(todo)} already done")
+
+    counts = {"ok": 0, "error": 0, "skipped": len(leads) - len(todo)}
+    writer = ResultWriter(output_path)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(process_lead, crew, lead, prepare, row) for row, lead in todo]
+            for future in as_completed(futures):
+                record = future.result()
+                writer.write(record)
+                counts[record["status"]] += 1
+                logger.info(f"Lead {record['id']}: {record['status']} ({sum(counts.values())}/{len(leads)})")
+    finally:
+        writer.close()
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the outreach crew over a file of leads.")
+    parser.add_argument("leads", help="CSV or JSONL file with " + ", ".join(LEAD_FIELDS))
+    parser.add_argument("output", help="JSONL file to append results to (also used to resume)")
+    parser.add_argument("--workers", type=int, default=4, help="number of leads processed in parallel")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    from customerSupportAgent import build_crew, prepare_inputs
+
+    print(run_batch(build_crew(), args.leads, args.output, args.workers, prepare_inputs))
@@ -1,7 +1,5 @@
-from crewai import Agent, Task, Crew
-from crewai.llm import LLM
-
 import os
+import sys
 os.environ["SERPER_API_KEY"] = "key"
 
 os.environ["OPENAI_API_KEY"] = "key"
@@ -9,165 +7,211 @@ os.environ["OPENAI_API_KEY"] = "key"
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning)
 
-# Tell CrewAI to use Ollama as backend
-ollama_llm = LLM(
-    model="ollama/llama3.1:latest",   # specify provider + model
-    base_url="http://host.docker.internal:11434" # point to your running Ollama server
-    #base_url="http://localhost:11434"
-)
-
-openai_llm = LLM(model="gpt-4o-mini")  # or gpt-4o
-
-sales_rep_agent = Agent(
-    role="Sales Representative",
-    goal="Identify high-value leads that match "
-         "our ideal customer profile",
-    backstory=(
-        "As a part of the dynamic sales team at CrewAI, "
-        "your mission is to scour "
-        "the digital landscape for potential leads. "
-        "Armed with cutting-edge tools "
-        "and a strategic mindset, you analyze data, "
-        "trends, and interactions to "
-        "unearth opportunities that others might overlook. "
-        "Your work is crucial in paving the way "
-        "for meaningful engagements and driving the company's growth."
-    ),
-     llm=openai_llm,
-    allow_delegation=True,
-    verbose=True
-)
-
-lead_sales_rep_agent = Agent(
-    role="Lead Sales Representative",
-    goal="Nurture leads with personalized, compelling communications",
-    backstory=(
-        "Within the vibrant ecosystem of CrewAI's sales department, "
-        "you stand out as the bridge between potential clients "
-        "and the solutions they need."
-        "By creating engaging, personalized messages, "
-        "you not only inform leads about our offerings "
-        "but also make them feel seen and heard."
-        "Your role is pivotal in converting interest "
-        "into action, guiding leads through the journey "
-        "from curiosity to commitment."
-    ),
-     llm=ollama_llm,
-    allow_delegation=True,
-    verbose=True
-)
-
-from crewai_tools import DirectoryReadTool, \
-                         FileReadTool, \
-                         SerperDevTool
-
-directory_read_tool = DirectoryReadTool(directory='./instructions')
-file_read_tool = FileReadTool()
-search_tool = SerperDevTool()
-
-
-from crewai.tools import tool  # import the decorator function
-
-@tool("sentiment_analysis")  # ✅ Correct
-def sentiment_analysis_tool(text: str) -> str:
-    """Analyzes the sentiment of text to ensure positive and engaging communication."""
-    
-    positive_words = ["good", "great", "awesome", "happy", "excellent", "positive"]
-    negative_words = ["bad", "sad", "terrible", "awful", "horrible", "negative"]
-    
-    score = 0
-    for word in text.lower().split():
-        if word in positive_words:
-            score += 1
-        elif word in negative_words:
-            score -= 1
-    
-    if score > 0:
-        return "positive"
-    elif score < 0:
-        return "negative"
-    else:
-        return "neutral"
-
-
-lead_profiling_task = Task(
-    description=(
-        "Conduct an in-depth analysis of {lead_name}, "
-        "a company in the {industry} sector "
-        "that recently showed interest in our solutions. "
-        "Utilize all available data sources "
-        "to compile a detailed profile, "
-        "focusing on key decision-makers, recent business "
-        "developments, and potential needs "
-        "that align with our offerings. "
-        "This task is crucial for tailoring "
-        "our engagement strategy effectively.\n"
-        "Don't make assumptions and "
-        "only use information you absolutely sure about."
-    ),
-    expected_output=(
-        "A comprehensive report on {lead_name}, "
-        "including company background, "
-        "key personnel, recent milestones, and identified needs. "
-        "Highlight potential areas where "
-        "our solutions can provide value, "
-        "and suggest personalized engagement strategies."
-    ),
-    tools=[directory_read_tool, file_read_tool, search_tool],
-    agent=sales_rep_agent,
-)
-
-personalized_outreach_task = Task(
-    description=(
-        "Using the insights gathered from "
-        "the lead profiling report on {lead_name}, "
-        "craft a personalized outreach campaign "
-        "aimed at {key_decision_maker}, "
-        "the {position} of {lead_name}. "
-        "The campaign should address their recent {milestone} "
-        "and how our solutions can support their goals. "
-        "Your communication must resonate "
-        "with {lead_name}'s company culture and values, "
-        "demonstrating a deep understanding of "
-        "their business and needs.\n"
-        "Don't make assumptions and only "
-        "use information you absolutely sure about."
-    ),
-    expected_output=(
-        "A series of personalized email drafts "
-        "tailored to {lead_name}, "
-        "specifically targeting {key_decision_maker}."
-        "Each draft should include "
-        "a compelling narrative that connects our solutions "
-        "with their recent achievements and future goals. "
-        "Ensure the tone is engaging, professional, "
-        "and aligned with {lead_name}'s corporate identity."
-    ),
-    tools=[sentiment_analysis_tool, search_tool],
-    agent=lead_sales_rep_agent,
-)
-
-crew = Crew(
-    agents=[sales_rep_agent, 
-            lead_sales_rep_agent],
-    
-    tasks=[lead_profiling_task, 
-           personalized_outreach_task],
-	
-    verbose=False,
-	memory=True
-)
-
-
-inputs = {
-    "lead_name": "DeepLearningAI",
-    "industry": "Online Learning Platform",
-    "key_decision_maker": "Andrew Ng",
-    "position": "CEO",
-    "milestone": "product launch"
-}
-
-result = crew.kickoff(inputs=inputs)
-
-from IPython.display import Markdown
-Markdown(result.raw)
+# Shared helpers (retrieval index, search cache, ...) live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# crewai, its tools and the LLM clients are imported inside the factories below,
+# so importing this module (e.g. for prepare_inputs) stays cheap.
+from instructionStore import InstructionStore
+from sentimentEngine import SentimentEngine
+
+# Playbooks from DataPrep.py are loaded once and picked per lead by industry,
+# instead of having the agent browse ./instructions with read tools on every run.
+instruction_store = InstructionStore('./instructions')
+
+# Lexicon is indexed once at startup (SENTIMENT_LEXICON points at a custom word list)
+sentiment_engine = SentimentEngine.from_env()
+
+
+def build_llm():
+    """Ollama/OpenAI router shared by both agents."""
+    from crewai.llm import LLM
+    from llmCache import CachedLLM
+    from modelRouter import RoutingLLM
+    from ollamaManager import managed_ollama_llm
+
+    # Tell CrewAI to use Ollama as backend
+    # (both models are wrapped in a response cache so re-runs over the same leads are free).
+    # The model is preloaded and kept resident, and calls queue for the server's parallel slots.
+    managed_llm = managed_ollama_llm(
+        model="ollama/llama3.1:latest",   # specify provider + model
+        base_url="http://host.docker.internal:11434" # point to your running Ollama server
+        #base_url="http://localhost:11434"
+    )
+    ollama_llm = CachedLLM(managed_llm)
+
+    openai_llm = CachedLLM(LLM(model="gpt-4o-mini"))  # or gpt-4o
+
+    # Each call picks a model: short rewrites and drafts stay on local Ollama, heavy
+    # research prompts (or anything when Ollama is backed up or slow) go to OpenAI,
+    # and a local call that times out is retried remotely.
+    return RoutingLLM(local=ollama_llm, remote=openai_llm, queue_depth=managed_llm.manager.queue_depth)
+
+
+def build_sentiment_tool():
+    from crewai.tools import tool  # import the decorator function
+
+    @tool("sentiment_analysis")  # ✅ Correct
+    def sentiment_analysis_tool(text: str) -> str:
+        """Analyzes the sentiment of text to ensure positive and engaging communication."""
+        return sentiment_engine.label(text)
+
+    return sentiment_analysis_tool
+
+
+def build_crew(llm=None, memory: bool = True):
+    """Lead profiling + personalized outreach crew for one lead (see prepare_inputs)."""
+    from crewai import Agent, Task, Crew
+    from contextCompaction import CompactionStage
+    from schemas import LeadProfile
+    from retrievalIndex import load_search_tool
+    from searchCache import CachedSerperDevTool
+
+    routed_llm = llm or build_llm()
+
+    # Local top-k search over playbooks and past research (empty until the index is built)
+    knowledge_tools = load_search_tool()
+
+    # Identical searches across tasks and leads are answered from a shared cache
+    search_tool = CachedSerperDevTool()
+
+    sentiment_analysis_tool = build_sentiment_tool()
+
+    # The profile report is parsed into a LeadProfile (no extra LLM call), and the
+    # outreach task only sees the profile facts that bear on the lead's milestone
+    profile_compaction = CompactionStage(
+        "{milestone} {key_decision_maker} {position} {industry}",
+        parse=lambda text, inputs: LeadProfile.from_text(inputs.get("lead_name", ""), text),
+    )
+
+    sales_rep_agent = Agent(
+        role="Sales Representative",
+        goal="Identify high-value leads that match "
+             "our ideal customer profile",
+        backstory=(
+            "As a part of the dynamic sales team at CrewAI, "
+            "your mission is to scour "
+            "the digital landscape for potential leads. "
+            "Armed with cutting-edge tools "
+            "and a strategic mindset, you analyze data, "
+            "trends, and interactions to "
+            "unearth opportunities that others might overlook. "
+            "Your work is crucial in paving the way "
+            "for meaningful engagements and driving the company's growth."
+        ),
+         llm=routed_llm,
+        tools=knowledge_tools,
+        allow_delegation=True,
+        verbose=True
+    )
+
+    lead_sales_rep_agent = Agent(
+        role="Lead Sales Representative",
+        goal="Nurture leads with personalized, compelling communications",
+        backstory=(
+            "Within the vibrant ecosystem of CrewAI's sales department, "
+            "you stand out as the bridge between potential clients "
+            "and the solutions they need."
+            "By creating engaging, personalized messages, "
+            "you not only inform leads about our offerings "
+            "but also make them feel seen and heard."
+            "Your role is pivotal in converting interest "
+            "into action, guiding leads through the journey "
+            "from curiosity to commitment."
+        ),
+         llm=routed_llm,
+        allow_delegation=True,
+        verbose=True
+    )
+
+    lead_profiling_task = Task(
+        description=(
+            "Conduct an in-depth analysis of {lead_name}, "
+            "a company in the {industry} sector "
+            "that recently showed interest in our solutions. "
+            "Utilize all available data sources "
+            "to compile a detailed profile, "
+            "focusing on key decision-makers, recent business "
+            "developments, and potential needs "
+            "that align with our offerings. "
+            "This task is crucial for tailoring "
+            "our engagement strategy effectively.\n"
+            "Don't make assumptions and "
+            "only use information you absolutely sure about."
+        ),
+        expected_output=(
+            "A comprehensive report on {lead_name}, "
+            "including company background, "
+            "key personnel, recent milestones, and identified needs. "
+            "Highlight potential areas where "
+            "our solutions can provide value, "
+            "and suggest personalized engagement strategies."
+        ),
+        tools=[search_tool] + knowledge_tools,
+        agent=sales_rep_agent,
+        callback=profile_compaction,
+    )
+
+    personalized_outreach_task = Task(
+        description=(
+            "Using the insights gathered from "
+            "the lead profiling report on {lead_name}, "
+            "craft a personalized outreach campaign "
+            "aimed at {key_decision_maker}, "
+            "the {position} of {lead_name}. "
+            "The campaign should address their recent {milestone} "
+            "and how our solutions can support their goals. "
+            "Your communication must resonate "
+            "with {lead_name}'s company culture and values, "
+            "demonstrating a deep understanding of "
+            "their business and needs.\n"
+            "Don't make assumptions and only "
+            "use information you absolutely sure about.\n\n"
+            "Follow this outreach playbook for {lead_name}'s segment:\n"
+            "{playbook}"
+        ),
+        expected_output=(
+            "A series of personalized email drafts "
+            "tailored to {lead_name}, "
+            "specifically targeting {key_decision_maker}."
+            "Each draft should include "
+            "a compelling narrative that connects our solutions "
+            "with their recent achievements and future goals. "
+            "Ensure the tone is engaging, professional, "
+            "and aligned with {lead_name}'s corporate identity."
+        ),
+        tools=[sentiment_analysis_tool, search_tool],
+        agent=lead_sales_rep_agent,
+    )
+
+    return Crew(
+        agents=[sales_rep_agent, 
+                lead_sales_rep_agent],
+
+        tasks=[lead_profiling_task, 
+               personalized_outreach_task],
+
+        verbose=False,
+        memory=memory,
+        before_kickoff_callbacks=[profile_compaction.bind]
+    )
+
+
+def prepare_inputs(lead: dict, store: InstructionStore = None) -> dict:
+    """Kickoff inputs for a lead, with the playbook for its industry filled in."""
+    return {**lead, "playbook": (store or instruction_store).for_industry(lead["industry"])}
+
+
+if __name__ == "__main__":
+    inputs = {
+        "lead_name": "DeepLearningAI",
+        "industry": "Online Learning Platform",
+        "key_decision_maker": "Andrew Ng",
+        "position": "CEO",
+        "milestone": "product launch"
+    }
+
+    result = build_crew().kickoff(inputs=prepare_inputs(inputs))
+
+    from IPython.display import Markdown, display
+    display(Markdown(result.raw))
@@ -0,0 +1,81 @@
+import os
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Playbooks written by DataPrep.py, keyed by customer segment
+SEGMENT_FILES = {
+    "tech startup": "tech_startups_outreach.md",
+    "enterprise": "enterprise_solutions_framework.md",
+    "small business": "small_business_engagement.md",
+}
+
+# Checked in order; the first segment with a keyword in the lead's industry wins
+SEGMENT_KEYWORDS = [
+    ("small business", ["small business", "smb"]),
+    ("enterprise", ["enterprise", "corporat", "bank", "insurance", "government", "telecom", "manufactur", "conglomerate", "pharma"]),
+    ("small business", ["local", "family", "retail", "restaurant", "shop", "boutique", "salon"]),
+    ("tech startup", ["startup", "start-up", "software", "saas", "tech", "ai", "platform", "online", "app", "cloud", "learning"]),
+]
+
+DEFAULT_SEGMENT = "tech startup"
+
+
+def segment_for(industry: str) -> str:
+    """Map a lead's free-text industry to one of the playbook segments."""
+    words = f" {industry.lower()} "
+    for segment, keywords in SEGMENT_KEYWORDS:
+        for keyword in keywords:
+            # Short keywords like "ai" must match a whole word, longer ones may be prefixes
+            if (f" {keyword} " if len(keyword) <= 3 else keyword) in words:
+                return segment
+    return DEFAULT_SEGMENT
+
+
+class InstructionStore:
+    """In-memory copy of the outreach playbooks, loaded once and re-read only when a file changes."""
+
+    def __init__(self, directory: str = "./instructions"):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._playbooks = {}
+        self._mtimes = {}
+        self.reload_if_changed()
+
+    def _current_mtimes(self) -> dict:
+        mtimes = {}
+        for segment, filename in SEGMENT_FILES.items():
+            try:
+                mtimes[segment] = os.stat(os.path.join(self.directory, filename)).st_mtime_ns
+            except FileNotFoundError:
+                pass
+        return mtimes
+
+    def reload_if_changed(self) -> bool:
+        """Re-read playbooks whose files changed since the last load. Returns True if any did."""
+        mtimes = self._current_mtimes()
+        with self._lock:
+            if mtimes == self._mtimes:
+                return False
+            for segment, mtime in mtimes.items():
+                if self._mtimes.get(segment) != mtime:
+                    with open(os.path.join(self.directory, SEGMENT_FILES[segment]), encoding="utf-8") as f:
+                        self._playbooks[segment] = f.read()
+                    logger.info(f"Loaded {segment} playbook")
+            for segment in set(self._playbooks) - set(mtimes):
+                del self._playbooks[segment]
+            self._mtimes = mtimes
+            return True
+
+    def get(self, segment: str) -> str:
+        self.reload_if_changed()
+        with self._lock:
+            playbook = self._playbooks.get(segment)
+        if playbook is None:
+            raise KeyError(f"No playbook for segment {segment!r} in {self.directory} (run DataPrep.py first)")
+        return playbook
+
+    def for_industry(self, industry: str) -> str:
+        """Playbook for the segment a lead's industry falls into."""
+        return self.get(segment_for(industry))
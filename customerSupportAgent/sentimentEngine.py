@@ -0,0 +1,143 @@
+"""Lexicon-based sentiment scoring for outreach drafts.
+
+The lexicon is indexed once into a dict of word weights, and text is tokenized
+with a regex, so "great!" and "Great," both count as "great". Entries may be
+phrases ("not good", "highly recommend"); a phrase's weight is added on top of
+the weights of its words. Batch scoring is vectorized with numpy: the tokens of
+a whole chunk are weighted in one pass and summed per message with a bincount
+(token counts times the weight vector); phrases are only assembled where one of
+them could start.
+With workers > 1 it also spreads large archives across processes.
+
+    python sentimentEngine.py drafts.txt --lexicon lexicon.tsv --workers 8
+"""
+import os
+import re
+import sys
+import json
+import argparse
+from itertools import chain, repeat
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+TOKEN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+DEFAULT_LEXICON = {
+    "good": 1.0, "great": 1.0, "awesome": 1.0, "happy": 1.0, "excellent": 1.0, "positive": 1.0,
+    "bad": -1.0, "sad": -1.0, "terrible": -1.0, "awful": -1.0, "horrible": -1.0, "negative": -1.0,
+}
+
+
+def load_lexicon(path: str) -> dict:
+    """Read word weights from a .json object or a "word<TAB>weight" text file."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return {word.lower(): float(weight) for word, weight in json.load(f).items()}
+        lexicon = {}
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            word, _, weight = line.partition("\t")
+            lexicon[word.strip().lower()] = float(weight or 1.0)
+        return lexicon
+
+
+def label_for(score: float) -> str:
+    if score > 0:
+        return "positive"
+    elif score < 0:
+        return "negative"
+    else:
+        return "neutral"
+
+
+class SentimentEngine:
+    """Score text against a precomputed lexicon index."""
+
+    def __init__(self, lexicon: dict = None):
+        # Entries are tokenized like text, so "Highly-recommend!" matches "highly recommend"
+        self.weights = {" ".join(TOKEN.findall(entry.lower())): weight for entry, weight in (lexicon or DEFAULT_LEXICON).items()}
+        self.weights.pop("", None)
+
+    @classmethod
+    def from_env(cls):
+        """Use the lexicon file named by SENTIMENT_LEXICON, or the built-in word list."""
+        path = os.getenv("SENTIMENT_LEXICON")
+        return cls(load_lexicon(path) if path else None)
+
+    def score(self, text: str) -> float:
+        return _score_chunk(self.weights, [text])[0]
+
+    def label(self, text: str) -> str:
+        return label_for(self.score(text))
+
+    def score_batch(self, texts, workers: int = 1, chunksize: int = 10000) -> list:
+        """Score many texts at once, optionally across worker processes."""
+        texts = list(texts)
+        if workers > 1 and len(texts) > chunksize:
+            chunks = [texts[i:i + chunksize] for i in range(0, len(texts), chunksize)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                scored = pool.map(_score_chunk, [self.weights] * len(chunks), chunks)
+                return [score for chunk in scored for score in chunk]
+        return _score_chunk(self.weights, texts)
+
+    def label_batch(self, texts, workers: int = 1) -> list:
+        return [label_for(score) for score in self.score_batch(texts, workers)]
+
+
+def _phrase_sizes(weights: dict) -> set:
+    """Word counts of the lexicon entries (1 for single words)."""
+    return {entry.count(" ") + 1 for entry in weights}
+
+
+def _score_chunk(weights: dict, texts: list) -> list:
+    token_lists = [TOKEN.findall(text.lower()) for text in texts]
+    tokens = list(chain.from_iterable(token_lists))
+    # Message index of every token
+    owners = np.repeat(np.arange(len(texts)), np.fromiter(map(len, token_lists), dtype=np.int64, count=len(texts)))
+
+    # Lexicon weight of every token (0 outside it), looked up by map() rather than a Python loop,
+    # then summed per message: the token-count matrix times the weight vector
+    token_weights = np.fromiter(map(weights.get, tokens, repeat(0.0)), dtype=float, count=len(tokens))
+    scores = np.zeros(len(texts))
+    scores += np.bincount(owners, weights=token_weights, minlength=len(texts))
+
+    phrases = {entry: weight for entry, weight in weights.items() if " " in entry}
+    if phrases:
+        # Phrases are only assembled where a token can start one
+        first_words = {phrase.split(" ", 1)[0] for phrase in phrases}
+        starts = np.flatnonzero(np.fromiter(map(first_words.__contains__, tokens), dtype=bool, count=len(tokens)))
+        for size in _phrase_sizes(phrases):
+            candidates = starts[starts + size - 1 < len(tokens)]
+            candidates = candidates[owners[candidates] == owners[candidates + size - 1]]
+            phrase_weights = np.fromiter(
+                (phrases.get(" ".join(tokens[start:start + size]), 0.0) for start in candidates.tolist()),
+                dtype=float, count=len(candidates),
+            )
+            scores += np.bincount(owners[candidates], weights=phrase_weights, minlength=len(texts))
+    return scores.tolist()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score messages (one per line, or JSONL with --field).")
+    parser.add_argument("path", help="input file, '-' for stdin")
+    parser.add_argument("--field", help="read this field from JSONL records instead of plain lines")
+    parser.add_argument("--lexicon", help="lexicon file (.json or word<TAB>weight)")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    engine = SentimentEngine(load_lexicon(args.lexicon)) if args.lexicon else SentimentEngine.from_env()
+    stream = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8")
+    with stream:
+        lines = [line.rstrip("\n") for line in stream]
+    texts = [json.loads(line)[args.field] for line in lines if line] if args.field else lines
+
+    labels = Counter()
+    for score in engine.score_batch(texts, args.workers):
+        label = label_for(score)
+        labels[label] += 1
+        print(f"{score:g}\t{label}")
+    print(dict(labels), file=sys.stderr)
@@ -0,0 +1,212 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Any
+
+from llmWrapper import DelegatingLLM
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "crew_llm_cache.sqlite")
+DEFAULT_MAX_ENTRIES = 50000
+
+SAMPLING_PARAMS = ("temperature", "top_p", "max_tokens", "seed", "frequency_penalty", "presence_penalty", "n")
+
+
+def _messages(messages) -> list:
+    if isinstance(messages, str):
+        return [{"role": "user", "content": messages}]
+    return [{"role": message.get("role"), "content": message.get("content")} for message in messages]
+
+
+def fingerprint(llm, messages, tools=None, response_model=None) -> tuple:
+    """(exact key, context key) for a call.
+
+    The exact key covers the model, every message, the sampling parameters, stop
+    words, tool schemas and response model. The context key leaves out the last
+    message, so semantic matching only considers calls that differ in their
+    final message.
+    """
+    messages = _messages(messages)
+    params = {name: getattr(llm, name, None) for name in SAMPLING_PARAMS}
+    params["stop"] = sorted(getattr(llm, "stop", None) or [])
+    params["tools"] = tools
+    params["response_model"] = response_model.__name__ if response_model else None
+
+    def digest(payload) -> str:
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    return (
+        digest([llm.model, messages, params]),
+        digest([llm.model, messages[:-1], params]),
+    )
+
+
+class ResponseCache:
+    """Persistent store of LLM responses with LRU eviction and per-agent hit rates.
+
+    With semantic_threshold set, a miss falls back to the most similar cached
+    call that shares the same context (model, parameters and earlier messages).
+    It is used when the cosine similarity of the final messages is at least the
+    threshold.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = DEFAULT_MAX_ENTRIES, semantic_threshold: float = None):
+        self.path = path or os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.max_entries = max_entries
+        self.semantic_threshold = semantic_threshold
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, context_key TEXT, model TEXT, response TEXT, "
+                "embedding BLOB, created_at REAL, last_used REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_context ON responses (context_key)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+            self._db.commit()
+
+    def _count(self, agent: str, outcome: str) -> None:
+        with self._lock:
+            counts = self._stats.setdefault(agent, {"hits": 0, "near_hits": 0, "misses": 0})
+            counts[outcome] += 1
+
+    def lookup(self, key: str, context_key: str, last_message: str, agent: str):
+        with self._lock:
+            row = self._db.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row:
+                self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+                self._db.commit()
+        if row:
+            self._count(agent, "hits")
+            return row[0]
+
+        if self.semantic_threshold is not None:
+            response = self._nearest(context_key, last_message)
+            if response is not None:
+                self._count(agent, "near_hits")
+                return response
+
+        self._count(agent, "misses")
+        return None
+
+    def _nearest(self, context_key: str, last_message: str):
+        import numpy as np
+        from retrievalIndex import embed
+
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT embedding, response FROM responses WHERE context_key = ? AND embedding IS NOT NULL",
+                (context_key,),
+            ).fetchall()
+        if not rows:
+            return None
+        query = embed(last_message)
+        vectors = np.frombuffer(b"".join(row[0] for row in rows), dtype=np.float32).reshape(len(rows), -1)
+        scores = vectors @ query
+        best = int(np.argmax(scores))
+        return rows[best][1] if scores[best] >= self.semantic_threshold else None
+
+    def store(self, key: str, context_key: str, model: str, last_message: str, response: str) -> None:
+        embedding = None
+        if self.semantic_threshold is not None:
+            from retrievalIndex import embed
+            embedding = embed(last_message).tobytes()
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, context_key, model, response, embedding, now, now),
+            )
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._db.commit()
+
+    def stats(self) -> dict:
+        """Hit counts and hit rate per agent role."""
+        with self._lock:
+            stats = {agent: dict(counts) for agent, counts in self._stats.items()}
+        for counts in stats.values():
+            lookups = counts["hits"] + counts["near_hits"] + counts["misses"]
+            counts["hit_rate"] = (counts["hits"] + counts["near_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def shared_response_cache() -> ResponseCache:
+    """Process-wide ResponseCache (LLM_CACHE_SEMANTIC_THRESHOLD enables near matches)."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            threshold = os.getenv("LLM_CACHE_SEMANTIC_THRESHOLD")
+            _shared_cache = ResponseCache(semantic_threshold=float(threshold) if threshold else None)
+        return _shared_cache
+
+
+class CachedLLM(DelegatingLLM):
+    """Wraps a crewai LLM and serves identical calls from a ResponseCache.
+
+        llm = CachedLLM(LLM(model="gemini/gemini-2.5-flash"))
+
+    Calls that hand the model executable tools (available_functions) always go to
+    the model, because their side effects must happen. Only plain string
+    responses are cached.
+    """
+
+    response_cache: Any = None
+
+    def __init__(self, llm, cache: ResponseCache = None, **kwargs: Any):
+        super().__init__(llm, response_cache=cache or shared_response_cache(), **kwargs)
+
+    def _lookup(self, messages, tools, from_agent, response_model):
+        self.sync_stop()
+        key, context_key = fingerprint(self.llm, messages, tools, response_model)
+        agent = getattr(from_agent, "role", None) or "unknown"
+        last_message = _messages(messages)[-1]["content"] or ""
+        cached = self.response_cache.lookup(key, context_key, str(last_message), agent)
+        return cached, (key, context_key, str(last_message))
+
+    def _store(self, entry, response) -> None:
+        if isinstance(response, str):
+            key, context_key, last_message = entry
+            self.response_cache.store(key, context_key, self.llm.model, last_message, response)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        kwargs = dict(tools=tools, callbacks=callbacks, available_functions=available_functions,
+                      from_task=from_task, from_agent=from_agent, response_model=response_model)
+        if available_functions:
+            return self.llm.call(messages, **kwargs)
+        cached, entry = self._lookup(messages, tools, from_agent, response_model)
+        if cached is not None:
+            return cached
+        response = self.llm.call(messages, **kwargs)
+        self._store(entry, response)
+        return response
+
+    async def acall(self, messages, tools=None, callbacks=None, available_functions=None,
+                    from_task=None, from_agent=None, response_model=None):
+        kwargs = dict(tools=tools, callbacks=callbacks, available_functions=available_functions,
+                      from_task=from_task, from_agent=from_agent, response_model=response_model)
+        if available_functions:
+            return await self.llm.acall(messages, **kwargs)
+        cached, entry = self._lookup(messages, tools, from_agent, response_model)
+        if cached is not None:
+            return cached
+        response = await self.llm.acall(messages, **kwargs)
+        self._store(entry, response)
+        return response
@@ -0,0 +1,50 @@
+from typing import Any
+
+from crewai.llms.base_llm import BaseLLM
+from crewai.types.usage_metrics import UsageMetrics
+
+
+class DelegatingLLM(BaseLLM):
+    """Base for crewai LLMs that wrap other LLMs (response cache, router, Ollama queue).
+
+    Subclasses implement call/acall and, when they wrap more than llm,
+    inner_llms(). Capabilities and token usage come from the wrapped LLMs, so
+    CrewOutput.token_usage counts what the models behind the wrapper used.
+
+        class LoggedLLM(DelegatingLLM):
+            def call(self, messages, **kwargs):
+                self.sync_stop()
+                return self.llm.call(messages, **kwargs)
+    """
+
+    llm: Any = None
+
+    def __init__(self, llm, **kwargs: Any):
+        kwargs.setdefault("model", llm.model)
+        kwargs.setdefault("temperature", getattr(llm, "temperature", None))
+        kwargs.setdefault("stream", getattr(llm, "stream", None))
+        kwargs.setdefault("stop", list(getattr(llm, "stop", None) or []))
+        super().__init__(llm=llm, **kwargs)
+
+    def inner_llms(self) -> list:
+        return [self.llm]
+
+    def sync_stop(self) -> None:
+        """Pass this wrapper's stop words on; agents add theirs to the LLM they hold, i.e. the wrapper."""
+        for llm in self.inner_llms():
+            llm.stop = list(self.stop or [])
+
+    def get_token_usage_summary(self) -> UsageMetrics:
+        usage = UsageMetrics()
+        for llm in self.inner_llms():
+            usage.add_usage_metrics(llm.get_token_usage_summary())
+        return usage
+
+    def supports_function_calling(self) -> bool:
+        return all(llm.supports_function_calling() for llm in self.inner_llms())
+
+    def supports_stop_words(self) -> bool:
+        return any(llm.supports_stop_words() for llm in self.inner_llms())
+
+    def get_context_window_size(self) -> int:
+        return min(llm.get_context_window_size() for llm in self.inner_llms())
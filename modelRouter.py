@@ -0,0 +1,200 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+from typing import Any
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from pydantic import Field
+
+from llmWrapper import DelegatingLLM
+from tracing import shared_tracer
+
+logger = logging.getLogger(__name__)
+
+# Task descriptions that need the stronger remote model
+HEAVY_TASK_WORDS = ("research", "in-depth", "analy", "profile", "comprehensive", "investigat")
+# Task descriptions the local model handles well
+LIGHT_TASK_WORDS = ("rewrite", "proofread", "edit", "summar", "draft", "shorten", "rephrase", "sentiment")
+
+
+def _env(name: str, default, cast=float):
+    """Field default read from the environment when the router is created."""
+    return Field(default_factory=lambda: cast(os.getenv(name, default)))
+
+
+def _estimate_tokens(messages) -> int:
+    if isinstance(messages, str):
+        return len(messages) // 4
+    return sum(len(str(message.get("content") or "")) for message in messages) // 4
+
+
+class RoutingLLM(DelegatingLLM):
+    """Send each call to the local model or a remote one, falling back on timeout.
+
+    A call goes to remote when its prompt is larger than max_local_tokens, when
+    its task looks heavy (research, in-depth analysis), when more than
+    max_local_queue calls are already waiting on the local model, or when the
+    local model's recent latency exceeds local_latency_budget. Everything else,
+    such as rewrites, drafts and edits, stays on the local model. A local call
+    that fails or takes longer than local_timeout is retried on remote. While
+    the local model is over its latency budget, one call every
+    local_probe_seconds still goes local, so the router notices when it is
+    fast again.
+
+    The thresholds default to ROUTER_MAX_LOCAL_TOKENS, ROUTER_MAX_LOCAL_QUEUE,
+    ROUTER_LOCAL_LATENCY_BUDGET, ROUTER_LOCAL_PROBE_SECONDS, ROUTER_LOCAL_TIMEOUT
+    (seconds; raise it on a CPU-only Ollama box, where slow local calls are
+    normal) and ROUTER_LOCAL_WORKERS (threads running sync local calls). Every call is
+    traced as a route:local, route:remote or route:fallback span, so
+    `python tracing.py` reports calls and latency per route.
+
+        router = RoutingLLM(local=ollama_llm, remote=openai_llm)
+    """
+
+    local: Any = None
+    remote: Any = None
+    max_local_tokens: int = _env("ROUTER_MAX_LOCAL_TOKENS", "3000", int)
+    max_local_queue: int = _env("ROUTER_MAX_LOCAL_QUEUE", "2", int)
+    local_latency_budget: float = _env("ROUTER_LOCAL_LATENCY_BUDGET", "30")
+    local_probe_seconds: float = _env("ROUTER_LOCAL_PROBE_SECONDS", "30")
+    local_timeout: float = _env("ROUTER_LOCAL_TIMEOUT", "60")
+    local_workers: int = _env("ROUTER_LOCAL_WORKERS", "8", int)
+    queue_depth: Any = None  # optional callable reporting the local server's queue depth
+
+    def __init__(self, local, remote, **kwargs: Any):
+        super().__init__(
+            local,
+            model=f"router({local.model}|{remote.model})",
+            local=local,
+            remote=remote,
+            **kwargs,
+        )
+        self._lock = threading.Lock()
+        self._local_in_flight = 0
+        # Moving average of local call seconds, for the latency budget
+        self._local_ewma = None
+        self._last_local = time.monotonic()
+        self._pool = ThreadPoolExecutor(max_workers=self.local_workers, thread_name_prefix="router-local")
+
+    def route(self, messages, from_task=None) -> tuple:
+        """("local" | "remote", reason) for a call."""
+        tokens = _estimate_tokens(messages)
+        if tokens > self.max_local_tokens:
+            return "remote", f"prompt ~{tokens} tokens"
+        description = f"{getattr(from_task, 'name', '') or ''} {getattr(from_task, 'description', '') or ''}".lower()
+        if any(word in description for word in HEAVY_TASK_WORDS) and not any(word in description for word in LIGHT_TASK_WORDS):
+            return "remote", "heavy task"
+        with self._lock:
+            waiting = self._local_in_flight
+            ewma = self._local_ewma
+            since_local = time.monotonic() - self._last_local
+        if self.queue_depth is not None:
+            waiting = max(waiting, self.queue_depth())
+        if waiting >= self.max_local_queue:
+            return "remote", f"local queue depth {waiting}"
+        if ewma is not None and ewma > self.local_latency_budget:
+            if since_local < self.local_probe_seconds:
+                return "remote", f"local latency {ewma:.1f}s"
+            return "local", f"probe after local latency {ewma:.1f}s"
+        return "local", "default"
+
+    def _start_local(self) -> None:
+        with self._lock:
+            self._local_in_flight += 1
+            self._last_local = time.monotonic()
+
+    def _observe_local(self, seconds: float, probe: bool) -> None:
+        with self._lock:
+            self._local_in_flight -= 1
+            if seconds is None:
+                return
+            if probe or self._local_ewma is None:
+                # A probe measures the local model as it is now, not as it was
+                self._local_ewma = seconds
+            else:
+                self._local_ewma = 0.8 * self._local_ewma + 0.2 * seconds
+
+    def _timed(self, route: str, reason: str, llm, messages, kwargs):
+        with shared_tracer().span(f"route:{route}", "route", model=llm.model, reason=reason):
+            return llm.call(messages, **kwargs)
+
+    async def _atimed(self, route: str, reason: str, llm, messages, kwargs):
+        with shared_tracer().span(f"route:{route}", "route", model=llm.model, reason=reason):
+            return await llm.acall(messages, **kwargs)
+
+    def _call_local(self, reason, messages, kwargs):
+        started, seconds = time.perf_counter(), None
+        try:
+            response = self._timed("local", reason, self.local, messages, kwargs)
+            seconds = time.perf_counter() - started
+            return response
+        finally:
+            self._observe_local(seconds, reason.startswith("probe"))
+
+    async def _acall_local(self, reason, messages, kwargs):
+        started, seconds = time.perf_counter(), None
+        try:
+            response = await self._atimed("local", reason, self.local, messages, kwargs)
+            seconds = time.perf_counter() - started
+            return response
+        except asyncio.CancelledError:
+            # Cut off by local_timeout: count the whole budget as this call's latency
+            seconds = time.perf_counter() - started
+            raise
+        finally:
+            self._observe_local(seconds, reason.startswith("probe"))
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        kwargs = dict(tools=tools, callbacks=callbacks, available_functions=available_functions,
+                      from_task=from_task, from_agent=from_agent, response_model=response_model)
+        self.sync_stop()
+
+        route, reason = self.route(messages, from_task)
+        logger.debug(f"Routing call to {route} ({reason})")
+        if route == "remote":
+            return self._timed("remote", reason, self.remote, messages, kwargs)
+
+        self._start_local()
+        future = self._pool.submit(contextvars.copy_context().run, self._call_local, reason, messages, kwargs)
+        try:
+            return future.result(timeout=self.local_timeout)
+        except FutureTimeoutError:
+            reason = f"local timeout {self.local_timeout:g}s"
+            logger.warning(f"Local model took over {self.local_timeout:g}s, falling back to remote")
+        except Exception as e:
+            reason = f"local error {e}"
+            logger.warning(f"Local model failed ({e}), falling back to remote")
+        return self._timed("fallback", reason, self.remote, messages, kwargs)
+
+    async def acall(self, messages, tools=None, callbacks=None, available_functions=None,
+                    from_task=None, from_agent=None, response_model=None):
+        kwargs = dict(tools=tools, callbacks=callbacks, available_functions=available_functions,
+                      from_task=from_task, from_agent=from_agent, response_model=response_model)
+        self.sync_stop()
+
+        route, reason = self.route(messages, from_task)
+        logger.debug(f"Routing call to {route} ({reason})")
+        if route == "remote":
+            return await self._atimed("remote", reason, self.remote, messages, kwargs)
+
+        self._start_local()
+        local = asyncio.ensure_future(self._acall_local(reason, messages, kwargs))
+        done, _ = await asyncio.wait([local], timeout=self.local_timeout)
+        if done:
+            try:
+                return local.result()
+            except Exception as e:
+                reason = f"local error {e}"
+                logger.warning(f"Local model failed ({e}), falling back to remote")
+        else:
+            local.cancel()
+            reason = f"local timeout {self.local_timeout:g}s"
+            logger.warning(f"Local model took over {self.local_timeout:g}s, falling back to remote")
+        return await self._atimed("fallback", reason, self.remote, messages, kwargs)
+
+    def inner_llms(self) -> list:
+        return [self.local, self.remote]
@@ -1,12 +1,28 @@
-from crewai import Agent, Task, Crew
-from crewai.llm import LLM
+import threading
 
-# Tell CrewAI to use Ollama as backend
-ollama_llm = LLM(
-    model="ollama/llama3.1:latest",   # specify provider + model
-    base_url="http://host.docker.internal:11434" # point to your running Ollama server
-    #base_url="http://localhost:11434"
-)
+# crewai and the helpers built on it are imported inside the factories below, so
+# importing this module (e.g. from crewFactory) costs nothing until a crew is built.
+_ollama_llm = None
+_ollama_llm_lock = threading.Lock()
+
+def get_ollama_llm():
+    """The shared Ollama LLM, created on first use."""
+    global _ollama_llm
+    with _ollama_llm_lock:
+        if _ollama_llm is None:
+            from ollamaManager import managed_ollama_llm
+            from llmCache import CachedLLM
+
+            # Tell CrewAI to use Ollama as backend. All stages share one pooled keep-alive
+            # HTTP client to the server instead of opening a connection per request, the
+            # model is preloaded and kept resident, requests queue for the server's parallel
+            # slots, and repeated prompts are served from a response cache.
+            _ollama_llm = CachedLLM(managed_ollama_llm(
+                model="ollama/llama3.1:latest",   # specify provider + model
+                base_url="http://host.docker.internal:11434" # point to your running Ollama server
+                #base_url="http://localhost:11434"
+            ))
+        return _ollama_llm
 
 ##researcher = Agent(
 ##    role="Researcher",
@@ -15,116 +31,173 @@ ollama_llm = LLM(
 ##    llm=ollama_llm
 ##)
 
-planner = Agent(
-    role="Content Planner",
-    goal="Plan engaging and factually accurate content on {topic}",
-    backstory="You're working on planning a blog article "
-              "about the topic: {topic}."
-              "You collect information that helps the "
-              "audience learn something "
-              "and make informed decisions. "
-              "Your work is the basis for "
-              "the Content Writer to write an article on this topic.",
-    llm=ollama_llm,
-    allow_delegation=False,
-	verbose=True
-)
-
-writer = Agent(
-    role="Content Writer",
-    goal="Write insightful and factually accurate "
-         "opinion piece about the topic: {topic}",
-    backstory="You're working on a writing "
-              "a new opinion piece about the topic: {topic}. "
-              "You base your writing on the work of "
-              "the Content Planner, who provides an outline "
-              "and relevant context about the topic. "
-              "You follow the main objectives and "
-              "direction of the outline, "
-              "as provide by the Content Planner. "
-              "You also provide objective and impartial insights "
-              "and back them up with information "
-              "provide by the Content Planner. "
-              "You acknowledge in your opinion piece "
-              "when your statements are opinions "
-              "as opposed to objective statements.",
-    llm=ollama_llm,
-    allow_delegation=False,
-    verbose=True
-)
-
-editor = Agent(
-    role="Editor",
-    goal="Edit a given blog post to align with "
-         "the writing style of the organization. ",
-    backstory="You are an editor who receives a blog post "
-              "from the Content Writer. "
-              "Your goal is to review the blog post "
-              "to ensure that it follows journalistic best practices,"
-              "provides balanced viewpoints "
-              "when providing opinions or assertions, "
-              "and also avoids major controversial topics "
-              "or opinions when possible.",
-     llm=ollama_llm,
-    allow_delegation=False,
-    verbose=True
-)
-
-plan = Task(
-    description=(
-        "1. Prioritize the latest trends, key players, "
-            "and noteworthy news on {topic}.\n"
-        "2. Identify the target audience, considering "
-            "their interests and pain points.\n"
-        "3. Develop a detailed content outline including "
-            "an introduction, key points, and a call to action.\n"
-        "4. Include SEO keywords and relevant data or sources."
-    ),
-    expected_output="A comprehensive content plan document "
-        "with an outline, audience analysis, "
-        "SEO keywords, and resources.",
-    agent=planner,
-)
-
-write = Task(
-    description=(
-        "1. Use the content plan to craft a compelling "
-            "blog post on {topic}.\n"
-        "2. Incorporate SEO keywords naturally.\n"
-		"3. Sections/Subtitles are properly named "
-            "in an engaging manner.\n"
-        "4. Ensure the post is structured with an "
-            "engaging introduction, insightful body, "
-            "and a summarizing conclusion.\n"
-        "5. Proofread for grammatical errors and "
-            "alignment with the brand's voice.\n"
-    ),
-    expected_output="A well-written blog post "
-        "in markdown format, ready for publication, "
-        "each section should have 2 or 3 paragraphs.",
-    agent=writer,
-)
-
-edit = Task(
-    description=("Proofread the given blog post for "
-                 "grammatical errors and "
-                 "alignment with the brand's voice."),
-    expected_output="A well-written blog post in markdown format, "
-                    "ready for publication, "
-                    "each section should have 2 or 3 paragraphs.",
-    agent=editor
-)
-
-crew = Crew(
-    agents=[planner, writer, editor],
-    tasks=[plan, write, edit],
-    #verbose=true
-)
-
-result = crew.kickoff(inputs={"topic": "Artificial Intelligence"})
-
-from IPython.display import Markdown
-Markdown(result.raw)
+def build_content_tasks(llm=None):
+    """Build fresh planner/writer/editor agents and their plan, write and edit tasks.
+
+    Every call returns new agents, so several topics can run at the same time
+    without sharing agent state.
+    """
+    from crewai import Agent, Task
+
+    ollama_llm = llm or get_ollama_llm()
+
+    planner = Agent(
+        role="Content Planner",
+        goal="Plan engaging and factually accurate content on {topic}",
+        backstory="You're working on planning a blog article "
+                  "about the topic: {topic}."
+                  "You collect information that helps the "
+                  "audience learn something "
+                  "and make informed decisions. "
+                  "Your work is the basis for "
+                  "the Content Writer to write an article on this topic.",
+        llm=ollama_llm,
+        allow_delegation=False,
+        verbose=True
+    )
+
+    writer = Agent(
+        role="Content Writer",
+        goal="Write insightful and factually accurate "
+             "opinion piece about the topic: {topic}",
+        backstory="You're working on a writing "
+                  "a new opinion piece about the topic: {topic}. "
+                  "You base your writing on the work of "
+                  "the Content Planner, who provides an outline "
+                  "and relevant context about the topic. "
+                  "You follow the main objectives and "
+                  "direction of the outline, "
+                  "as provide by the Content Planner. "
+                  "You also provide objective and impartial insights "
+                  "and back them up with information "
+                  "provide by the Content Planner. "
+                  "You acknowledge in your opinion piece "
+                  "when your statements are opinions "
+                  "as opposed to objective statements.",
+        llm=ollama_llm,
+        allow_delegation=False,
+        verbose=True
+    )
+
+    editor = Agent(
+        role="Editor",
+        goal="Edit a given blog post to align with "
+             "the writing style of the organization. ",
+        backstory="You are an editor who receives a blog post "
+                  "from the Content Writer. "
+                  "Your goal is to review the blog post "
+                  "to ensure that it follows journalistic best practices,"
+                  "provides balanced viewpoints "
+                  "when providing opinions or assertions, "
+                  "and also avoids major controversial topics "
+                  "or opinions when possible.",
+        llm=ollama_llm,
+        allow_delegation=False,
+        verbose=True
+    )
+
+    plan = Task(
+        description=(
+            "1. Prioritize the latest trends, key players, "
+                "and noteworthy news on {topic}.\n"
+            "2. Identify the target audience, considering "
+                "their interests and pain points.\n"
+            "3. Develop a detailed content outline including "
+                "an introduction, key points, and a call to action.\n"
+            "4. Include SEO keywords and relevant data or sources."
+        ),
+        expected_output="A comprehensive content plan document "
+            "with an outline, audience analysis, "
+            "SEO keywords, and resources.",
+        agent=planner,
+    )
+
+    write = Task(
+        description=(
+            "1. Use the content plan to craft a compelling "
+                "blog post on {topic}.\n"
+            "2. Incorporate SEO keywords naturally.\n"
+            "3. Sections/Subtitles are properly named "
+                "in an engaging manner.\n"
+            "4. Ensure the post is structured with an "
+                "engaging introduction, insightful body, "
+                "and a summarizing conclusion.\n"
+            "5. Proofread for grammatical errors and "
+                "alignment with the brand's voice.\n"
+        ),
+        expected_output="A well-written blog post "
+            "in markdown format, ready for publication, "
+            "each section should have 2 or 3 paragraphs.",
+        agent=writer,
+    )
+
+    edit = Task(
+        description=("Proofread the given blog post for "
+                     "grammatical errors and "
+                     "alignment with the brand's voice."),
+        expected_output="A well-written blog post in markdown format, "
+                        "ready for publication, "
+                        "each section should have 2 or 3 paragraphs.",
+        agent=editor
+    )
+
+    return plan, write, edit
+
+def build_crew(llm=None):
+    """Sequential plan -> write -> edit crew for one {topic}."""
+    from crewai import Crew
+
+    plan, write, edit = build_content_tasks(llm)
+    return Crew(
+        agents=[plan.agent, write.agent, edit.agent],
+        tasks=[plan, write, edit],
+        #verbose=true
+    )
+
+def run_topics(topics, max_workers=4):
+    """Plan, write and edit a blog post per topic, running the topics concurrently.
+
+    Each topic is an independent plan -> write -> edit chain, so wall-clock time
+    follows the depth of the graph (three tasks) rather than the number of topics.
+    Returns the edited posts keyed by topic along with the graph, whose report()
+    gives the critical-path timing.
+    """
+    from taskGraph import TaskGraph
+
+    graph = TaskGraph(max_workers=max_workers)
+    edited = {}
+    for topic in topics:
+        topic_plan, topic_write, topic_edit = build_content_tasks()
+        inputs = {"topic": topic}
+        planned = graph.add(topic_plan, inputs=inputs, name=f"plan:{topic}")
+        written = graph.add(topic_write, depends_on=[planned], inputs=inputs, name=f"write:{topic}")
+        edited[topic] = graph.add(topic_edit, depends_on=[written], inputs=inputs, name=f"edit:{topic}")
+    outputs = graph.run()
+    return {topic: outputs[name].raw for topic, name in edited.items()}, graph
+
+def run_topics_pipelined(topics):
+    """Plan, write and edit a blog post per topic, pipelining the stages across topics.
+
+    Topic N+1 is planned while topic N is being written, keeping the single local
+    Ollama server busy with at most one request per stage. Returns the edited
+    posts (or the exception that stopped a topic) keyed by topic along with the
+    pipeline, whose report() shows how busy each stage was.
+    """
+    from taskGraph import TaskPipeline
+
+    pipeline = TaskPipeline(["plan", "write", "edit"])
+    outputs = pipeline.run(({"topic": topic}, build_content_tasks()) for topic in topics)
+    posts = {
+        topic: output if isinstance(output, Exception) else output.raw
+        for topic, output in zip(topics, outputs)
+    }
+    return posts, pipeline
+
+if __name__ == "__main__":
+    from crewStreaming import render_kickoff
+
+    # Streams each agent's output as it is generated (live Markdown cell in Jupyter)
+    result = render_kickoff(build_crew(), inputs={"topic": "Artificial Intelligence"})
 
 ##task = Task(
 ##    description="Collect 5 fun facts about Mars and summarize them.",
@@ -1,30 +1,36 @@
 ##since we have not given any model , Open AI choose what ever it defaults to.
 ##open API key is provided during running the container.
 
-from crewai import Agent, Task, Crew
 
-# Define an agent
-researcher = Agent(
-    role="Researcher",
-    goal="Find interesting facts about Mars",
-    backstory="You are a space enthusiast who loves gathering information.",
-)
+def build_crew(llm=None):
+    """One researcher collecting fun facts about Mars (crewai's default OpenAI model unless llm is given)."""
+    from crewai import Agent, Task, Crew
 
-# Define a task
-task = Task(
-    description="Collect 5 fun facts about Mars and summarize them.",
-    expected_output="A short summary containing exactly 5 fun facts about Mars.",
-    agent=researcher,
-)
+    # Define an agent
+    researcher = Agent(
+        role="Researcher",
+        goal="Find interesting facts about Mars",
+        backstory="You are a space enthusiast who loves gathering information.",
+        **({"llm": llm} if llm is not None else {})
+    )
 
-# Create a Crew with agent + task
-crew = Crew(
-    agents=[researcher],
-    tasks=[task]
-)
+    # Define a task
+    task = Task(
+        description="Collect 5 fun facts about Mars and summarize them.",
+        expected_output="A short summary containing exactly 5 fun facts about Mars.",
+        agent=researcher,
+    )
 
-# Run it (new API)
-result = crew.kickoff()
+    # Create a Crew with agent + task
+    return Crew(
+        agents=[researcher],
+        tasks=[task]
+    )
 
-print("Crew Output:\n", result)
+# Run it, streaming tokens as they arrive
+if __name__ == "__main__":
+    from crewStreaming import render_kickoff
 
+    result = render_kickoff(build_crew())
+
+    print("Crew Output:\n", result)
@@ -0,0 +1,283 @@
+"""Health, warm-up and request queueing for the local Ollama server.
+
+Ollama loads a model on its first request and unloads it after keep_alive
+(five minutes by default), so the first call after startup or a quiet spell
+pays the whole load time. It also processes only OLLAMA_NUM_PARALLEL requests
+at once; extra requests wait inside the server where nobody can see them.
+
+OllamaManager preloads the model at startup, pings it with keep_alive while
+the process runs so it stays resident, and admits at most `parallel` calls to
+the server at a time. Calls beyond that wait in the manager's own queue, so
+queue depth and wait times are visible (RoutingLLM uses the depth to send
+work to the remote model when Ollama is backed up).
+
+    manager = shared_ollama_manager().start()
+    llm = ManagedOllamaLLM(pooled_ollama_llm(), manager)
+    print(manager.stats())
+"""
+import os
+import time
+import asyncio
+import logging
+import threading
+from typing import Any
+from collections import deque
+from contextlib import contextmanager
+
+import httpx
+
+from llmWrapper import DelegatingLLM
+from ollamaPool import OLLAMA_BASE_URL, get_client, pooled_ollama_llm
+from tracing import percentile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "llama3.1:latest"
+DEFAULT_KEEP_ALIVE = "30m"
+DEFAULT_PING_SECONDS = 240.0
+MAX_WAIT_SAMPLES = 1024
+
+
+class OllamaManager:
+    """Keep one Ollama model loaded and meter the requests sent to it.
+
+    parallel should match the server's OLLAMA_NUM_PARALLEL (the same variable
+    is read here, default 1, i.e. requests are serialized). keep_alive is
+    passed to Ollama with every warm-up and ping; ping_interval should stay
+    well below it.
+    """
+
+    def __init__(self, base_url: str = OLLAMA_BASE_URL, model: str = None, parallel: int = None,
+                 keep_alive: str = None, ping_interval: float = None, client: httpx.Client = None):
+        self.base_url = base_url
+        self.model = model or os.getenv("OLLAMA_MODEL", DEFAULT_MODEL)
+        self.parallel = parallel or int(os.getenv("OLLAMA_NUM_PARALLEL", "1"))
+        self.keep_alive = keep_alive or os.getenv("OLLAMA_KEEP_ALIVE", DEFAULT_KEEP_ALIVE)
+        self.ping_interval = ping_interval or float(os.getenv("OLLAMA_PING_SECONDS", DEFAULT_PING_SECONDS))
+        self.client = client or get_client(base_url)
+        self._slots = threading.Semaphore(self.parallel)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._in_flight = 0
+        self._waits = deque(maxlen=MAX_WAIT_SAMPLES)
+        self._last_request = None
+        self._stats = {"served": 0, "warmups": 0, "pings": 0, "ping_failures": 0}
+        self._healthy = None
+        self._load_seconds = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Health and warm-up ---
+    def health(self) -> dict:
+        """Whether the server answers, its version and whether the model is loaded."""
+        try:
+            version = self.client.get("/api/version", timeout=5.0).json().get("version")
+            loaded = [m.get("name") for m in self.client.get("/api/ps", timeout=5.0).json().get("models", [])]
+        except (httpx.HTTPError, ValueError) as e:
+            self._healthy = False
+            return {"ok": False, "error": str(e)}
+        self._healthy = True
+        return {"ok": True, "version": version, "model": self.model, "loaded": self.model in loaded}
+
+    def is_loaded(self) -> bool:
+        return bool(self.health().get("loaded"))
+
+    def warm_up(self) -> float:
+        """Load the model (an empty generate request) and return the seconds it took."""
+        started = time.perf_counter()
+        response = self.client.post("/api/generate", json={"model": self.model, "prompt": "", "keep_alive": self.keep_alive})
+        response.raise_for_status()
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._stats["warmups"] += 1
+            self._load_seconds = elapsed
+        self._healthy = True
+        logger.info(f"Ollama model {self.model} ready in {elapsed:.2f}s (keep_alive {self.keep_alive})")
+        return elapsed
+
+    def ping(self) -> None:
+        """Reset the model's keep_alive timer; reloads it if Ollama unloaded it anyway."""
+        try:
+            response = self.client.post("/api/generate", json={"model": self.model, "prompt": "", "keep_alive": self.keep_alive})
+            response.raise_for_status()
+            with self._lock:
+                self._stats["pings"] += 1
+            self._healthy = True
+        except httpx.HTTPError as e:
+            with self._lock:
+                self._stats["ping_failures"] += 1
+            self._healthy = False
+            logger.warning(f"Ollama keep-alive ping to {self.base_url} failed: {e}")
+
+    # --- Lifecycle ---
+    def start(self) -> "OllamaManager":
+        """Warm the model up and keep it loaded, on a background thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="ollama-keepalive", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        with self._lock:
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self) -> None:
+        try:
+            self.warm_up()
+        except httpx.HTTPError as e:
+            self._healthy = False
+            logger.warning(f"Could not preload {self.model} on {self.base_url}: {e}")
+        while not self._stop.wait(self.ping_interval):
+            with self._lock:
+                # Real requests refresh keep_alive themselves; only ping after a quiet spell
+                recent = self._last_request is not None and time.monotonic() - self._last_request < self.ping_interval
+            if not recent:
+                self.ping()
+
+    # --- Request queue ---
+    def acquire(self) -> float:
+        """Wait for a free server slot; returns the seconds spent waiting. Pair with release()."""
+        started = time.perf_counter()
+        with self._lock:
+            self._waiting += 1
+        try:
+            self._slots.acquire()
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        waited = time.perf_counter() - started
+        with self._lock:
+            self._in_flight += 1
+            self._waits.append(waited)
+        if waited > 1.0:
+            logger.debug(f"Waited {waited:.2f}s for an Ollama slot")
+        return waited
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._stats["served"] += 1
+            self._last_request = time.monotonic()
+        self._slots.release()
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the server's parallel slots for the duration of a request."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def queue_depth(self) -> int:
+        """Requests waiting for or holding a slot (RoutingLLM's queue_depth callable)."""
+        with self._lock:
+            return self._waiting + self._in_flight
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = list(self._waits)
+            stats = dict(self._stats, waiting=self._waiting, in_flight=self._in_flight, parallel=self.parallel,
+                         healthy=self._healthy, load_seconds=self._load_seconds)
+        stats["wait_p50"] = percentile(waits, 0.50)
+        stats["wait_p95"] = percentile(waits, 0.95)
+        stats["wait_max"] = max(waits) if waits else None
+        return stats
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def shared_ollama_manager(base_url: str = OLLAMA_BASE_URL, model: str = None) -> OllamaManager:
+    """The process-wide OllamaManager for a server and model, created on first use."""
+    model = model or os.getenv("OLLAMA_MODEL", DEFAULT_MODEL)
+    with _managers_lock:
+        manager = _managers.get((base_url, model))
+        if manager is None:
+            manager = _managers[(base_url, model)] = OllamaManager(base_url, model)
+        return manager
+
+
+class ManagedOllamaLLM(DelegatingLLM):
+    """Wraps a crewai Ollama LLM so every call takes a slot from an OllamaManager.
+
+    Wrap it in CachedLLM (not the other way round), so cache hits never queue.
+    """
+
+    manager: Any = None
+
+    def __init__(self, llm, manager: OllamaManager, **kwargs: Any):
+        super().__init__(llm, manager=manager, **kwargs)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        self.sync_stop()
+        with self.manager.slot():
+            return self.llm.call(messages, tools=tools, callbacks=callbacks, available_functions=available_functions,
+                                 from_task=from_task, from_agent=from_agent, response_model=response_model)
+
+    async def acall(self, messages, tools=None, callbacks=None, available_functions=None,
+                    from_task=None, from_agent=None, response_model=None):
+        self.sync_stop()
+        # Wait for the slot off the event loop, so other coroutines keep running
+        acquiring = asyncio.get_running_loop().run_in_executor(None, self.manager.acquire)
+        try:
+            await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # The executor thread still takes the slot when it gets one; give it straight back
+            def release_late(future):
+                if not future.cancelled() and future.exception() is None:
+                    self.manager.release()
+
+            acquiring.add_done_callback(release_late)
+            raise
+        try:
+            return await self.llm.acall(messages, tools=tools, callbacks=callbacks,
+                                        available_functions=available_functions, from_task=from_task,
+                                        from_agent=from_agent, response_model=response_model)
+        finally:
+            self.manager.release()
+
+
+def managed_ollama_llm(model: str = f"ollama/{DEFAULT_MODEL}", base_url: str = OLLAMA_BASE_URL, **kwargs) -> ManagedOllamaLLM:
+    """A pooled Ollama LLM behind the shared manager for its server, which is started (preloading the model)."""
+    manager = shared_ollama_manager(base_url, model.split("/", 1)[-1]).start()
+    return ManagedOllamaLLM(pooled_ollama_llm(model, base_url, **kwargs), manager)
+
+
+if __name__ == "__main__":
+    import json
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check, preload or keep the local Ollama model loaded.")
+    parser.add_argument("command", choices=["health", "warmup", "keepalive"])
+    parser.add_argument("--base-url", default=OLLAMA_BASE_URL)
+    parser.add_argument("--model", default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    manager = OllamaManager(args.base_url, args.model)
+    if args.command == "health":
+        print(json.dumps(manager.health(), indent=2))
+    elif args.command == "warmup":
+        print(f"{manager.model} loaded in {manager.warm_up():.2f}s")
+    else:
+        with manager:
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                pass
@@ -0,0 +1,65 @@
+import os
+import logging
+import threading
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://host.docker.internal:11434")
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(base_url: str = OLLAMA_BASE_URL, max_connections: int = 8, timeout: float = 600.0) -> httpx.Client:
+    """Return the process-wide keep-alive HTTP client for an Ollama server.
+
+    Every caller gets the same pooled client per base_url, so planner, writer
+    and editor calls reuse open connections instead of reconnecting per request.
+    """
+    with _clients_lock:
+        client = _clients.get(base_url)
+        if client is None:
+            client = httpx.Client(
+                base_url=base_url,
+                timeout=httpx.Timeout(timeout, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                    keepalive_expiry=300.0,
+                ),
+            )
+            _clients[base_url] = client
+        return client
+
+
+def install_litellm_client(client: httpx.Client) -> None:
+    """Route litellm's synchronous HTTP calls through client (raises ImportError without litellm)."""
+    import litellm
+
+    litellm.client_session = client
+    try:
+        from litellm.llms.custom_httpx.http_handler import HTTPHandler
+    except ImportError:
+        logger.warning("This litellm version has no shared HTTPHandler; only client_session is set")
+        return
+    litellm.module_level_client = HTTPHandler(client=client)
+
+
+def pooled_ollama_llm(model: str = "ollama/llama3.1:latest", base_url: str = OLLAMA_BASE_URL, **kwargs):
+    """Build a crewai LLM for the local Ollama server that uses the shared pooled client."""
+    from crewai.llm import LLM
+
+    client = get_client(base_url)
+    try:
+        # crewai releases (and providers) that still go through litellm
+        install_litellm_client(client)
+    except ImportError:
+        pass
+    llm = LLM(model=model, base_url=base_url, **kwargs)
+    if hasattr(llm, "_get_client_params") and hasattr(llm, "_client"):
+        # Native OpenAI-compatible provider: build its sync SDK client on the shared pool
+        from openai import OpenAI
+        llm._client = OpenAI(**llm._get_client_params(), http_client=client)
+    return llm
@@ -0,0 +1,123 @@
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "crew_research_cache.json")
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+
+
+class ResearchCache:
+    """Per-developer cache of research results with a TTL and background refresh.
+
+    Entries younger than refresh_after are served as-is. Entries between
+    refresh_after and ttl are served immediately while a background thread
+    re-runs the research, so callers rarely wait on it. Expired or missing
+    entries are researched synchronously, once, however many callers ask.
+    Results can be any JSON-serializable value (crew.py caches ResearchFacts dumps).
+    """
+
+    def __init__(self, path: str = None, ttl: float = None, refresh_after: float = None):
+        self.path = path or os.getenv("RESEARCH_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.ttl = ttl if ttl is not None else float(os.getenv("RESEARCH_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+        self.refresh_after = refresh_after if refresh_after is not None else self.ttl * 0.75
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._entries = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable research cache {self.path}: {e}")
+            return {}
+
+    def _save(self) -> None:
+        # Called with self._lock held
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def key(developer_name: str) -> str:
+        return " ".join(developer_name.lower().split())
+
+    def age(self, developer_name: str):
+        """Seconds since developer_name was last researched, or None if never."""
+        with self._lock:
+            entry = self._entries.get(self.key(developer_name))
+        return time.time() - entry["created_at"] if entry else None
+
+    def is_fresh(self, developer_name: str) -> bool:
+        """True if cached research exists and is not due for a refresh yet."""
+        age = self.age(developer_name)
+        return age is not None and age < self.refresh_after
+
+    def get(self, developer_name: str):
+        """Return the cached research if it has not expired, else None."""
+        age = self.age(developer_name)
+        if age is None or age >= self.ttl:
+            return None
+        with self._lock:
+            return self._entries[self.key(developer_name)]["result"]
+
+    def put(self, developer_name: str, result) -> None:
+        with self._lock:
+            self._entries[self.key(developer_name)] = {
+                "developer_name": developer_name,
+                "result": result,
+                "created_at": time.time(),
+            }
+            self._save()
+
+    def get_or_research(self, developer_name: str, research):
+        """Return research for developer_name, calling research(developer_name) only when needed."""
+        age = self.age(developer_name)
+        if age is not None and age < self.ttl:
+            if age >= self.refresh_after:
+                self.refresh(developer_name, research, wait=False)
+            return self.get(developer_name) or self.refresh(developer_name, research)
+        return self.refresh(developer_name, research)
+
+    def refresh(self, developer_name: str, research, wait: bool = True):
+        """Re-run research for developer_name, sharing one run between concurrent callers."""
+        key = self.key(developer_name)
+        with self._lock:
+            done = self._pending.get(key)
+            owner = done is None
+            if owner:
+                done = self._pending[key] = threading.Event()
+
+        if owner:
+            def run():
+                try:
+                    logger.info(f"Researching {developer_name}")
+                    self.put(developer_name, research(developer_name))
+                except Exception as e:
+                    logger.error(f"Research for {developer_name} failed: {e}")
+                finally:
+                    with self._lock:
+                        del self._pending[key]
+                    done.set()
+
+            if not wait:
+                threading.Thread(target=run, daemon=True).start()
+                return None
+            run()
+        elif not wait:
+            return None
+        else:
+            done.wait()
+
+        result = self.get(developer_name)
+        if result is None:
+            raise RuntimeError(f"No research available for {developer_name}")
+        return result
@@ -0,0 +1,216 @@
+"""Speculative research prefetch for the voice pipeline.
+
+Research normally starts only after speech recognition has finished. The
+PrefetchScheduler starts it earlier: as soon as a developer is named in a
+partial transcript, and, while the assistant is idle, for the developers
+callers ask about most. At most max_concurrent prefetches run at a time;
+anything beyond that budget is skipped rather than queued, so speculation
+never crowds out the turn being answered. Idle warm-ups leave `reserved` of
+those slots free for developers named in a transcript.
+
+    prefetcher = PrefetchScheduler(research_cache, research_developer).start()
+    listener = ContinuousListener(source, recognizer, on_partial=prefetcher.on_partial)
+"""
+import os
+import re
+import time
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Canonical name -> extra ways callers refer to it (the name itself always matches)
+DEFAULT_DEVELOPERS = {
+    "Emaar Properties": ["Emaar"],
+    "DAMAC Properties": ["DAMAC"],
+    "Nakheel": [],
+    "Sobha Realty": ["Sobha"],
+    "Meraas": [],
+    "Aldar Properties": ["Aldar"],
+    "Dubai Properties": [],
+    "Ellington Properties": ["Ellington"],
+    "Azizi Developments": ["Azizi"],
+    "Danube Properties": ["Danube"],
+}
+
+
+class DeveloperDetector:
+    """Find developer names (or their aliases) in free text.
+
+    PREFETCH_DEVELOPERS adds names as a comma-separated list.
+    """
+
+    def __init__(self, developers: dict = None):
+        developers = dict(developers if developers is not None else DEFAULT_DEVELOPERS)
+        for name in filter(None, (part.strip() for part in os.getenv("PREFETCH_DEVELOPERS", "").split(","))):
+            developers.setdefault(name, [])
+        self.developers = developers
+        aliases = {}
+        for name, extra in developers.items():
+            for alias in [name, *extra]:
+                aliases[alias.lower()] = name
+        # Longest aliases first, so "Dubai Properties" wins over a shorter overlap
+        self._pattern = re.compile(
+            r"\b(" + "|".join(re.escape(alias) for alias in sorted(aliases, key=len, reverse=True)) + r")\b",
+            re.IGNORECASE,
+        ) if aliases else None
+        self._aliases = aliases
+
+    def detect(self, text: str):
+        """The developer mentioned last in text, or None."""
+        if not text or self._pattern is None:
+            return None
+        matches = self._pattern.findall(text)
+        return self._aliases[matches[-1].lower()] if matches else None
+
+
+class PrefetchScheduler:
+    """Start research early for developers the caller is likely to ask about.
+
+    research(developer_name) is the uncached research function; results go
+    through research_cache, so a prefetch and the turn that needs it share one
+    run. Developers already fresh in the cache are not prefetched again.
+    Idle warm-ups only cover developers that have been requested, and never
+    take the last `reserved` slots (PREFETCH_RESERVED, default 1), so
+    with max_concurrent 1 they are off.
+    """
+
+    def __init__(self, research_cache, research, detector: DeveloperDetector = None, max_concurrent: int = None,
+                 top_n: int = None, idle_seconds: float = None, reserved: int = None):
+        self.research_cache = research_cache
+        self.research = research
+        self.detector = detector or DeveloperDetector()
+        self.max_concurrent = max_concurrent or int(os.getenv("PREFETCH_MAX_CONCURRENT", "2"))
+        self.top_n = top_n if top_n is not None else int(os.getenv("PREFETCH_TOP_N", "5"))
+        self.idle_seconds = idle_seconds if idle_seconds is not None else float(os.getenv("PREFETCH_IDLE_SECONDS", "30"))
+        self.reserved = reserved if reserved is not None else int(os.getenv("PREFETCH_RESERVED", "1"))
+        if self.idle_seconds <= 0:
+            # The idle loop polls every min(5, idle_seconds) seconds
+            raise ValueError(f"idle_seconds must be positive, got {self.idle_seconds:g}")
+        self.requests = Counter()
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._in_flight = set()
+        self._idle_in_flight = 0
+        self._busy = 0
+        self._last_activity = time.monotonic()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {"detected": 0, "started": 0, "already_fresh": 0, "over_budget": 0, "failed": 0, "idle_warmups": 0,
+                       "idle_deferred": 0}
+
+    # --- Lifecycle ---
+    def start(self) -> "PrefetchScheduler":
+        """Start the idle warm-up thread."""
+        self._thread = threading.Thread(target=self._idle_loop, name="research-prefetch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- Signals from the voice loop ---
+    def on_partial(self, text: str) -> None:
+        """Partial transcript callback: prefetch the developer it names, if any."""
+        self._touch()
+        developer_name = self.detector.detect(text)
+        if developer_name:
+            with self._lock:
+                self._stats["detected"] += 1
+            self.prefetch(developer_name)
+
+    def record_request(self, developer_name: str) -> None:
+        """Count a turn about developer_name (feeds the top-N idle warm-up)."""
+        self._touch()
+        with self._lock:
+            self.requests[developer_name] += 1
+
+    @contextmanager
+    def busy(self):
+        """Mark a turn in progress; idle warm-ups wait until no turn is running."""
+        with self._lock:
+            self._busy += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._busy -= 1
+            self._touch()
+
+    def _touch(self) -> None:
+        with self._lock:
+            self._last_activity = time.monotonic()
+
+    # --- Prefetching ---
+    def prefetch(self, developer_name: str, idle: bool = False) -> bool:
+        """Start researching developer_name in the background; False if fresh, running or over budget.
+
+        idle warm-ups may only use max_concurrent - reserved slots.
+        """
+        if self.research_cache.is_fresh(developer_name):
+            with self._lock:
+                self._stats["already_fresh"] += 1
+            return False
+        with self._lock:
+            if developer_name in self._in_flight:
+                return False
+            # Idle warm-ups just try again later; over_budget counts skipped transcript prefetches
+            if idle and self._idle_in_flight >= self.max_concurrent - self.reserved:
+                self._stats["idle_deferred"] += 1
+                return False
+            if not self._slots.acquire(blocking=False):
+                self._stats["idle_deferred" if idle else "over_budget"] += 1
+                return False
+            self._in_flight.add(developer_name)
+            self._idle_in_flight += idle
+            self._stats["started"] += 1
+        threading.Thread(target=self._run, args=(developer_name, idle), name="research-prefetch-run",
+                         daemon=True).start()
+        return True
+
+    def _run(self, developer_name: str, idle: bool = False) -> None:
+        started = time.perf_counter()
+        try:
+            # Not get_or_research: a stale entry would refresh on its own thread, outside the budget
+            self.research_cache.refresh(developer_name, self.research)
+            logger.info(f"Prefetched research for {developer_name} in {time.perf_counter() - started:.2f}s")
+        except Exception as e:
+            with self._lock:
+                self._stats["failed"] += 1
+            logger.error(f"Prefetch for {developer_name} failed: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(developer_name)
+                self._idle_in_flight -= idle
+            self._slots.release()
+
+    def top_developers(self) -> list:
+        """The top_n most requested developers (none before the first request)."""
+        with self._lock:
+            return [name for name, _ in self.requests.most_common(self.top_n)]
+
+    def _idle_loop(self) -> None:
+        while not self._stop.wait(min(5.0, self.idle_seconds)):
+            with self._lock:
+                idle = not self._busy and time.monotonic() - self._last_activity >= self.idle_seconds
+            if not idle:
+                continue
+            for developer_name in self.top_developers():
+                if self.prefetch(developer_name, idle=True):
+                    with self._lock:
+                        self._stats["idle_warmups"] += 1
+            self._touch()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._in_flight))
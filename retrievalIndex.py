@@ -0,0 +1,176 @@
+"""Local retrieval index over the outreach playbooks and cached research.
+
+Passages are embedded with feature hashing (signed hashes of words and word
+bigrams), which needs no model download and runs in microseconds on a CPU. The
+vectors are stored as a flat float32 file that is memory-mapped at load time,
+so a search is a single matrix-vector product and returns only the top-k
+passages instead of whole files.
+
+    python retrievalIndex.py build --instructions customerSupportAgent/instructions
+    python retrievalIndex.py search "scalability for startups"
+"""
+import os
+import re
+import json
+import hashlib
+import logging
+import argparse
+import tempfile
+
+import numpy as np
+
+from researchCache import DEFAULT_CACHE_PATH as DEFAULT_RESEARCH_PATH
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_DIR = os.path.join(tempfile.gettempdir(), "crew_retrieval_index")
+DIMENSIONS = 1024
+CHUNK_WORDS = 120
+
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def embed(text: str, dimensions: int = DIMENSIONS) -> np.ndarray:
+    """Hashing-trick embedding of the words and word bigrams in text, L2-normalized."""
+    words = WORD.findall(text.lower())
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        vector[digest % dimensions] += 1.0 if digest >> 63 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def chunk_text(text: str, max_words: int = CHUNK_WORDS) -> list:
+    """Group paragraphs into passages of at most max_words words (longer paragraphs are split)."""
+    chunks, current = [], []
+    for paragraph in re.split(r"\n\s*\n", text):
+        words = paragraph.split()
+        while words:
+            room = max_words - len(current)
+            if room <= 0:
+                chunks.append(" ".join(current))
+                current, room = [], max_words
+            current.extend(words[:room])
+            words = words[room:]
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def collect_documents(instructions_dir: str = None, research_path: str = None) -> list:
+    """(source, text) pairs from playbook markdown files and the research cache file."""
+    documents = []
+    if instructions_dir and os.path.isdir(instructions_dir):
+        for name in sorted(os.listdir(instructions_dir)):
+            if name.endswith(".md"):
+                with open(os.path.join(instructions_dir, name), encoding="utf-8") as f:
+                    documents.append((name, f.read()))
+    if research_path and os.path.exists(research_path):
+        with open(research_path, encoding="utf-8") as f:
+            for entry in json.load(f).values():
+                result = entry["result"]
+                if isinstance(result, dict):  # ResearchFacts dump
+                    result = "\n".join(result.get("facts", []))
+                documents.append((f"research:{entry['developer_name']}", result))
+    return documents
+
+
+def _index_dir(index_dir: str = None) -> str:
+    """index_dir, else RETRIEVAL_INDEX_DIR (read at call time), else DEFAULT_INDEX_DIR."""
+    return index_dir or os.getenv("RETRIEVAL_INDEX_DIR", DEFAULT_INDEX_DIR)
+
+
+def build_index(documents, index_dir: str = None, dimensions: int = DIMENSIONS) -> int:
+    """Chunk and embed documents into index_dir and return the number of passages."""
+    index_dir = _index_dir(index_dir)
+    passages = [(source, chunk) for source, text in documents for chunk in chunk_text(text)]
+    os.makedirs(index_dir, exist_ok=True)
+
+    vectors = np.lib.format.open_memmap(
+        os.path.join(index_dir, "vectors.tmp.npy"), mode="w+", dtype=np.float32,
+        shape=(len(passages), dimensions),
+    )
+    for row, (_, text) in enumerate(passages):
+        vectors[row] = embed(text, dimensions)
+    vectors.flush()
+    del vectors
+
+    with open(os.path.join(index_dir, "passages.tmp.jsonl"), "w", encoding="utf-8") as f:
+        for source, text in passages:
+            f.write(json.dumps({"source": source, "text": text}, ensure_ascii=False) + "\n")
+    # Swap both files in only once they are complete
+    os.replace(os.path.join(index_dir, "vectors.tmp.npy"), os.path.join(index_dir, "vectors.npy"))
+    os.replace(os.path.join(index_dir, "passages.tmp.jsonl"), os.path.join(index_dir, "passages.jsonl"))
+    logger.info(f"Indexed {len(passages)} passages from {len(documents)} documents into {index_dir}")
+    return len(passages)
+
+
+class RetrievalIndex:
+    """Memory-mapped passage vectors plus their text, searchable by cosine similarity."""
+
+    def __init__(self, index_dir: str = None):
+        self.index_dir = index_dir = _index_dir(index_dir)
+        self.vectors = np.load(os.path.join(index_dir, "vectors.npy"), mmap_mode="r")
+        with open(os.path.join(index_dir, "passages.jsonl"), encoding="utf-8") as f:
+            self.passages = [json.loads(line) for line in f]
+
+    @classmethod
+    def load(cls, index_dir: str = None):
+        """Open the index in index_dir, or return None if it has not been built."""
+        index_dir = _index_dir(index_dir)
+        if not os.path.exists(os.path.join(index_dir, "vectors.npy")):
+            logger.warning(f"No retrieval index in {index_dir}; run retrievalIndex.py build")
+            return None
+        return cls(index_dir)
+
+    def search(self, query: str, k: int = 4) -> list:
+        """Top-k passages for query as dicts with score, source and text."""
+        if not self.passages:
+            return []
+        scores = self.vectors @ embed(query, self.vectors.shape[1])
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [{"score": float(scores[i]), **self.passages[i]} for i in top]
+
+
+def make_search_tool(index: RetrievalIndex, k: int = 4):
+    """crewai tool that returns the most relevant playbook/research passages for a query."""
+    from crewai.tools import tool
+
+    @tool("Knowledge Base Search")
+    def knowledge_base_search(query: str) -> str:
+        """Search the local knowledge base of outreach playbooks and past developer research. Returns only the most relevant passages, each with its source."""
+        results = index.search(query, k)
+        if not results:
+            return "No relevant passages found."
+        return "\n\n".join(f"[{result['source']}] {result['text']}" for result in results)
+
+    return knowledge_base_search
+
+
+def load_search_tool(index_dir: str = None, k: int = 4) -> list:
+    """[tool] if the index has been built, else [] (so it can be added to a tools list as-is)."""
+    index = RetrievalIndex.load(index_dir)
+    return [make_search_tool(index, k)] if index else []
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the local retrieval index.")
+    parser.add_argument("--index-dir", default=None, help=f"default: RETRIEVAL_INDEX_DIR or {DEFAULT_INDEX_DIR}")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build")
+    build.add_argument("--instructions", default="customerSupportAgent/instructions")
+    build.add_argument("--research", default=DEFAULT_RESEARCH_PATH)
+    search = commands.add_parser("search")
+    search.add_argument("query")
+    search.add_argument("-k", type=int, default=4)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.command == "build":
+        build_index(collect_documents(args.instructions, args.research), args.index_dir)
+    else:
+        for result in RetrievalIndex(args.index_dir).search(args.query, args.k):
+            print(f"{result['score']:.3f}  [{result['source']}] {result['text'][:200]}")
@@ -0,0 +1,151 @@
+"""Typed results passed between tasks, stages and caches.
+
+Agents still answer in free text (bullets, sections), which is what the
+models produce reliably; the text is parsed here into pydantic models
+without another LLM call, so a slightly off-format answer never triggers a
+conversion retry. Models serialize compactly (defaults omitted) for caches
+and render back to short prompt text with to_text().
+
+    facts = ResearchFacts.from_text("Emaar Properties", result.raw)
+    research_cache.put("Emaar Properties", facts.model_dump(exclude_defaults=True))
+"""
+import os
+from typing import ClassVar
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from contextCompaction import split_facts
+
+
+def _clean(facts: list) -> list:
+    """Stripped, non-empty facts with exact repeats removed, in order."""
+    seen, cleaned = set(), []
+    for fact in facts:
+        fact = " ".join(str(fact).split())
+        if fact and fact.lower() not in seen:
+            seen.add(fact.lower())
+            cleaned.append(fact)
+    return cleaned
+
+
+class Schema(BaseModel):
+    def dumps(self) -> str:
+        """Compact JSON, default-valued fields omitted."""
+        return self.model_dump_json(exclude_defaults=True)
+
+    @classmethod
+    def loads(cls, data: str):
+        return cls.model_validate_json(data)
+
+
+class ResearchFacts(Schema):
+    """What the market researcher found about one developer."""
+
+    developer_name: str
+    facts: list[str] = Field(default_factory=list)
+
+    @field_validator("facts")
+    @classmethod
+    def _clean_facts(cls, facts: list) -> list:
+        return _clean(facts)
+
+    @classmethod
+    def from_text(cls, developer_name: str, text: str) -> "ResearchFacts":
+        return cls(developer_name=developer_name, facts=split_facts(text or ""))
+
+    @classmethod
+    def load(cls, value, developer_name: str) -> "ResearchFacts":
+        """From a cached value: a dumped model, or plain text cached before research was typed."""
+        if isinstance(value, dict):
+            return cls.model_validate(value)
+        return cls.from_text(developer_name, value)
+
+    def to_text(self) -> str:
+        return "\n".join(f"- {fact}" for fact in self.facts)
+
+
+class LeadProfile(Schema):
+    """The lead profiling report, by section."""
+
+    lead_name: str
+    background: list[str] = Field(default_factory=list)
+    key_people: list[str] = Field(default_factory=list)
+    milestones: list[str] = Field(default_factory=list)
+    needs: list[str] = Field(default_factory=list)
+    engagement: list[str] = Field(default_factory=list)
+
+    # Heading words that start each section; anything before the first heading is background
+    SECTION_KEYWORDS: ClassVar[tuple] = (
+        ("key_people", ("personnel", "people", "leadership", "decision", "team", "executive")),
+        ("milestones", ("milestone", "development", "news", "achievement", "launch")),
+        ("needs", ("need", "pain", "challenge", "opportunit", "value")),
+        ("engagement", ("engagement", "strateg", "approach", "recommend", "outreach", "next step")),
+        ("background", ("background", "overview", "company", "about")),
+    )
+    LABELS: ClassVar[dict] = {
+        "background": "Background",
+        "key_people": "Key people",
+        "milestones": "Milestone",
+        "needs": "Need",
+        "engagement": "Engagement idea",
+    }
+
+    @field_validator("background", "key_people", "milestones", "needs", "engagement")
+    @classmethod
+    def _clean_sections(cls, facts: list) -> list:
+        return _clean(facts)
+
+    @classmethod
+    def _section(cls, heading: str):
+        heading = heading.lower()
+        for section, keywords in cls.SECTION_KEYWORDS:
+            if any(keyword in heading for keyword in keywords):
+                return section
+        return None
+
+    @classmethod
+    def from_text(cls, lead_name: str, text: str) -> "LeadProfile":
+        sections = {section: [] for section in cls.LABELS}
+        current = "background"
+        for line in (text or "").splitlines():
+            bare = line.strip().strip("*_ ").strip()
+            is_heading = (
+                line.lstrip().startswith("#")
+                or (bare.endswith(":") and len(bare.split()) < 8)
+                or (line.strip().startswith("**") and line.strip().endswith("**") and len(bare.split()) < 8)
+            )
+            if is_heading:
+                current = cls._section(bare.lstrip("#").strip()) or current
+                continue
+            sections[current].extend(split_facts(line))
+        return cls(lead_name=lead_name, **sections)
+
+    def to_text(self) -> str:
+        """One labelled bullet per fact, so each fact keeps its section through compaction."""
+        return "\n".join(
+            f"- {label}: {fact}" for section, label in self.LABELS.items() for fact in getattr(self, section)
+        )
+
+
+class AudioArtifact(Schema):
+    """A synthesized answer: the audio file and the text spoken in it."""
+
+    path: str
+    text: str = ""
+    format: str = ""
+
+    FORMATS: ClassVar[tuple] = ("mp3", "wav")
+
+    @model_validator(mode="after")
+    def _check_file(self):
+        extension = os.path.splitext(self.path)[1].lstrip(".").lower()
+        if extension not in self.FORMATS:
+            raise ValueError(f"Not an audio file path: {self.path!r}")
+        if not os.path.isfile(self.path):
+            raise ValueError(f"Audio file does not exist: {self.path}")
+        self.format = self.format or extension
+        return self
+
+    def __str__(self) -> str:
+        # CrewOutput prints its pydantic output, so print(result) still shows the path
+        return self.path
@@ -0,0 +1,170 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Any
+
+from crewai_tools import SerperDevTool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "crew_search_cache.sqlite")
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+# live: cache in front of the real API; record: live + save fixtures; replay: fixtures only, no network
+MODES = ("live", "record", "replay")
+
+
+def normalize_query(query: str) -> str:
+    """Case-, punctuation- and whitespace-insensitive form of a search query."""
+    return " ".join(re.sub(r"[^\w\s]", " ", query.lower()).split())
+
+
+class SearchCache:
+    """SQLite-backed search result cache with TTL and single-flight fetching.
+
+    Concurrent lookups of the same normalized query share one upstream call. In
+    replay mode results come only from JSON fixtures in fixtures_dir (written by
+    record mode), so crews can run without network access.
+    """
+
+    def __init__(self, path: str = None, ttl: float = None, mode: str = None, fixtures_dir: str = None):
+        self.path = path or os.getenv("SEARCH_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.ttl = ttl if ttl is not None else float(os.getenv("SEARCH_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+        self.mode = mode or os.getenv("SEARCH_CACHE_MODE", "live")
+        if self.mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {self.mode!r}")
+        self.fixtures_dir = fixtures_dir or os.getenv("SEARCH_FIXTURES_DIR", "search_fixtures")
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, query TEXT, result TEXT, created_at REAL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def key(query: str, params: dict = None) -> str:
+        payload = json.dumps([normalize_query(query), params or {}], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _fixture_path(self, key: str) -> str:
+        return os.path.join(self.fixtures_dir, f"{key}.json")
+
+    def _read_fixture(self, key: str, query: str):
+        try:
+            with open(self._fixture_path(key), encoding="utf-8") as f:
+                return json.load(f)["result"]
+        except FileNotFoundError:
+            raise LookupError(f"No recorded search result for {query!r} in {self.fixtures_dir}") from None
+
+    def _write_fixture(self, key: str, query: str, result) -> None:
+        os.makedirs(self.fixtures_dir, exist_ok=True)
+        tmp_path = self._fixture_path(key) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"query": query, "result": result}, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp_path, self._fixture_path(key))
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._db.execute("SELECT result, created_at FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[1] >= self.ttl:
+            return None
+        return json.loads(row[0])
+
+    def put(self, key: str, query: str, result) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, query, result, created_at) VALUES (?, ?, ?, ?)",
+                (key, query, json.dumps(result, default=str), time.time()),
+            )
+            self._db.commit()
+
+    def get_or_fetch(self, query: str, params: dict, fetch):
+        """Return the result for query/params, calling fetch() at most once per key at a time."""
+        key = self.key(query, params)
+        if self.mode == "replay":
+            return self._read_fixture(key, query)
+
+        result = self.get(key)
+        if result is not None:
+            with self._lock:
+                self.hits += 1
+            return result
+
+        with self._lock:
+            waiter = self._pending.get(key)
+            if waiter is None:
+                waiter = self._pending[key] = {"done": threading.Event(), "result": None, "error": None}
+                owner = True
+                self.misses += 1
+            else:
+                owner = False
+                self.coalesced += 1
+
+        if not owner:
+            waiter["done"].wait()
+            if waiter["error"] is not None:
+                raise waiter["error"]
+            return waiter["result"]
+
+        try:
+            result = fetch()
+            self.put(key, query, result)
+            if self.mode == "record":
+                self._write_fixture(key, query, result)
+            waiter["result"] = result
+            return result
+        except Exception as e:
+            waiter["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._pending[key]
+            waiter["done"].set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
+
+
+class CachedSerperDevTool(SerperDevTool):
+    """SerperDevTool that answers repeated queries from a shared SearchCache."""
+
+    search_cache: Any = None
+
+    def _run(self, **kwargs: Any) -> Any:
+        if self.search_cache is None:
+            self.search_cache = shared_search_cache()
+        query = kwargs.get("search_query") or kwargs.get("query") or ""
+        # The parameters this call actually runs with: per-call overrides win over the tool's settings
+        params = {
+            name: kwargs.get(name, getattr(self, name, None))
+            for name in ("search_type", "n_results", "country", "location", "locale")
+        }
+        fetch = super()._run
+        return self.search_cache.get_or_fetch(query, params, lambda: fetch(**kwargs))
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def shared_search_cache() -> SearchCache:
+    """Process-wide SearchCache configured from SEARCH_CACHE_* environment variables."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = SearchCache()
+        return _shared_cache
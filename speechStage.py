@@ -0,0 +1,30 @@
+import logging
+
+from schemas import AudioArtifact
+
+logger = logging.getLogger(__name__)
+
+
+class SpeechStage:
+    """Deterministic text-to-speech stage that replaces the speech_generator agent.
+
+    Register it in Crew(after_kickoff_callbacks=[...]) in place of speech_task.
+    The final task's text goes straight to synthesize(text), with no LLM round
+    trip. The returned CrewOutput's pydantic output is an AudioArtifact (audio
+    path, spoken text and format, checked to exist), and its raw is the audio
+    path, so existing callers such as Audio(filename=result.raw) keep working.
+    """
+
+    def __init__(self, synthesize):
+        self.synthesize = synthesize
+
+    def __call__(self, output):
+        text = output.raw
+        if not text or not text.strip():
+            logger.warning("Final answer is empty, skipping speech synthesis")
+            return output
+        artifact = AudioArtifact(path=self.synthesize(text), text=text)
+        logger.info(f"Synthesized final answer to {artifact.path}")
+        output.raw = artifact.path
+        output.pydantic = artifact
+        return output
@@ -0,0 +1,172 @@
+import time
+import queue
+import logging
+import threading
+import contextvars
+
+from crewStreaming import stream_chunks_to
+from textSplit import SENTENCE_END
+
+logger = logging.getLogger(__name__)
+
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+
+def playsound(path: str) -> None:
+    """Play an audio file with playsound, imported on first use."""
+    from playsound import playsound as play
+
+    play(path)
+
+
+# --- Text segmentation ---
+class FinalAnswerFilter:
+    """Drop the agent's "Thought: ..." preamble and pass through only the final answer."""
+
+    def __init__(self, marker: str = FINAL_ANSWER_MARKER):
+        self.marker = marker
+        self.buffer = ""
+        self.passing = False
+
+    def feed(self, chunk: str) -> str:
+        if self.passing:
+            return chunk
+        self.buffer += chunk
+        index = self.buffer.find(self.marker)
+        if index < 0:
+            return ""
+        self.passing = True
+        text = self.buffer[index + len(self.marker):].lstrip()
+        self.buffer = ""
+        return text
+
+
+class SentenceSplitter:
+    """Accumulate streamed text and emit complete sentences as soon as they end."""
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, chunk: str) -> list:
+        self.buffer += chunk
+        parts = SENTENCE_END.split(self.buffer)
+        self.buffer = parts.pop()
+        return [part.strip() for part in parts if part.strip()]
+
+    def flush(self) -> list:
+        rest, self.buffer = self.buffer.strip(), ""
+        return [rest] if rest else []
+
+
+def split_sentences(text: str) -> list:
+    splitter = SentenceSplitter()
+    return splitter.feed(text) + splitter.flush()
+
+
+# --- Playback ---
+class SpeechPlayer:
+    """Synthesize and play sentences in order on background threads.
+
+    Synthesis of sentence N+1 overlaps playback of sentence N, and both overlap
+    with the LLM still generating later sentences.
+    """
+
+    def __init__(self, synthesize, play=playsound):
+        self.synthesize = synthesize
+        self.play = play
+        self.started_at = time.perf_counter()
+        self.first_audio_at = None
+        self.spoken = 0
+        self.cancelled = threading.Event()
+        self._texts = queue.Queue()
+        self._files = queue.Queue()
+        # Each thread runs in a copy of the creator's context, so tts/playback spans join its trace
+        self._synth_thread = threading.Thread(target=contextvars.copy_context().run, args=(self._synth_loop,), daemon=True)
+        self._play_thread = threading.Thread(target=contextvars.copy_context().run, args=(self._play_loop,), daemon=True)
+        self._synth_thread.start()
+        self._play_thread.start()
+
+    def say(self, sentence: str) -> None:
+        if self.cancelled.is_set():
+            return
+        self.spoken += 1
+        self._texts.put(sentence)
+
+    def cancel(self) -> None:
+        """Drop every sentence that has not started playing (barge-in).
+
+        The clip already playing runs to the end, which is at most one sentence.
+        """
+        if not self.cancelled.is_set():
+            logger.info("Playback cancelled")
+        self.cancelled.set()
+
+    def close(self) -> None:
+        """Wait until every queued sentence has been played."""
+        self._texts.put(None)
+        self._synth_thread.join()
+        self._play_thread.join()
+
+    @property
+    def time_to_first_audio(self):
+        if self.first_audio_at is None:
+            return None
+        return self.first_audio_at - self.started_at
+
+    def _synth_loop(self):
+        while True:
+            text = self._texts.get()
+            if text is None:
+                self._files.put(None)
+                return
+            if self.cancelled.is_set():
+                continue
+            try:
+                self._files.put(self.synthesize(text))
+            except Exception as e:
+                logger.error(f"Speech synthesis failed for sentence: {e}")
+
+    def _play_loop(self):
+        while True:
+            path = self._files.get()
+            if path is None:
+                return
+            if self.cancelled.is_set():
+                continue
+            if self.first_audio_at is None:
+                self.first_audio_at = time.perf_counter()
+                logger.info(f"Time to first audio: {self.time_to_first_audio:.2f}s")
+            try:
+                self.play(path)
+            except Exception as e:
+                logger.error(f"Audio playback failed: {e}")
+
+
+def speak_streaming(kickoff, synthesize, play=playsound, player: SpeechPlayer = None):
+    """Run kickoff() while speaking its final answer sentence by sentence.
+
+    kickoff must drive an LLM created with stream=True. Returns the kickoff result
+    once the last sentence has been played. Pass a player to be able to cancel
+    playback from elsewhere.
+    """
+    player = player or SpeechPlayer(synthesize, play)
+    answer = FinalAnswerFilter()
+    splitter = SentenceSplitter()
+
+    def on_chunk(chunk):
+        for sentence in splitter.feed(answer.feed(chunk)):
+            player.say(sentence)
+
+    try:
+        with stream_chunks_to(on_chunk):
+            result = kickoff()
+        if player.spoken:
+            for sentence in splitter.flush():
+                player.say(sentence)
+        else:
+            # Nothing was streamed (e.g. the answer came from a cache), speak the final text
+            for sentence in split_sentences(str(result)):
+                player.say(sentence)
+    finally:
+        player.close()
+    return result
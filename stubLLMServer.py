@@ -0,0 +1,330 @@
+import sys
+import json
+import time
+import uuid
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# The query stub tool calls search for; benchmark search fixtures are recorded for it
+STUB_SEARCH_QUERY = "real estate developer market overview"
+
+STUB_ANSWER = (
+    "Here is a concise answer prepared for the benchmark. "
+    "The developer has a strong portfolio of residential and commercial projects. "
+    "Demand has stayed steady and pricing is competitive for the segment. "
+    "Next steps are to review the latest launches and compare payment plans."
+)
+
+
+class StubLLMServer:
+    """Local OpenAI-compatible chat completions server with configurable latency.
+
+    Every request sleeps for latency seconds (plus completion tokens divided by
+    tokens_per_second, when set) and returns a canned ReAct-style final answer.
+    When a request offers tools and has no tool results yet, the server first
+    calls each offered tool once, so tool plumbing is exercised too.
+
+        with StubLLMServer(latency=0.05) as server:
+            llm = LLM(model="openai/stub", base_url=server.base_url, api_key="stub")
+    """
+
+    def __init__(self, latency: float = 0.05, tokens_per_second: float = None, call_tools: bool = True,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.call_tools = call_tools
+        self.requests = 0
+        self.tool_call_responses = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"requests": self.requests, "tool_call_responses": self.tool_call_responses}
+
+    # --- Responses ---
+    def _tool_calls(self, body: dict):
+        if not self.call_tools or not body.get("tools"):
+            return None
+        if any(message.get("role") == "tool" for message in body.get("messages", [])):
+            return None
+        calls = []
+        for tool in body["tools"]:
+            function = tool.get("function", {})
+            properties = function.get("parameters", {}).get("properties", {})
+            required = function.get("parameters", {}).get("required", list(properties))
+            arguments = {
+                name: STUB_SEARCH_QUERY if properties.get(name, {}).get("type", "string") == "string" else None
+                for name in required
+            }
+            calls.append({
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+                "type": "function",
+                "function": {"name": function.get("name"), "arguments": json.dumps(arguments)},
+            })
+        return calls
+
+    def respond(self, body: dict) -> dict:
+        """The completion for a request body, after the configured delay."""
+        prompt_tokens = sum(len(str(message.get("content") or "")) for message in body.get("messages", [])) // 4
+        tool_calls = self._tool_calls(body)
+        content = None if tool_calls else f"Thought: I now can give a great answer\nFinal Answer: {STUB_ANSWER}"
+        completion_tokens = len(content or "") // 4 + 8 * len(tool_calls or [])
+
+        delay = self.latency
+        if self.tokens_per_second:
+            delay += completion_tokens / self.tokens_per_second
+        time.sleep(delay)
+
+        with self._lock:
+            self.requests += 1
+            self.tool_call_responses += bool(tool_calls)
+        message = {"role": "assistant", "content": content}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if tool_calls else "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    # --- HTTP ---
+    # handle_get/handle_post return (status, payload, content type); subclasses add endpoints
+    def handle_get(self, path: str) -> tuple:
+        if path.rstrip("/").endswith("/models"):
+            return 200, json.dumps({"object": "list", "data": [{"id": "stub", "object": "model"}]}).encode(), "application/json"
+        return 404, b"{}", "application/json"
+
+    def handle_post(self, path: str, body: dict) -> tuple:
+        if not path.rstrip("/").endswith("/chat/completions"):
+            return 404, b"{}", "application/json"
+        response = self.respond(body)
+        if body.get("stream"):
+            return 200, _sse(response), "text/event-stream"
+        return 200, json.dumps(response).encode(), "application/json"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def _send(self, status: int, payload: bytes, content_type: str = "application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._send(*server.handle_get(self.path))
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                self._send(*server.handle_post(self.path, body))
+
+        return Handler
+
+
+def parse_keep_alive(value) -> float:
+    """Seconds for an Ollama keep_alive value ("30m", "1h", 300, ...); negative means forever."""
+    if value is None or value == "":
+        return 300.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = str(value).strip()
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    for unit in ("ms", "s", "m", "h"):
+        if value.endswith(unit):
+            return float(value[:-len(unit)]) * units[unit]
+    return float(value)
+
+
+class FakeOllamaServer(StubLLMServer):
+    """StubLLMServer that also behaves like an Ollama server.
+
+    Serves /api/version, /api/tags, /api/ps and /api/generate next to the
+    OpenAI-compatible /v1 endpoints. The model is loaded on first use (taking
+    load_seconds) and unloaded keep_alive seconds after the last request, and
+    at most num_parallel requests are processed at once, the rest waiting in
+    line, as with OLLAMA_NUM_PARALLEL.
+
+        with FakeOllamaServer(load_seconds=1.0) as server:
+            manager = OllamaManager(base_url=server.url)
+    """
+
+    def __init__(self, latency: float = 0.05, load_seconds: float = 1.0, num_parallel: int = 1,
+                 model: str = "llama3.1:latest", keep_alive: float = 300.0, **kwargs):
+        super().__init__(latency=latency, **kwargs)
+        self.load_seconds = load_seconds
+        self.num_parallel = num_parallel
+        self.model = model
+        self.keep_alive = keep_alive
+        self.loads = 0
+        self.generate_requests = 0
+        self.max_concurrent = 0
+        self._running = 0
+        self._expires_at = None
+        self._slots = threading.Semaphore(num_parallel)
+        self._load_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """Root URL, as Ollama clients expect it (base_url is the /v1 OpenAI-compatible root)."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def is_loaded(self) -> bool:
+        with self._lock:
+            return self._expires_at is not None and time.monotonic() < self._expires_at
+
+    def _load(self, keep_alive) -> None:
+        """Load the model if it is not resident, then reset its unload timer."""
+        seconds = parse_keep_alive(keep_alive) if keep_alive is not None else self.keep_alive
+        with self._load_lock:
+            if not self.is_loaded():
+                time.sleep(self.load_seconds)
+                with self._lock:
+                    self.loads += 1
+            with self._lock:
+                self._expires_at = float("inf") if seconds < 0 else time.monotonic() + seconds
+
+    def respond(self, body: dict) -> dict:
+        with self._slots:
+            with self._lock:
+                self._running += 1
+                self.max_concurrent = max(self.max_concurrent, self._running)
+            try:
+                self._load(body.get("keep_alive"))
+                return super().respond(body)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+    def generate(self, body: dict) -> dict:
+        """/api/generate: an empty prompt only loads (or, with keep_alive 0, unloads) the model."""
+        with self._lock:
+            self.generate_requests += 1
+        started = time.perf_counter()
+        if parse_keep_alive(body.get("keep_alive")) == 0:
+            with self._lock:
+                self._expires_at = None
+            return {"model": body.get("model"), "response": "", "done": True, "done_reason": "unload"}
+        if body.get("prompt"):
+            response = self.respond({"model": body.get("model"), "keep_alive": body.get("keep_alive"),
+                                     "messages": [{"role": "user", "content": body["prompt"]}]})
+            text = response["choices"][0]["message"]["content"] or ""
+        else:
+            self._load(body.get("keep_alive"))
+            text = ""
+        return {"model": body.get("model"), "response": text, "done": True, "done_reason": "load" if not text else "stop",
+                "total_duration": int((time.perf_counter() - started) * 1e9)}
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        with self._lock:
+            stats.update(loads=self.loads, generate_requests=self.generate_requests, max_concurrent=self.max_concurrent)
+        return stats
+
+    # --- HTTP ---
+    def handle_get(self, path: str) -> tuple:
+        path = path.rstrip("/")
+        if path == "/api/version":
+            return 200, json.dumps({"version": "0.0.0-fake"}).encode(), "application/json"
+        if path == "/api/tags":
+            return 200, json.dumps({"models": [{"name": self.model, "model": self.model}]}).encode(), "application/json"
+        if path == "/api/ps":
+            models = []
+            with self._lock:
+                expires_at = self._expires_at
+            if expires_at is not None and time.monotonic() < expires_at:
+                remaining = None if expires_at == float("inf") else expires_at - time.monotonic()
+                models.append({"name": self.model, "model": self.model, "expires_in_seconds": remaining})
+            return 200, json.dumps({"models": models}).encode(), "application/json"
+        return super().handle_get(path)
+
+    def handle_post(self, path: str, body: dict) -> tuple:
+        if path.rstrip("/") == "/api/generate":
+            if body.get("model") != self.model:
+                return 404, json.dumps({"error": f"model '{body.get('model')}' not found"}).encode(), "application/json"
+            return 200, json.dumps(self.generate(body)).encode(), "application/json"
+        return super().handle_post(path, body)
+
+
+def _sse(response: dict) -> bytes:
+    """A completion as server-sent chat.completion.chunk events, one word per content chunk."""
+    message = response["choices"][0]["message"]
+    base = {key: response[key] for key in ("id", "created", "model")}
+    base["object"] = "chat.completion.chunk"
+    deltas = [{"role": "assistant"}]
+    if message.get("tool_calls"):
+        deltas.append({"tool_calls": [dict(call, index=index) for index, call in enumerate(message["tool_calls"])]})
+    else:
+        deltas += [{"content": word + " "} for word in message["content"].split(" ")]
+    events = [dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": None}]) for delta in deltas]
+    events.append(dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": response["choices"][0]["finish_reason"]}],
+                       usage=response["usage"]))
+    return b"".join(f"data: {json.dumps(event)}\n\n".encode() for event in events) + b"data: [DONE]\n\n"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a stub OpenAI-compatible LLM server.")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per request")
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--no-tools", action="store_true", help="never answer with tool calls")
+    parser.add_argument("--ollama", action="store_true", help="also serve the Ollama API (model loading, /api/*)")
+    parser.add_argument("--load-seconds", type=float, default=1.0, help="with --ollama: model load time")
+    parser.add_argument("--num-parallel", type=int, default=1, help="with --ollama: requests processed at once")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if args.ollama:
+        server = FakeOllamaServer(args.latency, args.load_seconds, args.num_parallel,
+                                  tokens_per_second=args.tokens_per_second, call_tools=not args.no_tools,
+                                  port=args.port).start()
+        print(f"Fake Ollama server listening on {server.url}", file=sys.stderr)
+    else:
+        server = StubLLMServer(args.latency, args.tokens_per_second, not args.no_tools, port=args.port).start()
+        print(f"Stub LLM server listening on {server.base_url}", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
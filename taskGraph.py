@@ -0,0 +1,209 @@
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from crewai import Crew
+
+logger = logging.getLogger(__name__)
+
+
+def run_single_task(task, inputs: dict, context: list = None):
+    """Run task on its own in a one-task Crew, with context tasks' outputs as input."""
+    if context:
+        task.context = context
+    crew = Crew(agents=[task.agent], tasks=[task], verbose=False)
+    crew.kickoff(inputs=inputs)
+    return task.output
+
+
+class TaskNode:
+    def __init__(self, name: str, task, depends_on: list, inputs: dict):
+        self.name = name
+        self.task = task
+        self.depends_on = depends_on
+        self.inputs = inputs
+        self.started = None
+        self.finished = None
+
+    @property
+    def seconds(self) -> float:
+        return self.finished - self.started
+
+
+class TaskGraph:
+    """Run crewai Tasks as a dependency graph, executing independent branches concurrently.
+
+    Each task runs in its own single-task Crew once all of its dependencies have
+    finished, and receives their outputs as context, just as it would in a
+    sequential crew. Tasks that run at the same time must not share an Agent,
+    so build a fresh agent per branch.
+
+        graph = TaskGraph(max_workers=4)
+        plan = graph.add(plan_task, inputs={"topic": topic})
+        write = graph.add(write_task, depends_on=[plan], inputs={"topic": topic})
+        graph.run()
+        print(graph.report())
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self.nodes = {}
+        self.started = None
+        self.finished = None
+
+    def add(self, task, depends_on=(), inputs: dict = None, name: str = None) -> str:
+        """Add task to the graph and return its node name, for use in depends_on.
+
+        Dependencies must already be in the graph, which keeps it acyclic.
+        """
+        name = name or f"{len(self.nodes)}:{task.name or task.description[:40]}"
+        if name in self.nodes:
+            raise ValueError(f"Duplicate task name: {name}")
+        for dependency in depends_on:
+            if dependency not in self.nodes:
+                raise ValueError(f"Unknown dependency {dependency!r} for {name!r}")
+        self.nodes[name] = TaskNode(name, task, list(depends_on), inputs or {})
+        return name
+
+    def _run_node(self, node: TaskNode):
+        node.started = time.perf_counter()
+        context = [self.nodes[dependency].task for dependency in node.depends_on]
+        output = run_single_task(node.task, node.inputs, context)
+        node.finished = time.perf_counter()
+        logger.info(f"Finished {node.name} in {node.seconds:.2f}s")
+        return output
+
+    def run(self) -> dict:
+        """Execute every task and return their TaskOutputs keyed by node name."""
+        remaining = {name: set(node.depends_on) for name, node in self.nodes.items()}
+        dependents = {name: [] for name in self.nodes}
+        for name, node in self.nodes.items():
+            for dependency in node.depends_on:
+                dependents[dependency].append(name)
+
+        outputs = {}
+        running = {}
+        self.started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            def submit_ready():
+                for name in [name for name, deps in remaining.items() if not deps]:
+                    del remaining[name]
+                    running[pool.submit(self._run_node, self.nodes[name])] = name
+
+            submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    outputs[name] = future.result()
+                    for dependent in dependents[name]:
+                        remaining[dependent].discard(name)
+                submit_ready()
+        self.finished = time.perf_counter()
+        return outputs
+
+    def critical_path(self):
+        """Longest chain of dependent tasks by measured time, as (node names, seconds)."""
+        best = {}
+
+        def longest(name):
+            if name not in best:
+                node = self.nodes[name]
+                chain, seconds = max(
+                    (longest(dependency) for dependency in node.depends_on),
+                    key=lambda item: item[1],
+                    default=([], 0.0),
+                )
+                best[name] = (chain + [name], seconds + node.seconds)
+            return best[name]
+
+        return max((longest(name) for name in self.nodes), key=lambda item: item[1], default=([], 0.0))
+
+    def report(self) -> str:
+        """Wall-clock time compared with serial time and the critical path."""
+        path, path_seconds = self.critical_path()
+        serial_seconds = sum(node.seconds for node in self.nodes.values())
+        lines = [
+            f"Tasks: {len(self.nodes)}",
+            f"Wall clock: {self.finished - self.started:.2f}s",
+            f"Sum of task times (sequential run): {serial_seconds:.2f}s",
+            f"Critical path: {path_seconds:.2f}s",
+        ]
+        lines += [f"  {name}: {self.nodes[name].seconds:.2f}s" for name in path]
+        return "\n".join(lines)
+
+
+class TaskPipeline:
+    """Pipeline chains of tasks across stages, one worker thread per stage.
+
+    Every chain holds one task per stage (e.g. plan, write, edit for a topic).
+    Stage k of chain N+1 runs while stage k+1 of chain N is still running, so a
+    single backend stays busy with at most one request per stage instead of
+    sitting idle between stages. Each task receives the previous stage's output
+    as context.
+
+        pipeline = TaskPipeline(["plan", "write", "edit"])
+        outputs = pipeline.run([({"topic": t}, build_tasks()) for t in topics])
+    """
+
+    def __init__(self, stage_names: list):
+        self.stage_names = stage_names
+        self.busy = {name: 0.0 for name in stage_names}
+        self.started = None
+        self.finished = None
+
+    def _stage_loop(self, index: int, inbox: queue.Queue, outbox: queue.Queue):
+        name = self.stage_names[index]
+        while True:
+            item = inbox.get()
+            if item is None:
+                outbox.put(None)
+                return
+            if item["error"] is None:
+                tasks = item["tasks"]
+                started = time.perf_counter()
+                try:
+                    context = [tasks[index - 1]] if index else None
+                    item["output"] = run_single_task(tasks[index], item["inputs"], context)
+                except Exception as e:
+                    logger.error(f"Stage {name} failed for chain {item['index']}: {e}")
+                    item["error"] = e
+                self.busy[name] += time.perf_counter() - started
+            outbox.put(item)
+
+    def run(self, chains) -> list:
+        """Run every (inputs, tasks) chain and return final outputs (or exceptions) in order."""
+        queues = [queue.Queue() for _ in range(len(self.stage_names) + 1)]
+        threads = [
+            threading.Thread(target=self._stage_loop, args=(index, queues[index], queues[index + 1]), daemon=True)
+            for index in range(len(self.stage_names))
+        ]
+        self.started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        count = 0
+        for index, (inputs, tasks) in enumerate(chains):
+            if len(tasks) != len(self.stage_names):
+                raise ValueError(f"Chain {index} has {len(tasks)} tasks for {len(self.stage_names)} stages")
+            queues[0].put({"index": index, "inputs": inputs, "tasks": tasks, "output": None, "error": None})
+            count += 1
+        queues[0].put(None)
+
+        results = [None] * count
+        while True:
+            item = queues[-1].get()
+            if item is None:
+                break
+            results[item["index"]] = item["error"] or item["output"]
+        self.finished = time.perf_counter()
+        return results
+
+    def report(self) -> str:
+        """Wall-clock time and how busy each stage was over it."""
+        wall = self.finished - self.started
+        lines = [f"Wall clock: {wall:.2f}s", f"Sum of stage times (sequential run): {sum(self.busy.values()):.2f}s"]
+        lines += [f"  {name}: busy {busy:.2f}s ({busy / wall:.0%})" for name, busy in self.busy.items()]
+        return "\n".join(lines)
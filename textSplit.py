@@ -0,0 +1,11 @@
+"""Sentence boundaries shared by speech streaming, TTS chunking and context compaction."""
+import re
+
+# Titles that end in a period but not a sentence ("Dr. Smith")
+ABBREVIATIONS = ("Mr", "Mrs", "Ms", "Dr", "Prof", "Sr", "Jr", "St", "Mt", "vs", "Fig")
+_NOT_ABBREVIATION = "".join(rf"(?<!\b{word}\.)" for word in ABBREVIATIONS) + r"(?<!\b[A-Z]\.)"
+
+# Sentence end: terminal punctuation, optionally closed by a quote or bracket, then
+# whitespace before something that starts a sentence. Lowercase continuations
+# ("e.g. this"), titles and initials ("J. Smith") stay in the same sentence.
+SENTENCE_END = re.compile(rf"(?:(?<=[.!?])|(?<=[.!?][\"')\]])){_NOT_ABBREVIATION}\s+(?=[\"'(\[A-Z0-9])")
@@ -0,0 +1,327 @@
+import os
+import sys
+import json
+import time
+import uuid
+import logging
+import tempfile
+import threading
+import contextvars
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACE_PATH = os.path.join(tempfile.gettempdir(), "crew_traces.jsonl")
+
+
+class Span:
+    """One timed operation; exported with OpenTelemetry span field names."""
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: str = None, start: float = None, attributes: dict = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start = start if start is not None else time.time()
+        self.end = None
+        self.attributes = dict(attributes or {})
+        self.error = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.time()) - self.start
+
+    def set(self, **attributes) -> None:
+        self.attributes.update({key: value for key, value in attributes.items() if value is not None})
+
+    def to_dict(self) -> dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": int(self.start * 1e9),
+            "endTimeUnixNano": int(self.end * 1e9),
+            "durationSeconds": round(self.end - self.start, 6),
+            "attributes": self.attributes,
+            "status": {"code": "ERROR", "message": self.error} if self.error else {"code": "OK"},
+        }
+
+
+class Tracer:
+    """Record nested spans and append each finished span as a JSON line to path.
+
+    Spans opened with span() nest under the innermost open span of the current
+    context (a context variable, so concurrent turns never share a parent).
+    crewai runs event handlers in a copy of the emitting thread's context, so
+    agent spans land under the span that was open around kickoff(). Threads
+    started for a turn should run in a copy of it too
+    (contextvars.copy_context().run), as SpeechPlayer and CrewEngine do.
+
+        with tracer.span("answer", user_query=query) as span:
+            result = crew.kickoff(...)
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or os.getenv("TRACE_PATH", DEFAULT_TRACE_PATH)
+        self._current = contextvars.ContextVar(f"tracer_span_{id(self)}", default=None)
+        self._lock = threading.Lock()
+
+    def current(self):
+        """The innermost span() open in this context, or None."""
+        return self._current.get()
+
+    def start_span(self, name: str, kind: str = "internal", parent: Span = None, start: float = None, **attributes) -> Span:
+        parent = parent or self.current()
+        trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        return Span(name, kind, trace_id, parent.span_id if parent else None, start, attributes)
+
+    def end_span(self, span: Span, end: float = None, error=None) -> None:
+        span.end = end if end is not None else time.time()
+        if error is not None:
+            span.error = str(error)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes):
+        span = self.start_span(name, kind, **attributes)
+        token = self._current.set(span)
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._current.reset(token)
+            self.end_span(span, error=error)
+
+    def traced(self, name: str, kind: str = "internal"):
+        """Decorator form of span()."""
+        def decorate(function):
+            def wrapper(*args, **kwargs):
+                with self.span(name, kind):
+                    return function(*args, **kwargs)
+            wrapper.__name__ = function.__name__
+            wrapper.__doc__ = function.__doc__
+            return wrapper
+        return decorate
+
+
+_shared_tracer = None
+_shared_tracer_lock = threading.Lock()
+
+
+def shared_tracer() -> Tracer:
+    """Process-wide Tracer writing to TRACE_PATH."""
+    global _shared_tracer
+    with _shared_tracer_lock:
+        if _shared_tracer is None:
+            _shared_tracer = Tracer()
+        return _shared_tracer
+
+
+def usage_snapshot(crew):
+    """The crew's token usage so far; pass it to record_token_usage as baseline."""
+    return crew.calculate_usage_metrics()
+
+
+def record_token_usage(span: Span, output, baseline=None) -> None:
+    """Copy a CrewOutput's token_usage onto span.
+
+    crewai reports the lifetime usage of the crew's LLMs, which pooled crews
+    reuse across kickoffs; with baseline (usage_snapshot() taken before the
+    kickoff) only this kickoff's usage is recorded.
+    """
+    usage = getattr(output, "token_usage", None)
+    if usage is None:
+        return
+    if baseline is not None:
+        usage = usage.delta_since(baseline)
+    span.set(
+        prompt_tokens=getattr(usage, "prompt_tokens", None),
+        completion_tokens=getattr(usage, "completion_tokens", None),
+        total_tokens=getattr(usage, "total_tokens", None),
+        cached_prompt_tokens=getattr(usage, "cached_prompt_tokens", None),
+        successful_requests=getattr(usage, "successful_requests", None),
+    )
+
+
+# --- crewai instrumentation ---
+def _timestamp(event) -> float:
+    stamp = getattr(event, "timestamp", None)
+    return stamp.timestamp() if stamp is not None else time.time()
+
+
+def _usage(usage) -> dict:
+    if usage is None:
+        return {}
+    if not isinstance(usage, dict):
+        usage = getattr(usage, "__dict__", {})
+    return {key: usage.get(key) for key in ("prompt_tokens", "completion_tokens", "total_tokens") if usage.get(key) is not None}
+
+
+_instrumented = set()
+_instrumented_lock = threading.Lock()
+
+
+def instrument_crewai(tracer: Tracer = None) -> Tracer:
+    """Record agent executions, tool calls and LLM calls from crewai's event bus as spans.
+
+    Spans take their times from the event timestamps, since crewai may deliver
+    events on its own threads. Safe to call more than once per tracer.
+    """
+    try:
+        from crewai.events import (
+            crewai_event_bus, AgentExecutionStartedEvent, AgentExecutionCompletedEvent, AgentExecutionErrorEvent,
+            ToolUsageStartedEvent, ToolUsageFinishedEvent, ToolUsageErrorEvent,
+            LLMCallStartedEvent, LLMCallCompletedEvent, LLMCallFailedEvent,
+        )
+    except ImportError:  # older crewai releases
+        from crewai.utilities.events import (
+            crewai_event_bus, AgentExecutionStartedEvent, AgentExecutionCompletedEvent, AgentExecutionErrorEvent,
+            ToolUsageStartedEvent, ToolUsageFinishedEvent, ToolUsageErrorEvent,
+            LLMCallStartedEvent, LLMCallCompletedEvent, LLMCallFailedEvent,
+        )
+
+    tracer = tracer or shared_tracer()
+    with _instrumented_lock:
+        if id(tracer) in _instrumented:
+            return tracer
+        _instrumented.add(id(tracer))
+
+    agents = {}
+    tools = {}
+    llm_calls = {}
+    lock = threading.Lock()
+
+    def agent_key(event):
+        agent_id = getattr(event, "agent_id", None) or getattr(getattr(event, "agent", None), "id", None)
+        task_id = getattr(event, "task_id", None) or getattr(getattr(event, "task", None), "id", None)
+        return (str(agent_id), str(task_id))
+
+    def parent_for(event):
+        with lock:
+            return agents.get(agent_key(event))
+
+    @crewai_event_bus.on(AgentExecutionStartedEvent)
+    def on_agent_started(source, event):
+        role = getattr(event.agent, "role", None) or event.agent_role
+        task = getattr(event.task, "name", None) or (getattr(event.task, "description", None) or "")[:80]
+        span = tracer.start_span(f"agent:{role}", "agent", start=_timestamp(event), agent=role, task=task)
+        with lock:
+            agents[agent_key(event)] = span
+
+    def finish_agent(event, error=None):
+        with lock:
+            span = agents.pop(agent_key(event), None)
+        if span:
+            tracer.end_span(span, _timestamp(event), error)
+
+    @crewai_event_bus.on(AgentExecutionCompletedEvent)
+    def on_agent_completed(source, event):
+        finish_agent(event)
+
+    @crewai_event_bus.on(AgentExecutionErrorEvent)
+    def on_agent_error(source, event):
+        finish_agent(event, getattr(event, "error", "error"))
+
+    @crewai_event_bus.on(ToolUsageStartedEvent)
+    def on_tool_started(source, event):
+        span = tracer.start_span(f"tool:{event.tool_name}", "tool", parent=parent_for(event), start=_timestamp(event),
+                                 tool=event.tool_name, agent=event.agent_role)
+        with lock:
+            tools.setdefault((agent_key(event), event.tool_name), []).append(span)
+
+    def finish_tool(event, error=None, **attributes):
+        with lock:
+            spans = tools.get((agent_key(event), event.tool_name))
+            span = spans.pop(0) if spans else None
+        if span:
+            span.set(**attributes)
+            tracer.end_span(span, _timestamp(event), error)
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def on_tool_finished(source, event):
+        finish_tool(event, from_cache=getattr(event, "from_cache", None))
+
+    @crewai_event_bus.on(ToolUsageErrorEvent)
+    def on_tool_error(source, event):
+        finish_tool(event, getattr(event, "error", "error"))
+
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def on_llm_started(source, event):
+        span = tracer.start_span(f"llm:{event.model}", "llm", parent=parent_for(event), start=_timestamp(event),
+                                 model=event.model, agent=event.agent_role)
+        with lock:
+            llm_calls[event.call_id] = span
+
+    def finish_llm(event, error=None, **attributes):
+        with lock:
+            span = llm_calls.pop(getattr(event, "call_id", None), None)
+        if span:
+            span.set(**attributes)
+            tracer.end_span(span, _timestamp(event), error)
+
+    @crewai_event_bus.on(LLMCallCompletedEvent)
+    def on_llm_completed(source, event):
+        finish_llm(event, **_usage(getattr(event, "usage", None)))
+
+    @crewai_event_bus.on(LLMCallFailedEvent)
+    def on_llm_failed(source, event):
+        finish_llm(event, getattr(event, "error", "error"))
+
+    return tracer
+
+
+# --- Reporting ---
+def percentile(values, q: float, default=None):
+    """Nearest-rank percentile (q between 0 and 1) of values, or default when there are none."""
+    values = sorted(values)
+    if not values:
+        return default
+    return values[min(len(values) - 1, max(0, int(round(q * len(values) + 0.5)) - 1))]
+
+
+def load_spans(path: str = None) -> list:
+    path = path or os.getenv("TRACE_PATH", DEFAULT_TRACE_PATH)
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize(spans: list) -> dict:
+    """count, p50, p95, mean and total tokens per span name."""
+    groups = {}
+    for span in spans:
+        groups.setdefault(span["name"], []).append(span)
+    summary = {}
+    for name, group in groups.items():
+        durations = [span["durationSeconds"] for span in group]
+        summary[name] = {
+            "count": len(group),
+            "p50": percentile(durations, 0.50),
+            "p95": percentile(durations, 0.95),
+            "mean": sum(durations) / len(durations),
+            "errors": sum(1 for span in group if span["status"]["code"] == "ERROR"),
+            "tokens": sum(span["attributes"].get("total_tokens") or 0 for span in group),
+        }
+    return summary
+
+
+def format_report(summary: dict) -> str:
+    lines = [f"{'span':<48} {'count':>6} {'p50':>9} {'p95':>9} {'mean':>9} {'errors':>6} {'tokens':>8}"]
+    for name, row in sorted(summary.items(), key=lambda item: -item[1]["p95"]):
+        lines.append(
+            f"{name[:48]:<48} {row['count']:>6} {row['p50']:>8.2f}s {row['p95']:>8.2f}s "
+            f"{row['mean']:>8.2f}s {row['errors']:>6} {row['tokens']:>8}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # python tracing.py [traces.jsonl]
+    print(format_report(summarize(load_spans(sys.argv[1] if len(sys.argv) > 1 else None))))
@@ -0,0 +1,116 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "crew_tts_cache")
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024  # 200 MB of MP3s
+
+
+def gtts_render(text: str, lang: str, tld: str, slow: bool, output_path: str) -> None:
+    """Synthesize text with gTTS and write the MP3 to output_path."""
+    from gtts import gTTS  # imported on first synthesis, so text-only workers never load it
+
+    gTTS(text=text, lang=lang, tld=tld, slow=slow).save(output_path)
+
+
+class TTSCache:
+    """Persistent, content-addressed cache of synthesized speech files.
+
+    Files are named after a SHA-256 digest of (text, lang, tld, slow), so the same
+    answer maps to the same MP3 across restarts. Writes go to a temp file and are
+    moved into place with os.replace, and the least recently used files are evicted
+    once the directory grows past max_bytes. Renderers that write another format
+    pass its extension (e.g. "wav").
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = DEFAULT_MAX_BYTES, render=gtts_render,
+                 extension: str = "mp3"):
+        self.cache_dir = cache_dir or os.getenv("TTS_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self.render = render
+        self.extension = extension
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(text: str, lang: str = "en", tld: str = "us", slow: bool = False) -> str:
+        """Stable digest of the synthesis parameters (unlike hash(), not salted per process)."""
+        payload = json.dumps([text, lang, tld, slow], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.{self.extension}")
+
+    def get(self, text: str, lang: str = "en", tld: str = "us", slow: bool = False):
+        """Return the cached file path for these parameters, or None on a miss."""
+        path = self.path_for(self.key(text, lang, tld, slow))
+        try:
+            # Bump the mtime so eviction treats the file as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def synthesize(self, text: str, lang: str = "en", tld: str = "us", slow: bool = False) -> str:
+        """Return a path to the MP3 for text, synthesizing it only on a cache miss."""
+        path = self.get(text, lang, tld, slow)
+        if path:
+            with self._lock:
+                self.hits += 1
+            return path
+
+        with self._lock:
+            self.misses += 1
+        path = self.path_for(self.key(text, lang, tld, slow))
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        os.close(fd)
+        try:
+            self.render(text, lang, tld, slow, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+        return path
+
+    def evict(self) -> None:
+        """Delete least recently used files until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(f".{self.extension}"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+
+        entries.sort()
+        while total > self.max_bytes and entries:
+            _, size, name = entries.pop(0)
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+                total -= size
+                logger.debug(f"Evicted cached audio {name}")
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,198 @@
+"""Chunked, parallel text-to-speech on top of TTSCache.
+
+Long answers are split on paragraph and sentence boundaries, the chunks are
+synthesized concurrently on a thread pool and the audio is stitched back
+together in order, so synthesis time follows the longest chunk rather than
+the length of the answer. Every chunk is cached on its own, so sentences that
+recur across answers ("Feel free to ask if you have more questions.") are
+synthesized once; whole answers are cached as well.
+
+Backends (TTS_BACKEND): gtts (default, MP3), espeak (offline espeak-ng, WAV)
+and stub (silent WAV after TTS_STUB_DELAY seconds, for tests and benchmarks).
+
+    engine = ChunkedTTS()
+    path = engine.synthesize(answer_text)
+"""
+import os
+import re
+import time
+import wave
+import shutil
+import logging
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from textSplit import SENTENCE_END
+from ttsCache import TTSCache, gtts_render, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CHUNK_CHARS = 200
+DEFAULT_WORKERS = 8
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+# --- Backends ---
+# A backend has a name (its cache subdirectory), the extension of the files it
+# writes and render(text, lang, tld, slow, output_path), the TTSCache renderer signature.
+class GTTSBackend:
+    """Google Translate TTS through gTTS (needs network access)."""
+
+    name = "gtts"
+    extension = "mp3"
+
+    def render(self, text: str, lang: str, tld: str, slow: bool, output_path: str) -> None:
+        gtts_render(text, lang, tld, slow, output_path)
+
+
+class EspeakBackend:
+    """Local, offline synthesis with the espeak-ng (or espeak) command line tool."""
+
+    name = "espeak"
+    extension = "wav"
+
+    def __init__(self, executable: str = None, words_per_minute: int = 175):
+        self.executable = (executable or os.getenv("ESPEAK_PATH")
+                           or shutil.which("espeak-ng") or shutil.which("espeak"))
+        self.words_per_minute = words_per_minute
+
+    def render(self, text: str, lang: str, tld: str, slow: bool, output_path: str) -> None:
+        if not self.executable:
+            raise RuntimeError("espeak-ng not found; install it or set ESPEAK_PATH")
+        speed = int(self.words_per_minute * (0.7 if slow else 1.0))
+        subprocess.run([self.executable, "-v", lang, "-s", str(speed), "-w", output_path, text],
+                       check=True, capture_output=True)
+
+
+class StubBackend:
+    """Silent WAV audio, seconds_per_word long, written after delay seconds."""
+
+    name = "stub"
+    extension = "wav"
+
+    def __init__(self, delay: float = 0.0, seconds_per_word: float = 0.05, sample_rate: int = 16000):
+        self.delay = delay
+        self.seconds_per_word = seconds_per_word
+        self.sample_rate = sample_rate
+
+    def render(self, text: str, lang: str, tld: str, slow: bool, output_path: str) -> None:
+        time.sleep(self.delay)
+        frames = int(len(text.split()) * self.seconds_per_word * self.sample_rate)
+        with wave.open(output_path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(self.sample_rate)
+            f.writeframes(b"\0\0" * frames)
+
+
+def make_backend(name: str = None):
+    """Backend named by TTS_BACKEND: gtts, espeak or stub."""
+    name = (name or os.getenv("TTS_BACKEND", "gtts")).lower()
+    if name == "gtts":
+        return GTTSBackend()
+    if name == "espeak":
+        return EspeakBackend()
+    if name == "stub":
+        return StubBackend(delay=float(os.getenv("TTS_STUB_DELAY", "0")))
+    raise ValueError(f"Unknown TTS_BACKEND {name!r} (expected gtts, espeak or stub)")
+
+
+# --- Chunking and stitching ---
+def split_chunks(text: str, max_chars: int = DEFAULT_MAX_CHUNK_CHARS) -> list:
+    """Sentences of text, in order; sentences longer than max_chars are split at a comma or space."""
+    chunks = []
+    for paragraph in PARAGRAPH_BREAK.split(text):
+        for sentence in SENTENCE_END.split(paragraph.strip()):
+            sentence = " ".join(sentence.split())
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(", ", 0, max_chars) + 1 or sentence.rfind(" ", 0, max_chars)
+                if cut <= 0:
+                    cut = max_chars
+                chunks.append(sentence[:cut].strip())
+                sentence = sentence[cut:].strip()
+            if sentence:
+                chunks.append(sentence)
+    return chunks
+
+
+def _strip_id3(data: bytes) -> bytes:
+    """MP3 frames without a leading ID3v2 tag (a tag in the middle of a stream confuses players)."""
+    if data[:3] != b"ID3" or len(data) < 10:
+        return data
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return data[10 + size + footer:]
+
+
+def concatenate(paths: list, output_path: str, extension: str) -> None:
+    """Join audio files end to end: WAV by frames, MP3 by frame bytes."""
+    if extension == "wav":
+        with wave.open(output_path, "wb") as out:
+            for index, path in enumerate(paths):
+                with wave.open(path, "rb") as f:
+                    if index == 0:
+                        out.setparams(f.getparams())
+                    out.writeframes(f.readframes(f.getnframes()))
+        return
+    with open(output_path, "wb") as out:
+        for index, path in enumerate(paths):
+            with open(path, "rb") as f:
+                data = f.read()
+            out.write(data if index == 0 else _strip_id3(data))
+
+
+# --- Engine ---
+class ChunkedTTS:
+    """Synthesize text as parallel, individually cached chunks stitched into one file.
+
+    Whole answers are cached under <cache_dir>/<backend> and chunks under
+    <cache_dir>/<backend>/chunks, each with its own size limit.
+    """
+
+    def __init__(self, backend=None, cache_dir: str = None, max_workers: int = None,
+                 max_chunk_chars: int = DEFAULT_MAX_CHUNK_CHARS, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.backend = backend or make_backend()
+        base_dir = os.path.join(cache_dir or os.getenv("TTS_CACHE_DIR", DEFAULT_CACHE_DIR), self.backend.name)
+        self.chunks = TTSCache(os.path.join(base_dir, "chunks"), max_bytes, self.backend.render, self.backend.extension)
+        self.answers = TTSCache(base_dir, max_bytes, self._render, self.backend.extension)
+        self.max_chunk_chars = max_chunk_chars
+        self.max_workers = max_workers or int(os.getenv("TTS_WORKERS", DEFAULT_WORKERS))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tts")
+
+    @property
+    def extension(self) -> str:
+        return self.backend.extension
+
+    def synthesize(self, text: str, lang: str = "en", tld: str = "us", slow: bool = False) -> str:
+        """Return a path to the audio for text, synthesizing only the chunks not cached yet."""
+        if not text or not text.strip():
+            raise ValueError("No text to synthesize")
+        return self.answers.synthesize(text, lang, tld, slow)
+
+    def _render(self, text: str, lang: str, tld: str, slow: bool, output_path: str) -> None:
+        chunks = split_chunks(text, self.max_chunk_chars)
+        started = time.perf_counter()
+        paths = list(self._pool.map(lambda chunk: self.chunks.synthesize(chunk, lang, tld, slow), chunks))
+        if len(paths) == 1:
+            shutil.copyfile(paths[0], output_path)
+        else:
+            concatenate(paths, output_path, self.extension)
+        logger.debug(f"Synthesized {len(chunks)} chunks in {time.perf_counter() - started:.2f}s")
+
+    def stats(self) -> dict:
+        return {"answers": self.answers.stats(), "chunks": self.chunks.stats()}
+
+
+_shared_engine = None
+_shared_engine_lock = threading.Lock()
+
+
+def shared_tts_engine() -> ChunkedTTS:
+    """Process-wide ChunkedTTS using TTS_BACKEND, TTS_CACHE_DIR and TTS_WORKERS."""
+    global _shared_engine
+    with _shared_engine_lock:
+        if _shared_engine is None:
+            _shared_engine = ChunkedTTS()
+        return _shared_engine
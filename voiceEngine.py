@@ -0,0 +1,141 @@
+import sys
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class EngineBusy(RuntimeError):
+    """Raised when the engine already has max_pending requests waiting or running."""
+
+
+class CrewEngine:
+    """Serve many blocking crew kickoffs concurrently from asyncio.
+
+    handler is a blocking callable (e.g. crew.answer_query) that builds or leases its
+    own crew per call. At most max_concurrency handlers run at once on a dedicated
+    thread pool. Requests beyond that wait in line, and once max_pending requests
+    are in flight new ones are rejected with EngineBusy so callers can shed load.
+    A request that exceeds timeout raises asyncio.TimeoutError. If it has not
+    started yet it is dropped; otherwise its worker thread cannot be interrupted
+    and finishes in the background, still holding its slot and counting as
+    pending, so a timeout never pushes real work above either limit.
+    """
+
+    def __init__(self, handler, max_concurrency: int = 8, max_pending: int = 64, timeout: float = 120.0):
+        self.handler = handler
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="crew-engine")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def submit(self, *args, **kwargs):
+        """Run handler(*args, **kwargs) on the pool and return its result."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise EngineBusy(f"{self._pending} requests already in flight")
+            self._pending += 1
+
+        started = time.perf_counter()
+        try:
+            # Like asyncio.to_thread, the handler runs in a copy of the caller's context (trace parent)
+            context = contextvars.copy_context()
+            work = self._executor.submit(partial(context.run, self.handler, *args, **kwargs))
+        except BaseException:
+            self._finished(None)
+            raise
+        # A request stays pending until its handler returns, even after the caller gave up on it
+        work.add_done_callback(self._finished)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(work), self.timeout)
+        except asyncio.TimeoutError:
+            # On 3.11 the handler's own TimeoutError is the same class; it has finished, a timeout has not
+            if work.done() and not work.cancelled():
+                with self._lock:
+                    self.failed += 1
+                raise
+            with self._lock:
+                self.timed_out += 1
+            logger.warning(f"Request timed out after {self.timeout:g}s")
+            raise
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+
+        with self._lock:
+            self.completed += 1
+        logger.info(f"Request finished in {time.perf_counter() - started:.2f}s ({self._pending} in flight)")
+        return result
+
+    def _finished(self, work) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def map(self, requests):
+        """Submit every (args, kwargs) pair and return results or exceptions in order.
+
+        At most max_concurrency of them are submitted at a time, so a batch larger
+        than max_pending queues here instead of being rejected with EngineBusy.
+        """
+        slots = asyncio.Semaphore(min(self.max_concurrency, self.max_pending))
+
+        async def bounded(args, kwargs):
+            async with slots:
+                return await self.submit(*args, **kwargs)
+
+        tasks = [bounded(args, kwargs) for args, kwargs in requests]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": self._pending,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+async def serve_queries(queries, max_concurrency: int = 8):
+    """Answer several queries concurrently with the crew.py pipeline."""
+    from crew import answer_query, warm_up
+
+    # Crews are built in the background while the engine starts taking requests
+    warm_up()
+    engine = CrewEngine(answer_query, max_concurrency=max_concurrency)
+    try:
+        results = await engine.map(((query,), {}) for query in queries)
+    finally:
+        engine.shutdown(wait=False)
+    for query, result in zip(queries, results):
+        if isinstance(result, Exception):
+            print(f"{query!r} failed: {result!r}")
+        else:
+            print(f"{query!r} -> {result.raw}")
+    print(engine.stats())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    asyncio.run(serve_queries(sys.argv[1:] or ["What are their best luxury projects in Dubai?"]))
@@ -0,0 +1,419 @@
+import os
+import time
+import wave
+import queue
+import logging
+import threading
+from collections import deque
+
+import numpy as np
+import speech_recognition as sr
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+
+
+# --- Audio sources ---
+# A source yields fixed-size frames of 16-bit mono PCM; read() returns b"" once it has ended.
+class MicrophoneSource:
+    """The default microphone, opened once and kept open for the whole session."""
+
+    sample_width = 2
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, frame_ms: int = FRAME_MS, device_index: int = None):
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self._microphone = sr.Microphone(device_index=device_index, sample_rate=sample_rate, chunk_size=self.frame_samples)
+        self._stream = None
+
+    def open(self) -> None:
+        self._stream = self._microphone.__enter__().stream
+        self.sample_width = self._microphone.SAMPLE_WIDTH
+
+    def read(self) -> bytes:
+        return self._stream.read(self.frame_samples)
+
+    def close(self) -> None:
+        if self._stream is not None:
+            self._microphone.__exit__(None, None, None)
+            self._stream = None
+
+
+class WavFileSource:
+    """Frames from a 16-bit mono WAV file, a stand-in for the microphone in tests.
+
+    With realtime=True frames are paced at the speed they would arrive from a
+    microphone. trailing_silence_ms of silence is appended so the last utterance
+    in the file is closed by the VAD.
+    """
+
+    def __init__(self, path: str, frame_ms: int = FRAME_MS, realtime: bool = False, trailing_silence_ms: int = 1000):
+        self.path = path
+        self.frame_ms = frame_ms
+        self.realtime = realtime
+        self.trailing_silence_ms = trailing_silence_ms
+        self._wav = None
+
+    def open(self) -> None:
+        self._wav = wave.open(self.path, "rb")
+        if self._wav.getnchannels() != 1:
+            raise ValueError(f"{self.path} must be mono audio")
+        if self._wav.getsampwidth() != 2:
+            # EnergyVAD reads frames as int16 samples
+            raise ValueError(f"{self.path} must be 16-bit audio, got {8 * self._wav.getsampwidth()}-bit")
+        self.sample_rate = self._wav.getframerate()
+        self.sample_width = self._wav.getsampwidth()
+        self.frame_samples = self.sample_rate * self.frame_ms // 1000
+        self._silence_frames = self.trailing_silence_ms // self.frame_ms
+
+    def read(self) -> bytes:
+        if self.realtime:
+            time.sleep(self.frame_ms / 1000)
+        frame = self._wav.readframes(self.frame_samples)
+        if len(frame) == self.frame_samples * self.sample_width:
+            return frame
+        if self._silence_frames <= 0:
+            return b""
+        self._silence_frames -= 1
+        return frame + b"\x00" * (self.frame_samples * self.sample_width - len(frame))
+
+    def close(self) -> None:
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+
+def make_source():
+    """WavFileSource when VOICE_INPUT_FILE is set, otherwise the microphone."""
+    path = os.getenv("VOICE_INPUT_FILE")
+    if path:
+        return WavFileSource(path, realtime=True)
+    return MicrophoneSource()
+
+
+# --- Voice activity detection ---
+class EnergyVAD:
+    """Energy-based voice activity detection with an adaptive noise floor.
+
+    A frame is speech when its RMS is above max(min_threshold, margin * noise
+    floor). Speech starts after start_frames speech frames in a row and ends
+    after end_frames non-speech frames in a row.
+    """
+
+    def __init__(self, start_frames: int = 3, end_frames: int = 25, margin: float = 3.0,
+                 min_threshold: float = 300.0, noise_alpha: float = 0.05):
+        self.start_frames = start_frames
+        self.end_frames = end_frames
+        self.margin = margin
+        self.min_threshold = min_threshold
+        self.noise_alpha = noise_alpha
+        self.noise_floor = None
+        self.speaking = False
+        self._run = 0
+
+    def threshold(self) -> float:
+        return max(self.min_threshold, self.margin * (self.noise_floor or 0.0))
+
+    def is_speech(self, frame: bytes) -> bool:
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+        rms = float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+        speech = rms > self.threshold()
+        if not speech:
+            # Track background noise only while nobody is talking
+            self.noise_floor = rms if self.noise_floor is None else (1 - self.noise_alpha) * self.noise_floor + self.noise_alpha * rms
+        return speech
+
+    def update(self, frame: bytes):
+        """Feed one frame; returns "start", "end" or None."""
+        speech = self.is_speech(frame)
+        if speech != self.speaking:
+            self._run += 1
+        else:
+            self._run = 0
+        if not self.speaking and self._run >= self.start_frames:
+            self.speaking, self._run = True, 0
+            return "start"
+        if self.speaking and self._run >= self.end_frames:
+            self.speaking, self._run = False, 0
+            return "end"
+        return None
+
+
+# --- Recognizers ---
+# A recognizer is a callable taking sr.AudioData and returning the text, or None if nothing was understood.
+# Recognizers that are cheap enough to run on an utterance still in progress also have
+# partial(audio), used for partial transcripts (see ContinuousListener.on_partial).
+class GoogleRecognizer:
+    """Google Web Speech API through a single long-lived sr.Recognizer."""
+
+    def __init__(self, language: str = "en-US"):
+        self.language = language
+        self._recognizer = sr.Recognizer()
+
+    def __call__(self, audio: sr.AudioData):
+        try:
+            return self._recognizer.recognize_google(audio, language=self.language)
+        except sr.UnknownValueError:
+            return None
+
+
+class SphinxRecognizer:
+    """Offline CMU Sphinx recognition (requires pocketsphinx)."""
+
+    def __init__(self, language: str = "en-US"):
+        self.language = language
+        self._recognizer = sr.Recognizer()
+
+    def __call__(self, audio: sr.AudioData):
+        try:
+            return self._recognizer.recognize_sphinx(audio, language=self.language) or None
+        except sr.UnknownValueError:
+            return None
+
+
+class VoskRecognizer:
+    """Offline Vosk recognition; the model is loaded once (requires vosk and a model directory)."""
+
+    def __init__(self, model_path: str = None):
+        import vosk
+
+        self._vosk = vosk
+        self._model = vosk.Model(model_path or os.getenv("VOSK_MODEL_PATH", "model"))
+
+    def __call__(self, audio: sr.AudioData):
+        import json
+
+        recognizer = self._vosk.KaldiRecognizer(self._model, SAMPLE_RATE)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2))
+        return json.loads(recognizer.FinalResult()).get("text") or None
+
+    def partial(self, audio: sr.AudioData):
+        # Decoding locally is cheap enough to repeat on the growing utterance
+        return self(audio)
+
+
+class TranscriptRecognizer:
+    """Returns the next line of a transcript for each utterance, for tests and demos."""
+
+    def __init__(self, transcripts):
+        if isinstance(transcripts, str):
+            with open(transcripts, encoding="utf-8") as f:
+                transcripts = [line.strip() for line in f if line.strip()]
+        self._transcripts = deque(transcripts)
+        self._lock = threading.Lock()
+
+    def __call__(self, audio: sr.AudioData):
+        with self._lock:
+            return self._transcripts.popleft() if self._transcripts else None
+
+    def partial(self, audio: sr.AudioData):
+        """The utterance in progress is the next line; it is only consumed once the utterance ends."""
+        with self._lock:
+            return self._transcripts[0] if self._transcripts else None
+
+
+def make_recognizer(backend: str = None):
+    """Recognizer named by backend or STT_BACKEND: google (default), sphinx, vosk or transcript."""
+    backend = (backend or os.getenv("STT_BACKEND", "google")).lower()
+    if backend == "google":
+        return GoogleRecognizer()
+    if backend == "sphinx":
+        return SphinxRecognizer()
+    if backend == "vosk":
+        return VoskRecognizer()
+    if backend == "transcript":
+        return TranscriptRecognizer(os.getenv("STT_TRANSCRIPT_FILE", "transcript.txt"))
+    raise ValueError(f"Unknown STT backend: {backend}")
+
+
+# --- Continuous listening ---
+class ContinuousListener:
+    """Capture audio continuously and transcribe each utterance in the background.
+
+    The capture thread keeps reading the source while the crew runs, so what
+    the user says during an answer is queued instead of lost. A ring buffer
+    keeps the last pre_roll_ms of audio so the start of each utterance is not
+    clipped by the VAD's onset delay. on_speech_start is called as soon as
+    speech is detected, e.g. to cancel playback (barge-in). Recognition runs on
+    its own thread so capture never waits for the recognizer.
+
+    With on_partial, every partial_interval_ms of an utterance in progress is
+    also run through recognizer.partial (when the recognizer has one) and
+    on_partial(text) is called with the transcript so far, e.g. to start work
+    before the user has finished talking. Partials run on a separate thread
+    and only the latest prefix is kept, so slow partials are skipped rather
+    than queued.
+
+        with ContinuousListener(make_source(), make_recognizer(), on_speech_start=player.cancel) as listener:
+            for query in listener:
+                ...
+    """
+
+    def __init__(self, source, recognizer, vad: EnergyVAD = None, on_speech_start=None,
+                 pre_roll_ms: int = 300, max_utterance_seconds: float = 15.0,
+                 on_partial=None, partial_interval_ms: int = 1000):
+        self.source = source
+        self.recognizer = recognizer
+        self.vad = vad or EnergyVAD()
+        self.on_speech_start = on_speech_start
+        self.partial = getattr(recognizer, "partial", None) if on_partial else None
+        self.on_partial = on_partial
+        self.partial_interval_ms = partial_interval_ms
+        self.pre_roll_ms = pre_roll_ms
+        self.max_utterance_seconds = max_utterance_seconds
+        self.finished = threading.Event()
+        self._stop = threading.Event()
+        self._utterances = queue.Queue()
+        self._transcripts = queue.Queue()
+        self._partials = queue.Queue(maxsize=1)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stats = {"utterances": 0, "recognized": 0, "unrecognized": 0, "errors": 0, "recognition_seconds": 0.0,
+                       "partials": 0}
+
+    def start(self) -> "ContinuousListener":
+        self.source.open()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="voice-capture", daemon=True),
+            threading.Thread(target=self._recognize_loop, name="voice-recognize", daemon=True),
+        ]
+        if self.partial:
+            self._threads.append(threading.Thread(target=self._partial_loop, name="voice-partial", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self.source.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def listen(self, timeout: float = None):
+        """Next transcript, or None on timeout or once the source has ended."""
+        if self.finished.is_set() and self._transcripts.empty():
+            return None
+        try:
+            text = self._transcripts.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if text is None:
+            self.finished.set()
+        return text
+
+    def __iter__(self):
+        while True:
+            text = self.listen()
+            if text is None and self.finished.is_set():
+                return
+            if text:
+                yield text
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        recognized = stats["recognized"] + stats["unrecognized"]
+        stats["mean_recognition_seconds"] = stats["recognition_seconds"] / recognized if recognized else 0.0
+        return stats
+
+    def _count(self, name: str, amount=1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+    def _capture_loop(self):
+        frame_seconds = self.source.frame_samples / self.source.sample_rate
+        ring = deque(maxlen=max(self.vad.start_frames, int(self.pre_roll_ms / 1000 / frame_seconds)))
+        max_frames = int(self.max_utterance_seconds / frame_seconds)
+        partial_frames = max(1, int(self.partial_interval_ms / 1000 / frame_seconds))
+        utterance = []
+        try:
+            while not self._stop.is_set():
+                frame = self.source.read()
+                if not frame:
+                    break
+                event = self.vad.update(frame)
+                if event == "start":
+                    # The onset frames are still in the ring buffer
+                    utterance = list(ring) + [frame]
+                    ring.clear()
+                    if self.on_speech_start:
+                        try:
+                            self.on_speech_start()
+                        except Exception as e:
+                            logger.error(f"Speech start callback failed: {e}")
+                elif utterance:
+                    utterance.append(frame)
+                    if event == "end" or len(utterance) >= max_frames:
+                        self._emit(utterance)
+                        utterance = []
+                    elif self.partial and len(utterance) % partial_frames == 0:
+                        self._emit_partial(utterance)
+                else:
+                    ring.append(frame)
+            if utterance:
+                self._emit(utterance)
+        except Exception as e:
+            logger.error(f"Audio capture stopped: {e}")
+        finally:
+            self._utterances.put(None)
+            if self.partial:
+                self._emit_partial(None)
+
+    def _emit(self, frames: list) -> None:
+        self._count("utterances")
+        self._utterances.put(sr.AudioData(b"".join(frames), self.source.sample_rate, self.source.sample_width))
+
+    def _emit_partial(self, frames) -> None:
+        """Hand the utterance so far (None to stop) to the partial thread, replacing any prefix it has not started."""
+        audio = None if frames is None else sr.AudioData(b"".join(frames), self.source.sample_rate, self.source.sample_width)
+        while True:
+            try:
+                self._partials.put_nowait(audio)
+                return
+            except queue.Full:
+                try:
+                    self._partials.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _partial_loop(self):
+        while True:
+            audio = self._partials.get()
+            if audio is None:
+                return
+            try:
+                text = self.partial(audio)
+                if text:
+                    self._count("partials")
+                    self.on_partial(text)
+            except Exception as e:
+                logger.error(f"Partial recognition failed: {e}")
+
+    def _recognize_loop(self):
+        while True:
+            audio = self._utterances.get()
+            if audio is None:
+                self._transcripts.put(None)
+                return
+            started = time.perf_counter()
+            try:
+                text = self.recognizer(audio)
+            except Exception as e:
+                self._count("errors")
+                logger.error(f"Speech recognition failed: {e}")
+                continue
+            self._count("recognition_seconds", time.perf_counter() - started)
+            if text:
+                self._count("recognized")
+                logger.info(f"Recognized: {text}")
+                self._transcripts.put(text)
+            else:
+                self._count("unrecognized")
@@ -1,109 +1,107 @@
 import os
-import tempfile
-from gtts import gTTS
-from IPython.display import Audio
+import sys
 
-from crewai import Agent, Task, Crew, Process, LLM
-from crewai.tools import tool   # ✅ matches your pattern
-from crewai_tools import SerperDevTool
-
-# --- LLMs ---
-ollama_llm = LLM(
-    model="ollama/llama3.1:latest",
-    base_url="http://host.docker.internal:11434"
-)
-openai_llm = LLM(model="gpt-4o-mini")
+# Shared helpers live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning)
 
 
-# Set API keys if needed for search tool
-os.environ["SERPER_API_KEY"] = ""
-os.environ["OPENAI_API_KEY"] = ""
-
-
-# --- Custom Tool (TTS) ---
-@tool("Text to Speech Tool")
-def text_to_speech_tool(text: str) -> str:
-    """Convert text to speech and save as mp3 file. Returns file path."""
-    output_path = os.path.join(tempfile.gettempdir(), "response.mp3")
-    tts = gTTS(text=text, lang="en")
-    tts.save(output_path)
-    return output_path
-
-# --- Tools ---
-search_tool = SerperDevTool()
-
-# instantiate decorated tool properly
-tts_tool = text_to_speech_tool  
-
-# --- Agents ---
-market_researcher = Agent(
-    role="Real Estate Market Researcher",
-    goal="Find detailed insights about {developer_name}, their projects, and market positioning.",
-    backstory="Expert in analyzing real estate developers and projects.",
-    llm=openai_llm,
-    tools=[search_tool],
-    verbose=True,
-    memory=True
-)
-
-property_advisor = Agent(
-    role="Real Estate Property Advisor",
-    goal="Provide client-friendly answers about {developer_name} in response to {user_query}.",
-    backstory="Seasoned advisor turning research into clear spoken explanations.",
-    llm=openai_llm,
-    verbose=True,
-    memory=True
-)
-
-speech_generator = Agent(
-    role="Speech Generator",
-    goal="Convert the final text answer into a natural spoken audio file.",
-    backstory="Specialist in generating clear speech from text.",
-    llm=openai_llm,
-    tools=[tts_tool],
-    verbose=True
-)
-
-# --- Tasks ---
-research_task = Task(
-    description="Research {developer_name} and collect key insights.",
-    expected_output="Bullet-point list of insights.",
-    tools=[search_tool],
-    agent=market_researcher,
-)
-
-answer_task = Task(
-    description="Answer '{user_query}' based on research about {developer_name}.",
-    expected_output="3–4 paragraph conversational text.",
-    agent=property_advisor,
-)
-
-speech_task = Task(
-    description="Convert the final text into an audio file with TTS. Return ONLY the file path.",
-    expected_output="Path to an mp3 file containing spoken response.",
-    tools=[tts_tool],
-    agent=speech_generator,
-)
-
-# --- Crew ---
-crew = Crew(
-    agents=[market_researcher, property_advisor, speech_generator],
-    tasks=[research_task, answer_task, speech_task],
-    process=Process.sequential,
-    memory=True,
-    verbose=False
-)
+# Set API keys if needed for search tool (without clobbering keys other crews in the process use)
+os.environ.setdefault("SERPER_API_KEY", "")
+os.environ.setdefault("OPENAI_API_KEY", "")
 
-# --- Run ---
-inputs = {
-    "developer_name": "Emaar Properties",
-    "user_query": "What are their best luxury projects in Dubai?"
-}
+# crewai, gTTS and IPython are imported where they are used, so importing this
+# module (e.g. from crewFactory) does not load them.
+
+# --- LLMs ---
+def build_llm():
+    """The OpenAI LLM the agents run on."""
+    from crewai import LLM
+
+    return LLM(model="gpt-4o-mini")
+
+
+# --- TTS ---
+def synthesize_speech(text: str) -> str:
+    """Convert text to speech (sentences in parallel, cached) and return the file path."""
+    from ttsEngine import shared_tts_engine
+
+    return shared_tts_engine().synthesize(text, lang="en")
+
+def build_crew(llm=None, synthesize=None, memory: bool = True):
+    """Research + answer crew whose final answer is spoken; result.pydantic is the AudioArtifact."""
+    from crewai import Agent, Task, Crew, Process
+    from searchCache import CachedSerperDevTool
+    from speechStage import SpeechStage
+
+    if llm is None:
+        llm = build_llm()
+
+    # Runs after the crew instead of a speech agent: the final answer goes straight to
+    # TTS with no extra LLM call.
+    speak = SpeechStage(synthesize or synthesize_speech)
+
+    # --- Tools ---
+    # Repeated searches are answered from a persistent cache (SEARCH_CACHE_MODE=replay runs offline)
+    search_tool = CachedSerperDevTool()
+
+    # --- Agents ---
+    market_researcher = Agent(
+        role="Real Estate Market Researcher",
+        goal="Find detailed insights about {developer_name}, their projects, and market positioning.",
+        backstory="Expert in analyzing real estate developers and projects.",
+        llm=llm,
+        tools=[search_tool],
+        verbose=True,
+        memory=memory
+    )
+
+    property_advisor = Agent(
+        role="Real Estate Property Advisor",
+        goal="Provide client-friendly answers about {developer_name} in response to {user_query}.",
+        backstory="Seasoned advisor turning research into clear spoken explanations.",
+        llm=llm,
+        verbose=True,
+        memory=memory
+    )
+
+    # --- Tasks ---
+    research_task = Task(
+        description="Research {developer_name} and collect key insights.",
+        expected_output="Bullet-point list of insights.",
+        tools=[search_tool],
+        agent=market_researcher,
+    )
+
+    answer_task = Task(
+        description="Answer '{user_query}' based on research about {developer_name}.",
+        expected_output="3–4 paragraph conversational text.",
+        agent=property_advisor,
+    )
+
+    # --- Crew ---
+    return Crew(
+        agents=[market_researcher, property_advisor],
+        tasks=[research_task, answer_task],
+        process=Process.sequential,
+        memory=memory,
+        verbose=False,
+        after_kickoff_callbacks=[speak]
+    )
 
-result = crew.kickoff(inputs=inputs)
 
-print("Audio saved at:", result)
-Audio(filename=result.raw)   # play in Jupyter
+# --- Run ---
+if __name__ == "__main__":
+    inputs = {
+        "developer_name": "Emaar Properties",
+        "user_query": "What are their best luxury projects in Dubai?"
+    }
+
+    result = build_crew().kickoff(inputs=inputs)
+
+    audio = result.pydantic
+    print("Audio saved at:", audio.path)
+    from IPython.display import Audio, display
+    display(Audio(filename=audio.path))   # play in Jupyter